@@ -24,7 +24,21 @@ except ImportError:  # pragma: no cover - 仅在非 Blender 环境触发
         def draw(self, _context):
             return None
 
-from . import executor, llm_client, materials, planner_client, utils
+from . import (
+    executor,
+    llm_client,
+    materials,
+    optimizer,
+    plan_cache,
+    planner_client,
+    planning_jobs,
+    prefetch,
+    primitives,
+    scheduler,
+    tracing,
+    transaction,
+    utils,
+)
 
 if bpy is not None:
     from . import operators, ui_panel
@@ -69,11 +83,81 @@ class QKZNAddonPreferences(AddonPreferences):
         min=5,
         description="外部 LLM 请求的超时时间",
     )
+    connect_timeout: bpy.props.FloatProperty(  # type: ignore[valid-type]
+        name="连接超时 (秒)",
+        default=5.0,
+        min=0.5,
+        description="建立连接（含 TLS 握手）的超时时间，与读取超时分开控制",
+    )
+    max_retries: bpy.props.IntProperty(  # type: ignore[valid-type]
+        name="重试次数",
+        default=2,
+        min=0,
+        max=10,
+        description="遇到 429/5xx 或连接失败时的最大重试次数，重试间隔为带抖动的指数退避",
+    )
+    stream_plan: bpy.props.BoolProperty(  # type: ignore[valid-type]
+        name="流式计划",
+        default=False,
+        description="请求 LLM 以 NDJSON/SSE 逐条返回步骤，收到一步执行一步，无需等待整份计划",
+    )
+    prefetch_enabled: bpy.props.BoolProperty(  # type: ignore[valid-type]
+        name="输入时预取",
+        default=False,
+        description="编辑命令后在后台提前请求 LLM，按下执行时直接复用结果（会产生额外请求）",
+    )
+    prefetch_delay: bpy.props.FloatProperty(  # type: ignore[valid-type]
+        name="预取延迟 (秒)",
+        default=0.6,
+        min=0.1,
+        max=5.0,
+        description="输入停止变化多久后才发起预取请求",
+    )
     use_llm_default: bpy.props.BoolProperty(  # type: ignore[attr-defined]
         name="默认启用 LLM",
         default=False,
         description="勾选后默认使用 LLM 解析计划",
     )
+    execution_backend: bpy.props.EnumProperty(  # type: ignore[valid-type]
+        name="执行后端",
+        items=[
+            ("ops", "bpy.ops", "通过 Blender 操作符执行，兼容所有操作"),
+            (
+                "data",
+                "数据 API",
+                "图元直接用 bpy.data 构建，大量添加对象时更快；其余操作仍走 bpy.ops",
+            ),
+        ],
+        default="ops",
+        description="计划或步骤未指定后端时使用",
+    )
+    optimize_plans: bpy.props.BoolProperty(  # type: ignore[valid-type]
+        name="优化计划",
+        default=True,
+        description="执行前删除被覆盖的材质/移动步骤、把移动并入添加、合并连续相同的添加（流式计划不适用）",
+    )
+    transactional_execution: bpy.props.BoolProperty(  # type: ignore[valid-type]
+        name="失败时整体回滚",
+        default=True,
+        description="任一步骤失败即停止，删除本次创建的对象、网格与材质并恢复被修改的属性，不留下半成品",
+    )
+    undo_per_step: bpy.props.BoolProperty(  # type: ignore[valid-type]
+        name="逐步撤销",
+        default=False,
+        description="每个 bpy.ops 步骤单独推入撤销历史；关闭时整份计划只占一个撤销步骤，大型计划更省内存",
+    )
+    prepare_workers: bpy.props.IntProperty(  # type: ignore[valid-type]
+        name="几何准备进程数",
+        default=0,
+        min=0,
+        max=64,
+        description="大于 1 时先在进程池中并行计算数据 API 图元的网格，再在主线程依次提交；0 或 1 表示不启用",
+    )
+    trace_execution: bpy.props.BoolProperty(  # type: ignore[valid-type]
+        name="记录执行追踪",
+        default=False,
+        description="记录规划、LLM 请求与每个步骤的耗时，命令结束后在日志输出汇总表，并可导出为 Chrome trace",
+    )
     log_level: bpy.props.EnumProperty(  # type: ignore[attr-defined]
         name="日志级别",
         items=[
@@ -84,23 +168,67 @@ class QKZNAddonPreferences(AddonPreferences):
         ],
         default="INFO",
     )
+    plan_cache_enabled: bpy.props.BoolProperty(  # type: ignore[valid-type]
+        name="启用计划缓存",
+        default=True,
+        description="相同命令、规划模式与 LLM 地址直接复用之前的计划",
+    )
+    plan_cache_ttl_hours: bpy.props.IntProperty(  # type: ignore[valid-type]
+        name="缓存有效期 (小时)",
+        default=168,
+        min=0,
+        description="超过有效期的缓存条目会被丢弃，0 表示永不过期",
+    )
+    plan_cache_max_entries: bpy.props.IntProperty(  # type: ignore[valid-type]
+        name="缓存条目上限",
+        default=2000,
+        min=1,
+        description="磁盘缓存保留的最大条目数，超出时淘汰最久未使用的条目",
+    )
 
     def draw(self, context: Context) -> None:  # type: ignore[name-defined]
         layout = self.layout
         layout.label(text="配置外部 LLM 服务与默认行为")
         layout.prop(self, "api_url")
         layout.prop(self, "api_key")
-        layout.prop(self, "timeout")
+        row = layout.row(align=True)
+        row.prop(self, "timeout")
+        row.prop(self, "connect_timeout")
+        layout.prop(self, "max_retries")
+        layout.prop(self, "stream_plan")
+        row = layout.row(align=True)
+        row.prop(self, "prefetch_enabled")
+        row.prop(self, "prefetch_delay")
         layout.prop(self, "use_llm_default")
+        layout.prop(self, "execution_backend")
+        layout.prop(self, "optimize_plans")
+        row = layout.row(align=True)
+        row.prop(self, "transactional_execution")
+        row.prop(self, "undo_per_step")
+        layout.prop(self, "prepare_workers")
+        layout.prop(self, "trace_execution")
         layout.prop(self, "log_level")
 
+        box = layout.box()
+        box.prop(self, "plan_cache_enabled")
+        row = box.row(align=True)
+        row.prop(self, "plan_cache_ttl_hours")
+        row.prop(self, "plan_cache_max_entries")
+        # 绘制频繁，不能在这里创建缓存目录或查询数据库
+        for line in plan_cache.describe_stats(plan_cache.peek_default_cache()):
+            box.label(text=line)
+        box.operator("qkzn.clear_plan_cache", text="清空计划缓存", icon="TRASH")
+
 
 CLASSES = ()
 if bpy is not None:
     CLASSES = (
         QKZNAddonPreferences,
         operators.QKZNRunAICommandOperator,
+        operators.QKZNCancelAICommandOperator,
+        operators.QKZNExportTraceOperator,
         operators.QKZNClearLogOperator,
+        operators.QKZNClearPlanCacheOperator,
         ui_panel.QKZNAIAssistantPanel,
     )
 
@@ -111,7 +239,23 @@ def register() -> None:
     if bpy is None:
         raise RuntimeError("Blender 环境缺少 bpy，无法注册插件")
 
-    for module in (executor, llm_client, materials, planner_client, ui_panel, operators, utils):
+    for module in (
+        executor,
+        llm_client,
+        materials,
+        optimizer,
+        plan_cache,
+        planner_client,
+        planning_jobs,
+        prefetch,
+        primitives,
+        scheduler,
+        tracing,
+        transaction,
+        ui_panel,
+        operators,
+        utils,
+    ):
         if module is not None:
             importlib.reload(module)
 
@@ -123,6 +267,9 @@ def register() -> None:
         name="AI 命令",
         description="输入中文自然语言命令，例如：添加一个红色立方体",
         default="",
+        # 默认只在确认输入时回调；TEXTEDIT_UPDATE 让每次编辑都触发，预取的防抖计时器才有意义
+        options={"TEXTEDIT_UPDATE"},
+        update=prefetch.on_input_update,
     )
     pref_default = False
     prefs = utils.get_preferences()
@@ -149,6 +296,12 @@ def unregister() -> None:
     for cls in reversed(CLASSES[1:]):
         bpy.utils.unregister_class(cls)
     bpy.utils.unregister_class(QKZNAddonPreferences)
+    prefetch.PREFETCHER.clear()
+    planning_jobs.cancel_active_job()
+    planning_jobs.set_active_job(None)
+    plan_cache.release_default_cache()
+    llm_client.close_clients()
+    scheduler.shutdown_pool()
 
     utils.get_logger(__name__).info("Blender-QKZN 插件已卸载")
 
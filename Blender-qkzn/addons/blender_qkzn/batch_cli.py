@@ -0,0 +1,171 @@
+"""无界面批量规划命令行：逐行读取命令，多进程解析并输出 JSONL 计划。
+
+用法示例（在 addons 目录的上级执行）::
+
+    PYTHONPATH=addons python -m blender_qkzn.batch_cli prompts.txt -o plans.jsonl --workers 8
+    cat prompts.txt | PYTHONPATH=addons python -m blender_qkzn.batch_cli - --chunk-size 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from . import planner_client
+
+PARSERS = ("rules", "heuristic")
+
+
+@dataclass
+class BatchStats:
+    """批量解析的统计信息。"""
+
+    lines: int = 0
+    planned: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    workers: int = 1
+    chunk_size: int = 1
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"共 {self.lines} 行，成功 {self.planned}，失败 {self.failed}，"
+            f"用时 {self.seconds:.3f}s，{self.lines_per_second:.0f} 行/秒"
+            f"（workers={self.workers}, chunk_size={self.chunk_size}）"
+        )
+
+
+def _rules_plan(text: str) -> Dict[str, Any]:
+    plan = planner_client.parse_command(text)
+    return {"steps": [step.dict() for step in plan.steps]}
+
+
+def _heuristic_plan(text: str) -> Dict[str, Any]:
+    # 单文件插件位于仓库根目录，需要在 PYTHONPATH 中
+    module = importlib.import_module("nl_modeler_addon")
+    result: Dict[str, Any] = module.parse_prompt_heuristic(text)
+    return result
+
+
+_PLANNERS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "rules": _rules_plan,
+    "heuristic": _heuristic_plan,
+}
+
+
+def plan_line(item: Tuple[str, int, str]) -> Dict[str, Any]:
+    """解析单行命令；在子进程中执行，因此只接收可序列化的参数。"""
+
+    parser, number, text = item
+    record: Dict[str, Any] = {"line": number, "text": text}
+    try:
+        record["plan"] = _PLANNERS[parser](text)
+    except Exception as exc:  # noqa: BLE001 - 每行的错误写入结果而不是中断批处理
+        record["error"] = str(exc)
+    return record
+
+
+def iter_commands(stream: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """按行号产出非空命令。"""
+
+    for number, line in enumerate(stream, 1):
+        text = line.strip()
+        if text:
+            yield number, text
+
+
+def plan_commands(
+    commands: Iterable[Tuple[int, str]],
+    parser: str = "rules",
+    workers: int = 1,
+    chunk_size: int = 64,
+    quiet: bool = True,
+) -> Tuple[List[Dict[str, Any]], BatchStats]:
+    """批量解析命令，结果顺序与输入一致；workers <= 1 时在当前进程串行执行。
+
+    quiet 为真时屏蔽 INFO 及以下日志，规划器逐条输出的日志在大批量时会成为主要开销。
+    """
+
+    if parser not in _PLANNERS:
+        raise ValueError(f"未知解析器：{parser}，可选 {', '.join(PARSERS)}")
+    items = [(parser, number, text) for number, text in commands]
+    stats = BatchStats(lines=len(items), workers=max(1, workers), chunk_size=max(1, chunk_size))
+    disable_level = logging.INFO if quiet else logging.NOTSET
+    previous_disable = logging.root.manager.disable
+    start = time.perf_counter()
+    try:
+        logging.disable(disable_level)
+        if stats.workers == 1:
+            records = [plan_line(item) for item in items]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=stats.workers, initializer=logging.disable, initargs=(disable_level,)
+            ) as pool:
+                records = list(pool.map(plan_line, items, chunksize=stats.chunk_size))
+    finally:
+        logging.disable(previous_disable)
+    stats.seconds = time.perf_counter() - start
+    stats.failed = sum(1 for record in records if "error" in record)
+    stats.planned = stats.lines - stats.failed
+    return records, stats
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], stream: TextIO) -> None:
+    """逐行写出 JSON 记录。"""
+
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，返回进程退出码。"""
+
+    arg_parser = argparse.ArgumentParser(description="批量将命令文本解析为 JSONL 计划")
+    arg_parser.add_argument("input", help="命令文件路径，每行一条；使用 - 从标准输入读取")
+    arg_parser.add_argument("-o", "--output", help="输出 JSONL 路径，默认写到标准输出")
+    arg_parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        default="rules",
+        help="rules 为规则规划器，heuristic 为单文件插件的启发式解析",
+    )
+    arg_parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="进程数，1 表示串行"
+    )
+    arg_parser.add_argument("--chunk-size", type=int, default=64, help="每次派发给子进程的行数")
+    arg_parser.add_argument("--verbose", action="store_true", help="输出规划器的逐条日志")
+    args = arg_parser.parse_args(argv)
+
+    if args.input == "-":
+        commands = list(iter_commands(sys.stdin))
+    else:
+        with open(args.input, encoding="utf-8") as handle:
+            commands = list(iter_commands(handle))
+
+    records, stats = plan_commands(
+        commands, args.parser, args.workers, args.chunk_size, quiet=not args.verbose
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            write_jsonl(records, handle)
+    else:
+        write_jsonl(records, sys.stdout)
+    print(stats.summary(), file=sys.stderr)
+    return 0 if stats.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
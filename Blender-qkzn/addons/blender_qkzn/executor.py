@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
-from typing import Any, Callable, Sequence
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from . import materials, utils
-from .schemas import Plan, PlanStep, validate_plan
+from . import materials, primitives, tracing, transaction, utils
+from .schemas import BACKENDS, Plan, PlanStep, step_targets, validate_plan
 
 try:
     import bpy
@@ -17,65 +18,294 @@ class ExecutionError(RuntimeError):
     """执行过程中的统一异常类型。"""
 
 
+StepHandler = Callable[[PlanStep], None]
+
+# 伪操作处理函数，按 op 名称分派；其余 op 交给 bpy.ops
+_HANDLERS: Dict[str, StepHandler] = {}
+# 已解析的 bpy.ops 可调用对象，按路径缓存，避免每步都沿 bpy.ops 逐级 getattr
+_OPERATOR_CACHE: Dict[str, Callable[..., Any]] = {}
+# 当前执行的对象句柄表：bind 步骤执行后登记新对象，target 步骤据此解析，不依赖激活对象
+_HANDLES: Dict[str, Any] = {}
+
+_LOGGER = utils.get_logger(__name__)
+
+
+def register_step_handler(op: str) -> Callable[[StepHandler], StepHandler]:
+    """注册伪操作处理函数的装饰器，同名注册会覆盖旧的处理函数。"""
+
+    def decorator(handler: StepHandler) -> StepHandler:
+        _HANDLERS[op] = handler
+        return handler
+
+    return decorator
+
+
+def registered_ops() -> List[str]:
+    """返回已注册的伪操作名称。"""
+
+    return sorted(_HANDLERS)
+
+
+def clear_operator_cache() -> None:
+    """清空 bpy.ops 解析缓存（重新加载插件或替换 bpy 时调用）。"""
+
+    _OPERATOR_CACHE.clear()
+
+
 def _resolve_bpy_operator(path: str) -> Callable[..., Any]:
-    """根据路径字符串获取 bpy 操作函数。"""
+    """根据路径字符串获取 bpy 操作函数，结果按路径缓存。"""
 
+    cached = _OPERATOR_CACHE.get(path)
+    if cached is not None:
+        return cached
     if bpy is None:
         raise ExecutionError("当前环境缺少 bpy，无法执行操作")
-    parts = path.split(".")
-    target: Any = bpy.ops
-    for part in parts:
-        target = getattr(target, part)
-    return target
-
-
-def _execute_single_step(step: PlanStep) -> None:
-    """执行单个步骤，支持内建操作与自定义伪操作。"""
-
-    logger = utils.get_logger(__name__)
-    logger.debug("执行步骤: %s", step)
-
-    if step.op == "material.assign":
-        if bpy is None:
-            raise ExecutionError("缺少 bpy，无法应用材质")
-        active_obj = bpy.context.active_object
-        materials.apply_material(active_obj, step.args.get("spec"))
-        return
-
-    if step.op == "object.move":
-        if bpy is None:
-            raise ExecutionError("缺少 bpy，无法移动对象")
-        active_obj = bpy.context.active_object
-        if active_obj is None:
-            raise ExecutionError("当前没有激活对象，无法移动")
-        location = step.args.get("location")
-        if not isinstance(location, Sequence):
-            raise ExecutionError("移动指令缺少 location 参数")
-        active_obj.location = location
-        return
+    module_name, _, name = path.partition(".")
+    module = getattr(bpy.ops, module_name, None)
+    # bpy.ops 对任意名称都会返回包装对象，因此按子模块列出的操作判断是否存在
+    if not name or "." in name or module is None or name not in dir(module):
+        raise ExecutionError(f"未知操作：{path}")
+    operator: Callable[..., Any] = getattr(module, name)
+    _OPERATOR_CACHE[path] = operator
+    return operator
+
+
+def validate_ops(steps: Iterable[PlanStep]) -> None:
+    """在执行前检查所有步骤的 op 都能分派，存在未知操作时整份计划不执行。"""
+
+    unknown: List[str] = []
+    for index, step in enumerate(steps, start=1):
+        if step.op in _HANDLERS:
+            continue
+        try:
+            _resolve_bpy_operator(step.op)
+        except ExecutionError:
+            unknown.append(f"{step.op}（步骤 {index}）")
+    if unknown:
+        raise ExecutionError(f"计划包含未知操作：{'、'.join(unknown)}")
+
+
+def reset_handles() -> None:
+    """清空对象句柄表，每次执行新的计划前调用。"""
+
+    _HANDLES.clear()
+
+
+def bound_object(handle: str) -> Any:
+    """返回句柄绑定的对象，未绑定时抛出 ExecutionError。"""
+
+    obj = _HANDLES.get(handle)
+    if obj is None:
+        raise ExecutionError(f"对象句柄 {handle} 未绑定")
+    return obj
+
+
+def target_objects(step: PlanStep) -> List[Any]:
+    """伪操作作用的对象：指定 target 时按句柄解析，否则为当前激活对象。"""
+
+    handles = step_targets(step)
+    if handles:
+        return [bound_object(handle) for handle in handles]
+    return [bpy.context.active_object]
+
+
+@register_step_handler("material.assign")
+def _assign_material(step: PlanStep) -> None:
+    if bpy is None:
+        raise ExecutionError("缺少 bpy，无法应用材质")
+    objects = target_objects(step)
+    tx = transaction.current()
+    if tx is not None:
+        for obj in objects:
+            if obj is not None and obj.data is not None:
+                tx.record_materials(obj.data)
+    spec: Any = step.args.get("spec")
+    if len(objects) == 1:
+        materials.apply_material(objects[0], spec)
+    else:
+        materials.apply_material_many(objects, spec)
+
+
+@register_step_handler("object.move")
+def _move_object(step: PlanStep) -> None:
+    if bpy is None:
+        raise ExecutionError("缺少 bpy，无法移动对象")
+    objects = target_objects(step)
+    if objects[0] is None:
+        raise ExecutionError("当前没有激活对象，无法移动")
+    location = step.args.get("location")
+    if not isinstance(location, Sequence):
+        raise ExecutionError("移动指令缺少 location 参数")
+    tx = transaction.current()
+    for obj in objects:
+        if tx is not None:
+            tx.record_property(obj, "location")
+        obj.location = location
+
+
+def _execute_single_step(step: PlanStep, backend: str = "ops", undo: bool = False) -> None:
+    """执行单个步骤：已注册的伪操作走处理函数，其余调用缓存的 bpy.ops。
+
+    使用 data 后端且图元参数受支持时改用 bpy.data 直接构建，否则仍走 bpy.ops。
+    undo 为 True 时 bpy.ops 调用各自推入撤销历史；默认不推入，由外层操作符记为一个撤销步骤。
+    步骤带 bind 时，执行后把激活对象登记到句柄表。
+    """
 
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug("执行步骤: %s", step)
+
+    handler = _HANDLERS.get(step.op)
+    if handler is not None:
+        for _ in range(step.repeat):
+            handler(step)
+    elif step.target is not None:
+        raise ExecutionError(f"操作 {step.op} 不支持 target，只有伪操作可以引用对象句柄")
+    else:
+        _execute_operator(step, backend, undo)
+    if step.bind is not None:
+        if bpy is None or bpy.context.active_object is None:
+            raise ExecutionError(f"步骤执行后没有激活对象，无法绑定句柄 {step.bind}")
+        _HANDLES[step.bind] = bpy.context.active_object
+
+
+def _execute_operator(step: PlanStep, backend: str, undo: bool) -> None:
+    if (step.backend or backend) == "data":
+        primitive = primitives.PRIMITIVES.get(step.op)
+        if primitive is not None and primitive.supports(step.args):
+            if bpy is None:
+                raise ExecutionError("当前环境缺少 bpy，无法执行操作")
+            primitives.add_primitive(step.op, step.args, bpy.context, count=step.repeat)
+            return
     operator = _resolve_bpy_operator(step.op)
-    operator(**step.args)
+    for _ in range(step.repeat):
+        if undo:
+            operator("EXEC_DEFAULT", True, **step.args)
+        else:
+            operator(**step.args)
 
 
-def execute_plan(plan_input: Any) -> None:
-    """执行计划并记录日志统计信息。"""
+def run_step(
+    index: int,
+    step: PlanStep,
+    backend: str = "ops",
+    tx: Optional[transaction.Transaction] = None,
+    undo: bool = False,
+) -> bool:
+    """执行第 index 个步骤并记录日志，返回是否成功；失败不会中断后续步骤。
 
-    plan: Plan = validate_plan(plan_input)
-    logger = utils.get_logger(__name__)
-    success = 0
-    failed = 0
+    传入事务时，步骤创建的数据块与修改的属性会记入事务，失败步骤留下的部分结果同样记录。
+    """
 
-    for index, step in enumerate(plan.steps, start=1):
-        try:
-            _execute_single_step(step)
-            success += 1
-            logger.info("步骤 %d 成功: %s", index, step.op)
-        except Exception as exc:  # pragma: no cover - 错误路径
-            failed += 1
-            logger.error("步骤 %d 失败 (%s): %s", index, step.op, exc)
+    trace_args = None
+    if tracing.TRACER.enabled:
+        trace_args = {
+            "index": index,
+            "args_size": tracing.args_size(step.args),
+            "repeat": step.repeat,
+        }
+    try:
+        with tracing.span(step.op, "step", trace_args):
+            if tx is None:
+                _execute_single_step(step, backend, undo)
+            else:
+                with tx.step_scope(index):
+                    _execute_single_step(step, backend, undo)
+    except Exception as exc:  # pragma: no cover - 错误路径
+        _LOGGER.error("步骤 %d 失败 (%s): %s", index, step.op, exc)
+        return False
+    _LOGGER.info("步骤 %d 成功: %s", index, step.op)
+    return True
+
+
+def finish_execution(success: int, failed: int) -> None:
+    """输出统计信息，存在失败步骤时抛出 ExecutionError。"""
 
-    logger.info("计划执行完毕，总步骤 %d，成功 %d，失败 %d", len(plan.steps), success, failed)
+    _LOGGER.info("计划执行完毕，总步骤 %d，成功 %d，失败 %d", success + failed, success, failed)
 
     if failed:
         raise ExecutionError(f"计划执行存在失败步骤：成功 {success} / 失败 {failed}")
+
+
+def rollback_execution(tx: transaction.Transaction, index: int, success: int) -> None:
+    """回滚事务并抛出 ExecutionError，说明失败的步骤。"""
+
+    removed, restored = tx.rollback()
+    raise ExecutionError(
+        f"步骤 {index} 失败，已回滚此前成功的 {success} 个步骤（删除数据块 {removed} 个，恢复属性 {restored} 处）"
+    )
+
+
+def execute_steps(
+    steps: Iterable[PlanStep],
+    backend: str = "ops",
+    transactional: bool = False,
+    undo_steps: bool = False,
+) -> None:
+    """逐个执行到达的步骤，可直接接收流式计划的迭代器。
+
+    transactional 为 True 时遇到第一个失败步骤即停止并回滚，场景恢复到执行前的状态；
+    否则失败步骤不会中断后续步骤。undo_steps 控制 bpy.ops 是否逐步推入撤销历史。
+    对象句柄只在本次执行内有效，开始时清空句柄表。
+    """
+
+    execute_indexed(enumerate(steps, start=1), backend, transactional, undo_steps)
+
+
+def execute_indexed(
+    items: Iterable[Tuple[int, PlanStep]],
+    backend: str = "ops",
+    transactional: bool = False,
+    undo_steps: bool = False,
+) -> None:
+    """与 execute_steps 相同，但步骤带有计划中的序号，供按依赖关系重排提交顺序的调度器使用。"""
+
+    reset_handles()
+    tx = transaction.Transaction().begin() if transactional else None
+    success = 0
+    failed = 0
+    try:
+        for index, step in items:
+            if run_step(index, step, backend, tx, undo_steps):
+                success += 1
+            elif tx is not None:
+                rollback_execution(tx, index, success)
+            else:
+                failed += 1
+    except Exception:
+        # 流式计划在中途出错时同样整体回滚
+        if tx is not None and tx.is_open:
+            tx.rollback()
+        raise
+    if tx is not None:
+        tx.commit()
+    finish_execution(success, failed)
+
+
+def prepare_plan(plan_input: Any, backend: Optional[str] = None) -> Tuple[Plan, str]:
+    """校验计划并确定默认执行后端；含未知操作的计划在此被拒绝。
+
+    执行后端的优先级：步骤的 backend > 计划的 backend > 参数 backend > "ops"。
+    """
+
+    with tracing.span("validate", "execution"):
+        plan: Plan = validate_plan(plan_input)
+        default_backend = plan.backend or backend or "ops"
+        if default_backend not in BACKENDS:
+            raise ExecutionError(f"未知执行后端：{default_backend}")
+        validate_ops(plan.steps)
+    return plan, default_backend
+
+
+def execute_plan(
+    plan_input: Any,
+    backend: Optional[str] = None,
+    transactional: bool = False,
+    undo_steps: bool = False,
+) -> None:
+    """执行计划并记录日志统计信息；含未知操作的计划在执行任何步骤前即被拒绝。
+
+    后端选择见 prepare_plan，事务模式与撤销选项见 execute_steps。
+    """
+
+    plan, default_backend = prepare_plan(plan_input, backend)
+    execute_steps(plan.steps, default_backend, transactional, undo_steps)
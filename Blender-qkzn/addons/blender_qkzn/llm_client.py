@@ -2,15 +2,302 @@
 
 from __future__ import annotations
 
-from typing import List
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:  # pragma: no cover - 测试环境可无 requests
     requests = None  # type: ignore[assignment]
+    HTTPAdapter = None  # type: ignore[assignment,misc]
 
-from . import utils
-from .schemas import LLMConfig, PlanStep, validate_plan
+from . import tracing, utils
+from .schemas import LLMConfig, PlanStep, validate_plan, validate_step
+
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+POOL_SIZE = 8
+STREAM_DONE = "[DONE]"
+_SSE_IGNORED_FIELDS = ("event:", "id:", "retry:")
+
+
+@dataclass
+class PlanResult:
+    """批量请求中单条命令的结果，steps 与 error 二者必有其一。"""
+
+    text: str
+    steps: Optional[List[PlanStep]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _batch_item(text: str, raw: Any) -> PlanResult:
+    """解析批量响应中的一项：可为步骤数组、含 plan/steps 的字典，或 {"error": "..."}。"""
+
+    if isinstance(raw, dict) and "error" in raw:
+        return PlanResult(text, error=str(raw["error"]))
+    try:
+        plan_raw = raw.get("plan", raw) if isinstance(raw, dict) else raw
+        return PlanResult(text, steps=validate_plan(plan_raw).steps)
+    except ValueError as exc:
+        return PlanResult(text, error=str(exc))
+
+
+def parse_stream_line(line: str) -> Optional[Any]:
+    """解析 NDJSON 或 SSE 的一行，返回步骤数据；空行、注释与非 data 字段返回 None，结束标记返回 STREAM_DONE。
+
+    每行可以是步骤本身，也可以是 {"step": {...}} 包装。
+    """
+
+    text = line.strip()
+    if not text or text.startswith(":") or text.startswith(_SSE_IGNORED_FIELDS):
+        return None
+    if text.startswith("data:"):
+        text = text[5:].strip()
+        if not text:
+            return None
+    if text == STREAM_DONE:
+        return STREAM_DONE
+    try:
+        data = json.loads(text)
+    except ValueError as exc:
+        raise ValueError(f"流式计划中存在无法解析的行：{text[:80]}") from exc
+    if isinstance(data, dict) and "step" in data:
+        return data["step"]
+    return data
+
+
+class LLMClient:
+    """复用连接池的 LLM 客户端：保持 keep-alive 连接，对 429/5xx 与连接错误做抖动退避重试。"""
+
+    def __init__(
+        self,
+        cfg: LLMConfig,
+        session: Optional[Any] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        if not cfg.api_url:
+            raise ValueError("未配置 LLM API 地址，无法调用外部模型")
+        if requests is None and session is None:
+            raise RuntimeError("当前环境未安装 requests，无法调用外部 LLM 接口")
+        self.cfg = cfg
+        self.session = (
+            session
+            if session is not None
+            else self._build_session(max(POOL_SIZE, cfg.max_concurrency))
+        )
+        self._sleep = sleep
+        self._jitter = jitter
+        self.headers = {"Content-Type": "application/json"}
+        if cfg.api_key:
+            self.headers["Authorization"] = f"Bearer {cfg.api_key}"
+
+    @staticmethod
+    def _build_session(pool_size: int = POOL_SIZE) -> Any:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @property
+    def timeouts(self) -> Tuple[float, float]:
+        """(连接超时, 读取超时)，交给 requests 分别控制握手与等待模型输出。"""
+
+        return (float(self.cfg.connect_timeout), float(self.cfg.timeout))
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """第 attempt 次重试前的等待秒数：服务端给出 Retry-After 时优先采用，否则为全抖动指数退避。"""
+
+        if retry_after:
+            try:
+                return min(float(self.cfg.backoff_max), max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        ceiling = min(float(self.cfg.backoff_max), float(self.cfg.backoff_base) * 2.0**attempt)
+        return self._jitter() * ceiling
+
+    def post(self, payload: Dict[str, Any], stream: bool = False) -> Any:
+        """发送请求并按配置重试，返回最终的响应对象；stream 为真时不预先读取响应体。"""
+
+        logger = utils.get_logger(__name__)
+        attempts = max(0, int(self.cfg.max_retries)) + 1
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = self.session.post(
+                    self.cfg.api_url,
+                    json=payload,
+                    timeout=self.timeouts,
+                    headers=self.headers,
+                    stream=stream,
+                )
+            except requests.ConnectionError as exc:
+                if last_attempt:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(
+                    "LLM 连接失败，%.2f 秒后重试（%d/%d）：%s",
+                    delay,
+                    attempt + 1,
+                    attempts - 1,
+                    exc,
+                )
+                self._sleep(delay)
+                continue
+            if response.status_code in RETRY_STATUS and not last_attempt:
+                delay = self.backoff(attempt, response.headers.get("Retry-After"))
+                logger.warning(
+                    "LLM 返回 %d，%.2f 秒后重试（%d/%d）",
+                    response.status_code,
+                    delay,
+                    attempt + 1,
+                    attempts - 1,
+                )
+                response.close()
+                self._sleep(delay)
+                continue
+            response.raise_for_status()
+            return response
+        raise RuntimeError("LLM 请求重试次数已用尽")  # pragma: no cover - 循环内必然返回或抛出
+
+    def generate_plan(self, text: str) -> List[PlanStep]:
+        """调用外部 LLM 服务，将文本解析为计划步骤列表。"""
+
+        logger = utils.get_logger(__name__)
+        logger.info("请求外部 LLM: %s", self.cfg.api_url)
+        with tracing.span("http", "llm", {"url": self.cfg.api_url}):
+            data = self.post({"prompt": text}).json()
+        with tracing.span("validate", "llm"):
+            plan = validate_plan(data.get("plan", data))
+        logger.info("LLM 返回 %d 个步骤", len(plan.steps))
+        return plan.steps
+
+    def _single(self, text: str) -> PlanResult:
+        try:
+            return PlanResult(text, steps=self.generate_plan(text))
+        except Exception as exc:  # noqa: BLE001 - 单条失败写入结果
+            return PlanResult(text, error=str(exc))
+
+    def _batch(self, texts: Sequence[str]) -> List[PlanResult]:
+        try:
+            data = self.post({"prompts": list(texts)}).json()
+            items = data.get("plans") if isinstance(data, dict) else data
+            if not isinstance(items, list) or len(items) != len(texts):
+                raise ValueError(f"批量响应条数不符：请求 {len(texts)} 条")
+        except Exception as exc:  # noqa: BLE001 - 整批失败时每条都记录同一错误
+            return [PlanResult(text, error=str(exc)) for text in texts]
+        return [_batch_item(text, raw) for text, raw in zip(texts, items)]
+
+    def generate_plans(self, texts: Sequence[str]) -> List[PlanResult]:
+        """批量规划多条命令，结果与输入按下标对齐，单条失败不影响其他命令。
+
+        配置了 batch_size 时每个请求体为 {"prompts": [...]}，服务端返回等长的 {"plans": [...]}；
+        否则逐条请求。两种方式都最多同时进行 max_concurrency 个请求，并共用连接池。
+        """
+
+        texts = list(texts)
+        if not texts:
+            return []
+        workers = max(1, int(self.cfg.max_concurrency))
+        batch_size = int(self.cfg.batch_size)
+        logger = utils.get_logger(__name__)
+        logger.info(
+            "批量请求外部 LLM：%d 条命令，并发 %d，批大小 %d", len(texts), workers, batch_size
+        )
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qkzn-llm") as pool:
+            if batch_size > 0:
+                chunks = [
+                    texts[start : start + batch_size] for start in range(0, len(texts), batch_size)
+                ]
+                results = [item for chunk in pool.map(self._batch, chunks) for item in chunk]
+            else:
+                results = list(pool.map(self._single, texts))
+        failed = sum(1 for result in results if not result.ok)
+        logger.info("批量请求完成：成功 %d，失败 %d", len(results) - failed, failed)
+        return results
+
+    def stream_plan(self, text: str) -> Iterator[PlanStep]:
+        """以流式请求调用 LLM，逐条校验并产出到达的步骤，无需等待整份计划生成完毕。
+
+        服务端可返回 NDJSON（每行一个步骤）或 SSE（data: 行，可用 data: [DONE] 结束）。
+        读取超时作用于相邻两块数据之间的间隔，而不是整个响应。
+        """
+
+        logger = utils.get_logger(__name__)
+        logger.info("流式请求外部 LLM: %s", self.cfg.api_url)
+        response = self.post({"prompt": text, "stream": True}, stream=True)
+        if response.encoding is None:
+            response.encoding = "utf-8"
+        count = 0
+        try:
+            # chunk_size=None 按服务端发送的分块读取，避免凑满缓冲区才返回
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                raw = parse_stream_line(line)
+                if raw is None:
+                    continue
+                if raw == STREAM_DONE:
+                    break
+                step = validate_step(raw)
+                count += 1
+                logger.debug("收到第 %d 个步骤：%s", count, step.op)
+                yield step
+        finally:
+            response.close()
+        if not count:
+            raise ValueError("计划步骤不能为空")
+        logger.info("LLM 流式返回 %d 个步骤", count)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_CLIENTS: Dict[Tuple[Any, ...], LLMClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _config_key(cfg: LLMConfig) -> Tuple[Any, ...]:
+    return (
+        cfg.api_url,
+        cfg.api_key,
+        cfg.timeout,
+        cfg.connect_timeout,
+        cfg.max_retries,
+        cfg.backoff_base,
+        cfg.backoff_max,
+        cfg.max_concurrency,
+        cfg.batch_size,
+    )
+
+
+def get_client(cfg: LLMConfig) -> LLMClient:
+    """按配置复用客户端，使连续的命令共享同一个连接池。"""
+
+    key = _config_key(cfg)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = LLMClient(cfg)
+            _CLIENTS[key] = client
+        return client
+
+
+def close_clients() -> None:
+    """关闭所有缓存的客户端连接，卸载插件时调用。"""
+
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
 
 
 def generate_plan(text: str, cfg: LLMConfig) -> List[PlanStep]:
@@ -22,25 +309,38 @@ def generate_plan(text: str, cfg: LLMConfig) -> List[PlanStep]:
     if requests is None:
         raise RuntimeError("当前环境未安装 requests，无法调用外部 LLM 接口")
 
-    headers = {"Content-Type": "application/json"}
-    if cfg.api_key:
-        headers["Authorization"] = f"Bearer {cfg.api_key}"
+    return get_client(cfg).generate_plan(text)
+
 
-    payload = {"prompt": text}
-    logger = utils.get_logger(__name__)
-    logger.info("请求外部 LLM: %s", cfg.api_url)
+def generate_plans(texts: Sequence[str], cfg: LLMConfig) -> List[PlanResult]:
+    """批量调用外部 LLM 服务，返回与输入按下标对齐的结果。"""
 
-    response = requests.post(cfg.api_url, json=payload, timeout=cfg.timeout, headers=headers)
-    response.raise_for_status()
+    if not cfg.api_url:
+        raise ValueError("未配置 LLM API 地址，无法调用外部模型")
+
+    if requests is None:
+        raise RuntimeError("当前环境未安装 requests，无法调用外部 LLM 接口")
+
+    return get_client(cfg).generate_plans(texts)
+
+
+def stream_plan(text: str, cfg: LLMConfig) -> Iterator[PlanStep]:
+    """流式调用外部 LLM 服务，逐条产出计划步骤。"""
+
+    if not cfg.api_url:
+        raise ValueError("未配置 LLM API 地址，无法调用外部模型")
+
+    if requests is None:
+        raise RuntimeError("当前环境未安装 requests，无法调用外部 LLM 接口")
 
-    data = response.json()
-    plan_raw = data.get("plan", data)
-    plan = validate_plan(plan_raw)
-    logger.info("LLM 返回 %d 个步骤", len(plan.steps))
-    return plan.steps
+    return get_client(cfg).stream_plan(text)
 
 
 # 使用说明：
 #  - 如果需要接入自托管或本地 LLM，请在插件首选项中填写 API 地址与密钥。
 #  - API 返回的 JSON 应包含 "plan" 字段或直接是步骤数组。
 #  - 每个步骤需要提供 op 与 args 字段，例如 {"op": "mesh.primitive_cube_add", "args": {}}。
+#  - 添加步骤可带 "bind": "$obj1" 绑定新对象，材质与移动步骤可带 "target": "$obj1" 指定作用对象。
+#  - 客户端会复用连接；429/5xx 与连接失败按首选项中的重试次数做抖动退避重试。
+#  - 批量接口请求体为 {"prompts": [...]}，需返回等长的 {"plans": [...]}，单项可为 {"error": "..."}。
+#  - 启用流式计划时请求体带 "stream": true，服务端按 NDJSON 或 SSE 每行返回一个步骤。
@@ -4,9 +4,9 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Union
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
 
-from . import utils
+from . import transaction, utils
 
 try:
     import bpy
@@ -17,7 +17,7 @@ _PRESETS_CACHE: Optional[Dict[str, Dict[str, Any]]] = None
 _PRESET_PATH = Path(__file__).parent / "presets" / "materials.json"
 
 
-def _load_presets() -> Dict[str, Dict[str, Any]]:
+def load_presets() -> Dict[str, Dict[str, Any]]:
     """加载 JSON 材质预设，采用懒加载缓存。"""
 
     global _PRESETS_CACHE
@@ -31,7 +31,7 @@ def _load_presets() -> Dict[str, Dict[str, Any]]:
 def _match_preset(name: str) -> Optional[Dict[str, Any]]:
     """根据中文名称或别名匹配预设。"""
 
-    presets = _load_presets()
+    presets = load_presets()
     lowered = name.lower()
     if lowered in presets:
         return presets[lowered]
@@ -42,16 +42,41 @@ def _match_preset(name: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+def _update_inputs(
+    bsdf: Any, principled: Dict[str, Any], tx: Optional[transaction.Transaction]
+) -> None:
+    for key, value in principled.items():
+        input_socket = bsdf.inputs.get(key)
+        if input_socket is None:
+            continue
+        if tx is not None:
+            tx.record_property(input_socket, "default_value")
+        if isinstance(value, Iterable) and not isinstance(value, (str, bytes)):
+            sequence = list(value)
+            if len(sequence) == 3:
+                sequence.append(1.0)
+            input_socket.default_value = sequence
+        else:
+            input_socket.default_value = value
+
+
 def ensure_material(name: str, principled: Optional[Dict[str, Any]] = None):
-    """保证材质存在，并根据配置更新节点参数。"""
+    """保证材质存在，并根据配置更新节点参数。
+
+    在事务中修改已有材质时，先把 use_nodes、新增的节点与被改写的输入记入事务，回滚时恢复；
+    事务内新建的材质回滚时整体删除，不需要逐项记录。
+    """
 
     if bpy is None:
         raise RuntimeError("当前环境缺少 bpy，无法创建材质")
     material = bpy.data.materials.get(name)
+    tx = transaction.current() if material is not None else None
     if material is None:
         material = bpy.data.materials.new(name=name)
         material.use_nodes = True
     if not material.use_nodes:
+        if tx is not None:
+            tx.record_property(material, "use_nodes")
         material.use_nodes = True
     node_tree = material.node_tree
     if not node_tree:
@@ -59,28 +84,16 @@ def ensure_material(name: str, principled: Optional[Dict[str, Any]] = None):
     bsdf = node_tree.nodes.get("Principled BSDF")
     if bsdf is None:
         bsdf = node_tree.nodes.new("ShaderNodeBsdfPrincipled")
+        if tx is not None:
+            added = bsdf
+            tx.record_restore(f"{material.name}.nodes", lambda: node_tree.nodes.remove(added))
     if principled:
-        for key, value in principled.items():
-            input_socket = bsdf.inputs.get(key)
-            if input_socket is None:
-                continue
-            if isinstance(value, Iterable) and not isinstance(value, (str, bytes)):
-                sequence = list(value)
-                if len(sequence) == 3:
-                    sequence.append(1.0)
-                input_socket.default_value = sequence  # type: ignore[assignment]
-            else:
-                input_socket.default_value = value  # type: ignore[assignment]
+        _update_inputs(bsdf, principled, tx)
     return material
 
 
-def apply_material(obj: Any, spec: Union[str, Dict[str, Any]]) -> None:
-    """为对象应用材质，可通过预设或颜色词指定。"""
-
-    if bpy is None:
-        raise RuntimeError("当前环境缺少 bpy，无法应用材质")
-    if obj is None:
-        raise ValueError("未找到可应用材质的对象")
+def describe_spec(spec: Union[str, Dict[str, Any]]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """把预设名、颜色词或字典描述解析为 (材质名, 要写入的节点参数)，不需要 bpy。"""
 
     principled: Optional[Dict[str, Any]] = None
     material_name = ""
@@ -102,9 +115,16 @@ def apply_material(obj: Any, spec: Union[str, Dict[str, Any]]) -> None:
         principled = spec.get("principled")
     else:
         raise TypeError("材质描述必须为字符串或字典")
+    return material_name or "QKZN_Default", principled
+
 
-    material = ensure_material(material_name or "QKZN_Default", principled)
+def _resolve_material(spec: Union[str, Dict[str, Any]]) -> Any:
+    """根据预设名、颜色词或字典描述取得（必要时创建）材质。"""
 
+    return ensure_material(*describe_spec(spec))
+
+
+def _link_material(obj: Any, material: Any) -> None:
     if obj.data is None:
         raise ValueError("当前对象没有几何数据，无法绑定材质")
 
@@ -114,4 +134,31 @@ def apply_material(obj: Any, spec: Union[str, Dict[str, Any]]) -> None:
         else:
             obj.data.materials.append(material)
 
+
+def apply_material(obj: Any, spec: Union[str, Dict[str, Any]]) -> None:
+    """为对象应用材质，可通过预设或颜色词指定。"""
+
+    if bpy is None:
+        raise RuntimeError("当前环境缺少 bpy，无法应用材质")
+    if obj is None:
+        raise ValueError("未找到可应用材质的对象")
+
+    material = _resolve_material(spec)
+    _link_material(obj, material)
+
     utils.get_logger(__name__).info("已为对象 %s 应用材质 %s", obj.name, material.name)
+
+
+def apply_material_many(objects: Sequence[Any], spec: Union[str, Dict[str, Any]]) -> None:
+    """为多个对象应用同一材质，材质只解析与更新节点参数一次。"""
+
+    if bpy is None:
+        raise RuntimeError("当前环境缺少 bpy，无法应用材质")
+    if any(obj is None for obj in objects):
+        raise ValueError("未找到可应用材质的对象")
+
+    material = _resolve_material(spec)
+    for obj in objects:
+        _link_material(obj, material)
+
+    utils.get_logger(__name__).info("已为 %d 个对象应用材质 %s", len(objects), material.name)
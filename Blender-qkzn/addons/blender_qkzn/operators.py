@@ -2,13 +2,44 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import bpy
+from bpy.props import StringProperty
 from bpy.types import Context, Operator
+from bpy_extras.io_utils import ExportHelper
 
-from . import executor, planner_client, utils
-from .schemas import LLMConfig
+from . import (
+    executor,
+    optimizer,
+    plan_cache,
+    planner_client,
+    planning_jobs,
+    prefetch,
+    scheduler,
+    tracing,
+    transaction,
+    utils,
+)
+from .schemas import LLMConfig, Plan, PlanStep
+
+POLL_INTERVAL = 0.1
+
+
+def _redraw_panels(context: Context) -> None:
+    """刷新 3D 视图侧栏，使面板上的进度及时更新。"""
+
+    screen = getattr(context, "screen", None)
+    if screen is None:
+        return
+    for area in screen.areas:
+        if area.type == "VIEW_3D":
+            area.tag_redraw()
+
+
+def _log_trace_summary() -> None:
+    if tracing.TRACER.enabled and tracing.TRACER.events:
+        utils.get_logger(__name__).info("执行追踪汇总：\n%s", tracing.TRACER.format_summary())
 
 
 class QKZNRunAICommandOperator(Operator):
@@ -18,37 +49,278 @@ class QKZNRunAICommandOperator(Operator):
     bl_label = "执行 AI 命令"
     bl_options = {"REGISTER", "UNDO"}
 
-    def execute(self, context: Context) -> set[str]:
+    _timer = None
+    _job: Optional[planning_jobs.PlanningJob] = None
+    _success = 0
+    _failed = 0
+    _backend = "ops"
+    _transactional = True
+    _undo_steps = False
+    _workers = 0
+    _tx: Optional[transaction.Transaction] = None
+    _rollback_error = ""
+
+    def _planning_inputs(
+        self, context: Context
+    ) -> Tuple[str, bool, Optional[LLMConfig], Optional[plan_cache.PlanCache]]:
         utils.ensure_logger_level_from_prefs()
         scene = context.scene
         command = getattr(scene, "ai_input", "")
         use_llm = bool(getattr(scene, "ai_use_llm", False))
 
-        logger = utils.get_logger(__name__)
-        logger.info("收到命令：%s", command)
+        utils.get_logger(__name__).info("收到命令：%s", command)
 
         prefs = utils.get_preferences()
-        llm_config: Optional[LLMConfig] = None
-        if prefs:
-            llm_config = LLMConfig(
-                api_url=getattr(prefs, "api_url", None) or None,
-                api_key=getattr(prefs, "api_key", None) or None,
-                timeout=int(getattr(prefs, "timeout", 30)),
-            )
+        self._backend = str(getattr(prefs, "execution_backend", "ops")) if prefs else "ops"
+        self._transactional = (
+            bool(getattr(prefs, "transactional_execution", True)) if prefs else True
+        )
+        self._undo_steps = bool(getattr(prefs, "undo_per_step", False)) if prefs else False
+        self._workers = int(getattr(prefs, "prepare_workers", 0)) if prefs else 0
+        # 每条命令重新开始追踪，导出的结果只包含最近一次命令
+        tracing.TRACER.enabled = bool(getattr(prefs, "trace_execution", False)) if prefs else False
+        tracing.TRACER.clear()
+        llm_config = planner_client.config_from_preferences(prefs)
+        if llm_config is not None:
             if llm_config.api_url and not use_llm and getattr(prefs, "use_llm_default", False):
                 use_llm = True
 
+        cache = None
+        if prefs is None or getattr(prefs, "plan_cache_enabled", True):
+            cache = plan_cache.get_default_cache(prefs)
+        return command, use_llm, llm_config, cache
+
+    def _execute_plan(self, plan: Plan) -> set[str]:
+        prefs = utils.get_preferences()
+        if prefs is None or getattr(prefs, "optimize_plans", True):
+            plan, report = optimizer.optimize_plan(plan)
+            if report.removed:
+                utils.get_logger(__name__).info("计划优化：%s", report.summary())
+        try:
+            if self._workers > 1:
+                scheduler.execute_scheduled(
+                    plan,
+                    backend=self._backend,
+                    workers=self._workers,
+                    transactional=self._transactional,
+                    undo_steps=self._undo_steps,
+                )
+            else:
+                executor.execute_plan(
+                    plan,
+                    backend=self._backend,
+                    transactional=self._transactional,
+                    undo_steps=self._undo_steps,
+                )
+        except Exception as exc:  # pragma: no cover - Blender 内部异常难测
+            self.report({"ERROR"}, f"执行失败: {exc}")
+            utils.get_logger(__name__).error("执行失败：%s", exc)
+            return {"CANCELLED"}
+        finally:
+            _log_trace_summary()
+
+        self.report({"INFO"}, "计划执行完成")
+        return {"FINISHED"}
+
+    def _plan_and_execute(
+        self,
+        command: str,
+        use_llm: bool,
+        llm_config: Optional[LLMConfig],
+        cache: Optional[plan_cache.PlanCache],
+    ) -> set[str]:
+        if use_llm and llm_config is not None and llm_config.stream:
+            try:
+                steps = planner_client.stream_command(command, llm_config=llm_config, cache=cache)
+                executor.execute_steps(steps, self._backend, self._transactional, self._undo_steps)
+            except Exception as exc:  # pragma: no cover - Blender 内部异常难测
+                self.report({"ERROR"}, f"执行失败: {exc}")
+                utils.get_logger(__name__).error("执行失败：%s", exc)
+                return {"CANCELLED"}
+            finally:
+                _log_trace_summary()
+            self.report({"INFO"}, "计划执行完成")
+            return {"FINISHED"}
         try:
-            plan = planner_client.parse_command(command, use_llm=use_llm, llm_config=llm_config)
-            executor.execute_plan(plan)
+            plan = planner_client.parse_command(
+                command, use_llm=use_llm, llm_config=llm_config, cache=cache
+            )
         except Exception as exc:  # pragma: no cover - Blender 内部异常难测
             self.report({"ERROR"}, f"执行失败: {exc}")
-            logger.error("执行失败：%s", exc)
+            utils.get_logger(__name__).error("执行失败：%s", exc)
+            return {"CANCELLED"}
+        return self._execute_plan(plan)
+
+    def execute(self, context: Context) -> set[str]:
+        return self._plan_and_execute(*self._planning_inputs(context))
+
+    def invoke(self, context: Context, event: bpy.types.Event) -> set[str]:
+        """界面调用时在后台线程规划，避免 LLM 请求期间界面卡死；计划仍在主线程执行。"""
+
+        if planning_jobs.active_job() is not None:
+            self.report({"WARNING"}, "已有命令正在规划，请等待完成或取消")
+            return {"CANCELLED"}
+        command, use_llm, llm_config, cache = self._planning_inputs(context)
+        if not use_llm:
+            # 规则规划是纯本地计算，直接同步执行
+            return self._plan_and_execute(command, use_llm, llm_config, cache)
+
+        self._job = planning_jobs.PlanningJob(
+            command,
+            use_llm=True,
+            llm_config=llm_config,
+            cache=cache,
+            planner=prefetch.prefetched_planner,
+        ).start()
+        planning_jobs.set_active_job(self._job)
+        if self._job.streaming:
+            # 流式步骤跨多次回调执行，句柄表在整条命令内有效
+            executor.reset_handles()
+        if self._job.streaming and self._transactional:
+            # 流式步骤分散在多次计时器回调中执行，事务跨回调保持
+            self._tx = transaction.Transaction().begin()
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(POLL_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        _redraw_panels(context)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context: Context, event: bpy.types.Event) -> set[str]:
+        job = self._job
+        if job is None:  # pragma: no cover - 防御性检查
+            return {"CANCELLED"}
+        if self._poll_planning(job, event):
+            return {"PASS_THROUGH"}
+
+        # 先读状态再取步骤：状态为结束时，所有步骤都已入队
+        state = job.state
+        self._drain_stream(job, state)
+        if self._rollback_error:
+            job.cancel()
+            self._finish(context)
+            self.report({"ERROR"}, f"执行失败: {self._rollback_error}")
+            return {"CANCELLED"}
+        if state == planning_jobs.RUNNING:
+            _redraw_panels(context)
+            return {"PASS_THROUGH"}
+
+        self._finish(context)
+        return self._finish_job(job, state)
+
+    def _poll_planning(self, job: planning_jobs.PlanningJob, event: bpy.types.Event) -> bool:
+        """处理 ESC 取消；规划仍在进行时返回 True，非计时器事件直接放行。"""
+
+        if event.type == "ESC" and event.value == "PRESS":
+            job.cancel()
+        return event.type != "TIMER" and job.state == planning_jobs.RUNNING
+
+    def _drain_stream(self, job: planning_jobs.PlanningJob, state: str) -> None:
+        if job.streaming and state != planning_jobs.CANCELLED:
+            self._run_streamed_steps(job.take_steps())
+
+    def _finish_job(self, job: planning_jobs.PlanningJob, state: str) -> set[str]:
+        """规划结束后的收尾：取消、失败、执行整份计划或提交流式执行的结果。"""
+
+        executed = self._success + self._failed
+        if self._tx is not None and state != planning_jobs.DONE:
+            # 事务模式下取消或规划失败都撤回已执行的步骤
+            self._tx.rollback()
+            executed = 0
+        if state == planning_jobs.CANCELLED:
+            if executed:
+                # 已执行的步骤保留在场景中，返回 FINISHED 让其进入撤销历史
+                self.report({"INFO"}, f"已取消命令，保留已执行的 {executed} 个步骤")
+                return {"FINISHED"}
+            self.report({"INFO"}, "已取消命令")
             return {"CANCELLED"}
+        if state == planning_jobs.FAILED:
+            self.report({"ERROR"}, f"执行失败: {job.error}")
+            utils.get_logger(__name__).error("规划失败：%s", job.error)
+            return {"FINISHED"} if executed else {"CANCELLED"}
+        utils.get_logger(__name__).info("后台规划完成，用时 %.2f 秒", job.elapsed)
+        if not job.streaming:
+            assert job.plan is not None
+            return self._execute_plan(job.plan)
+        return self._commit_stream()
 
+    def _commit_stream(self) -> set[str]:
+        if self._tx is not None:
+            self._tx.commit()
+        _log_trace_summary()
+        try:
+            executor.finish_execution(self._success, self._failed)
+        except executor.ExecutionError as exc:
+            self.report({"ERROR"}, f"执行失败: {exc}")
+            return {"FINISHED"}
         self.report({"INFO"}, "计划执行完成")
         return {"FINISHED"}
 
+    def _run_streamed_steps(self, steps: List[PlanStep]) -> None:
+        for step in steps:
+            index = self._success + self._failed + 1
+            if executor.run_step(index, step, self._backend, self._tx, self._undo_steps):
+                self._success += 1
+            elif self._tx is not None:
+                try:
+                    executor.rollback_execution(self._tx, index, self._success)
+                except executor.ExecutionError as exc:
+                    self._rollback_error = str(exc)
+                    utils.get_logger(__name__).error("执行失败：%s", exc)
+                return
+            else:
+                self._failed += 1
+
+    def cancel(self, context: Context) -> None:
+        # Blender 退出或加载新文件时调用
+        if self._job is not None:
+            self._job.cancel()
+        self._finish(context)
+
+    def _finish(self, context: Context) -> None:
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        if planning_jobs.active_job() is self._job:
+            planning_jobs.set_active_job(None)
+        _redraw_panels(context)
+
+
+class QKZNCancelAICommandOperator(Operator):  # type: ignore[misc]
+    """取消正在后台规划的命令。"""
+
+    bl_idname = "qkzn.cancel_ai_command"
+    bl_label = "取消 AI 命令"
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return planning_jobs.active_job() is not None
+
+    def execute(self, context: Context) -> set[str]:
+        if not planning_jobs.cancel_active_job():
+            return {"CANCELLED"}
+        self.report({"INFO"}, "正在取消命令")
+        return {"FINISHED"}
+
+
+class QKZNExportTraceOperator(Operator, ExportHelper):  # type: ignore[misc]
+    """把最近一次命令的执行追踪导出为 Chrome trace JSON。"""
+
+    bl_idname = "qkzn.export_trace"
+    bl_label = "导出执行追踪"
+
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={"HIDDEN"})  # type: ignore[valid-type]
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return bool(tracing.TRACER.events)
+
+    def execute(self, context: Context) -> set[str]:
+        path = tracing.TRACER.export_chrome_trace(self.filepath)
+        utils.get_logger(__name__).info("执行追踪汇总：\n%s", tracing.TRACER.format_summary())
+        self.report({"INFO"}, f"已导出执行追踪：{path}")
+        return {"FINISHED"}
+
 
 class QKZNClearLogOperator(Operator):
     """简单重置输入的操作符。"""
@@ -62,11 +334,29 @@ class QKZNClearLogOperator(Operator):
         return {"FINISHED"}
 
 
+class QKZNClearPlanCacheOperator(Operator):  # type: ignore[misc]
+    """清空内存与磁盘中的计划缓存。"""
+
+    bl_idname = "qkzn.clear_plan_cache"
+    bl_label = "清空计划缓存"
+
+    def execute(self, context: Context) -> set[str]:
+        plan_cache.get_default_cache().clear()
+        self.report({"INFO"}, "已清空计划缓存")
+        return {"FINISHED"}
+
+
 def register() -> None:
     bpy.utils.register_class(QKZNRunAICommandOperator)
+    bpy.utils.register_class(QKZNCancelAICommandOperator)
+    bpy.utils.register_class(QKZNExportTraceOperator)
     bpy.utils.register_class(QKZNClearLogOperator)
+    bpy.utils.register_class(QKZNClearPlanCacheOperator)
 
 
 def unregister() -> None:
+    bpy.utils.unregister_class(QKZNClearPlanCacheOperator)
     bpy.utils.unregister_class(QKZNClearLogOperator)
+    bpy.utils.unregister_class(QKZNExportTraceOperator)
+    bpy.utils.unregister_class(QKZNCancelAICommandOperator)
     bpy.utils.unregister_class(QKZNRunAICommandOperator)
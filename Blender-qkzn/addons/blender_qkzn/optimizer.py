@@ -0,0 +1,276 @@
+"""计划优化：在规划与执行之间改写步骤，去掉冗余操作，不依赖 bpy。
+
+执行器中的伪操作都作用于当前激活对象，而添加图元会把新对象设为激活对象，因此计划可以按
+“添加 + 后续作用于它的伪操作” 划分为片段。material.assign 与 object.move 只写入激活对象，
+同一片段内后写的覆盖先写的；但字典描述的材质会改写同名材质的节点参数，可能影响其他对象，不视为冗余。
+其他未知操作可能读写任意状态，作为屏障不跨越。
+带 target 的伪操作通过句柄作用于指定对象，不依赖激活对象，可以在屏障之间后移并按材质合并；
+同名材质有不同描述时，后写的参数覆盖先写的，这些赋值的先后不能调换，同样作为屏障。
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from . import materials
+from .schemas import Plan, PlanStep, validate_plan
+
+Pass = Callable[[List[PlanStep]], Tuple[List[PlanStep], int]]
+
+PSEUDO_OPS = ("material.assign", "object.move")
+
+
+def is_add(step: PlanStep) -> bool:
+    """网格图元添加操作：创建对象并设为激活对象，都接受 location 参数。"""
+
+    return step.op.startswith("mesh.primitive_") and step.op.endswith("_add")
+
+
+def _on_active(step: PlanStep) -> bool:
+    """作用于激活对象的伪操作；带 target 的伪操作可能与激活对象是同一对象，前两个优化步骤把它视为屏障。"""
+
+    return step.op in PSEUDO_OPS and step.target is None
+
+
+def _overwritable(step: PlanStep) -> bool:
+    """被同一对象上后续同类步骤覆盖后可以删除的步骤。
+
+    预设名或颜色词的材质参数固定，重复应用结果相同；字典描述会改写同名材质（未命名时为 QKZN_Custom），
+    被其他对象共用时删除它会改变结果。
+    """
+
+    return step.op == "object.move" or isinstance(step.args.get("spec"), str)
+
+
+def _valid_location(location: object) -> bool:
+    return (
+        isinstance(location, (list, tuple))
+        and len(location) == 3
+        and all(isinstance(value, (int, float)) for value in location)
+    )
+
+
+def _copy(step: PlanStep, **changes: object) -> PlanStep:
+    data = step.dict()
+    data["args"] = dict(step.args)
+    data.update(changes)
+    return PlanStep(**data)
+
+
+@dataclass
+class OptimizeReport:
+    """各优化步骤的计数。"""
+
+    steps_before: int = 0
+    steps_after: int = 0
+    dead_assignments: int = 0
+    fused_moves: int = 0
+    batched_adds: int = 0
+    batched_assignments: int = 0
+
+    @property
+    def removed(self) -> int:
+        return self.steps_before - self.steps_after
+
+    def summary(self) -> str:
+        return (
+            f"步骤 {self.steps_before} → {self.steps_after}（减少 {self.removed}）："
+            f"冗余赋值 {self.dead_assignments}，合并移动 {self.fused_moves}，批量添加 {self.batched_adds}，"
+            f"批量赋材质 {self.batched_assignments}"
+        )
+
+
+def eliminate_dead_assignments(steps: List[PlanStep]) -> Tuple[List[PlanStep], int]:
+    """同一片段内被后续同类步骤覆盖的 object.move 与预设/颜色材质赋值直接删除。"""
+
+    dead = set()
+    last: Dict[str, int] = {}
+    for index, step in enumerate(steps):
+        if _on_active(step):
+            previous = last.get(step.op)
+            if previous is not None and _overwritable(steps[previous]):
+                dead.add(previous)
+            last[step.op] = index
+        else:
+            # 添加图元切换激活对象，未知操作可能读取材质或位置，都会结束当前片段
+            last.clear()
+    return [step for index, step in enumerate(steps) if index not in dead], len(dead)
+
+
+def fuse_add_and_move(steps: List[PlanStep]) -> Tuple[List[PlanStep], int]:
+    """把添加后作用于新对象的 object.move 并入添加步骤的 location 参数。"""
+
+    result: List[PlanStep] = []
+    fused = 0
+    add_index: Optional[int] = None
+    for step in steps:
+        if is_add(step):
+            add_index = len(result)
+            result.append(step)
+            continue
+        if (
+            step.op == "object.move"
+            and step.target is None
+            and add_index is not None
+            and result[add_index].repeat == 1
+            and _valid_location(step.args.get("location"))
+        ):
+            add = result[add_index]
+            result[add_index] = _copy(
+                add, args={**add.args, "location": list(step.args["location"])}
+            )
+            fused += 1
+            continue
+        if not _on_active(step):
+            add_index = None
+        result.append(step)
+    return result, fused
+
+
+def batch_identical_adds(steps: List[PlanStep]) -> Tuple[List[PlanStep], int]:
+    """连续且参数相同的添加步骤合并为一个带 repeat 的步骤。"""
+
+    result: List[PlanStep] = []
+    merged = 0
+    for step in steps:
+        if result and is_add(step) and step.bind is None:
+            previous = result[-1]
+            if (
+                previous.op == step.op
+                and previous.args == step.args
+                and previous.backend == step.backend
+                and previous.bind is None
+            ):
+                result[-1] = _copy(previous, repeat=previous.repeat + step.repeat)
+                merged += 1
+                continue
+        result.append(step)
+    return result, merged
+
+
+def _spec_key(spec: object) -> str:
+    return json.dumps(spec, sort_keys=True, ensure_ascii=False, default=repr)
+
+
+def _conflicting_assignments(steps: Sequence[PlanStep]) -> Set[int]:
+    """同一材质名对应不同描述的 material.assign 下标：它们改写同一个共用材质，先后决定最终参数。"""
+
+    specs: Dict[str, Set[str]] = {}
+    names: Dict[int, str] = {}
+    for index, step in enumerate(steps):
+        if step.op != "material.assign":
+            continue
+        spec: Any = step.args.get("spec")
+        try:
+            name, _principled = materials.describe_spec(spec)
+        except TypeError:
+            continue
+        names[index] = name
+        specs.setdefault(name, set()).add(_spec_key(spec))
+    return {index for index, name in names.items() if len(specs[name]) > 1}
+
+
+def _untargeted_handles(region: List[PlanStep]) -> Optional[Set[object]]:
+    """区间内可能被未指定 target 的 material.assign 写入的对象；无法确定时返回 None。
+
+    这类赋值作用于片段内最近一次添加的对象：添加绑定了句柄时即该句柄，否则为一个匿名对象；
+    区间开头的激活对象未知，可能是任意句柄。列表形式的 target 同样记入，保持它们与单个赋值的先后。
+    """
+
+    touched: Set[object] = set()
+    current: Optional[object] = None
+    for step in region:
+        if is_add(step):
+            current = step.bind if step.bind is not None else object()
+        elif step.op == "material.assign":
+            if isinstance(step.target, list):
+                touched.update(step.target)
+            elif step.target is None:
+                if current is None:
+                    return None
+                touched.add(current)
+    return touched
+
+
+def _batch_region(region: List[PlanStep]) -> Tuple[List[PlanStep], int]:
+    touched = _untargeted_handles(region)
+    if touched is None:
+        return region, 0
+    movable = {
+        index
+        for index, step in enumerate(region)
+        if step.op == "material.assign"
+        and isinstance(step.target, str)
+        and step.target not in touched
+    }
+    # 每个句柄只保留最后一次赋值，再按材质分组，分组按首次出现的顺序排列
+    final: Dict[str, object] = {}
+    for index in sorted(movable):
+        target = region[index].target
+        if isinstance(target, str):
+            final[target] = region[index].args.get("spec")
+    groups: Dict[str, Tuple[object, List[str]]] = {}
+    for handle, spec in final.items():
+        groups.setdefault(_spec_key(spec), (spec, []))[1].append(handle)
+    if len(groups) == len(movable):
+        return region, 0
+
+    result = [step for index, step in enumerate(region) if index not in movable]
+    for spec, handles in groups.values():
+        target = handles[0] if len(handles) == 1 else handles
+        result.append(PlanStep(op="material.assign", args={"spec": spec}, target=target))
+    return result, len(movable) - len(groups)
+
+
+def batch_targeted_assignments(steps: List[PlanStep]) -> Tuple[List[PlanStep], int]:
+    """把屏障之间带 target 的 material.assign 后移到区间末尾，按材质合并为作用于多个句柄的一步。
+
+    同一句柄被后续赋值覆盖的步骤一并删除；句柄若还可能被作用于激活对象的赋值写入，则保持原位。
+    与其他赋值共用材质名但描述不同的赋值作为屏障，保持原位。
+    """
+
+    barriers = _conflicting_assignments(steps)
+    result: List[PlanStep] = []
+    region: List[PlanStep] = []
+    batched = 0
+
+    def flush() -> None:
+        nonlocal batched
+        steps_out, count = _batch_region(region)
+        result.extend(steps_out)
+        batched += count
+        region.clear()
+
+    for index, step in enumerate(steps):
+        if index not in barriers and (is_add(step) or step.op in PSEUDO_OPS):
+            region.append(step)
+        else:
+            flush()
+            result.append(step)
+    flush()
+    return result, batched
+
+
+DEFAULT_PASSES: Sequence[Tuple[str, Pass]] = (
+    ("dead_assignments", eliminate_dead_assignments),
+    ("fused_moves", fuse_add_and_move),
+    ("batched_adds", batch_identical_adds),
+    ("batched_assignments", batch_targeted_assignments),
+)
+
+
+def optimize_plan(
+    plan_input: object, passes: Sequence[Tuple[str, Pass]] = DEFAULT_PASSES
+) -> Tuple[Plan, OptimizeReport]:
+    """依次运行优化步骤，返回新计划与统计；原计划不会被修改。"""
+
+    plan = validate_plan(plan_input)
+    steps = list(plan.steps)
+    report = OptimizeReport(steps_before=len(steps))
+    for name, run in passes:
+        steps, count = run(steps)
+        setattr(report, name, getattr(report, name) + count)
+    report.steps_after = len(steps)
+    return Plan(steps=steps, backend=plan.backend), report
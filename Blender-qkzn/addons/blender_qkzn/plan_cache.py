@@ -0,0 +1,259 @@
+"""计划缓存：进程内 LRU 在前、sqlite 持久层在后，按规范化命令、规划模式与 LLM 地址索引。
+
+只有 LLM 生成的计划写入缓存，规则解析每次直接计算（见 planner_client.parse_command）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from . import utils
+from .schemas import Plan, validate_plan
+
+try:
+    import bpy
+except ImportError:  # pragma: no cover - 测试环境无 bpy
+    bpy = None  # type: ignore[assignment, unused-ignore]
+
+
+DEFAULT_MEMORY_SIZE = 128
+DEFAULT_MAX_ROWS = 2000
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600.0
+# 计划格式（PlanStep 字段、伪操作参数）变化时递增，旧版本写入的条目不再命中
+CACHE_VERSION = 1
+
+
+def normalize_command(text: str) -> str:
+    """统一全角/半角并压缩空白，仅在书写形式不同的命令共用缓存。"""
+
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def cache_key(text: str, mode: str, endpoint: Optional[str] = None) -> str:
+    """由缓存版本、规范化命令、规划模式与 LLM 地址生成缓存键。"""
+
+    material = json.dumps(
+        [CACHE_VERSION, normalize_command(text), mode, endpoint or ""], ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """缓存命中统计。"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+
+class PlanCache:
+    """两级计划缓存；命中时按存储的步骤重新构造 Plan，调用方修改计划不会污染缓存。"""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        memory_size: int = DEFAULT_MEMORY_SIZE,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # 磁盘条目数：打开数据库时统计一次，之后随写入、过期删除与裁剪增减，首选项重绘时直接读取
+        self._rows: Optional[int] = None
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # 规划可能在工作线程中进行，所有访问都在锁内完成
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "key TEXT PRIMARY KEY, created REAL NOT NULL, accessed REAL NOT NULL, steps TEXT NOT NULL)"
+            )
+            self._connection.commit()
+            self._rows = int(self._connection.execute("SELECT COUNT(*) FROM plans").fetchone()[0])
+        return self._connection
+
+    def _count(self, delta: int) -> None:
+        if self._rows is not None:
+            self._rows += delta
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl > 0 and now - created > self.ttl
+
+    def _remember(self, key: str, created: float, steps: str) -> None:
+        self._memory[key] = (created, steps)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Plan]:
+        """查找缓存，依次检查内存与磁盘，过期条目视为未命中。"""
+
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[0], now):
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return validate_plan(json.loads(entry[1]))
+            if entry is not None:
+                del self._memory[key]
+            db = self._db()
+            row = None
+            if db is not None:
+                row = db.execute(
+                    "SELECT created, steps FROM plans WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self._expired(row[0], now):
+                    db.execute("DELETE FROM plans WHERE key = ?", (key,))
+                    db.commit()
+                    self._count(-1)
+                    row = None
+                elif row is not None:
+                    db.execute("UPDATE plans SET accessed = ? WHERE key = ?", (now, key))
+                    db.commit()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, row[0], row[1])
+            return validate_plan(json.loads(row[1]))
+
+    def put(self, key: str, plan: Plan) -> None:
+        """写入两级缓存，并清理磁盘上过期的条目；条目数超过上限时才按访问时间裁剪。"""
+
+        raw: Any = [step.dict() for step in plan.steps]
+        if plan.backend is not None:
+            raw = {"steps": raw, "backend": plan.backend}
+        steps = json.dumps(raw, ensure_ascii=False)
+        now = self._clock()
+        with self._lock:
+            self._remember(key, now, steps)
+            db = self._db()
+            if db is None:
+                return
+            exists = db.execute("SELECT 1 FROM plans WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO plans (key, created, accessed, steps) VALUES (?, ?, ?, ?)",
+                (key, now, now, steps),
+            )
+            if exists is None:
+                self._count(1)
+            if self.ttl > 0:
+                expired = db.execute("DELETE FROM plans WHERE created < ?", (now - self.ttl,))
+                self._count(-expired.rowcount)
+            if self._rows is not None and self._rows > self.max_rows:
+                trimmed = db.execute(
+                    "DELETE FROM plans WHERE key NOT IN "
+                    "(SELECT key FROM plans ORDER BY accessed DESC LIMIT ?)",
+                    (self.max_rows,),
+                )
+                self._count(-trimmed.rowcount)
+            db.commit()
+
+    def clear(self) -> None:
+        """清空两级缓存与统计。"""
+
+        with self._lock:
+            self._memory.clear()
+            self.stats = CacheStats()
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM plans")
+                db.commit()
+                self._rows = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+                self._rows = None
+
+    def disk_entries(self) -> Optional[int]:
+        """磁盘条目数；不访问数据库，本次会话尚未打开数据库时返回 None。"""
+
+        return self._rows
+
+
+_DEFAULT_CACHE: Optional[PlanCache] = None
+
+
+def default_cache_path() -> Optional[Path]:
+    """Blender 用户配置目录下的缓存文件，无 bpy 时返回 None（仅用内存缓存）。"""
+
+    if bpy is None:
+        return None
+    config_dir = bpy.utils.user_resource("CONFIG", path="blender_qkzn", create=True)
+    return Path(config_dir) / "plan_cache.sqlite3"
+
+
+def get_default_cache(prefs: Optional[object] = None) -> PlanCache:
+    """获取插件共用的缓存实例，并按首选项更新 TTL 与容量。"""
+
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = PlanCache(default_cache_path())
+        utils.get_logger(__name__).debug("计划缓存位置：%s", _DEFAULT_CACHE.path)
+    if prefs is not None:
+        ttl_hours = getattr(prefs, "plan_cache_ttl_hours", None)
+        if ttl_hours is not None:
+            _DEFAULT_CACHE.ttl = float(ttl_hours) * 3600.0
+        max_rows = getattr(prefs, "plan_cache_max_entries", None)
+        if max_rows:
+            _DEFAULT_CACHE.max_rows = int(max_rows)
+    return _DEFAULT_CACHE
+
+
+def peek_default_cache() -> Optional[PlanCache]:
+    """已创建的共用缓存实例；不会创建实例或缓存目录，供界面绘制时读取。"""
+
+    return _DEFAULT_CACHE
+
+
+def release_default_cache() -> None:
+    """卸载插件时关闭数据库连接。"""
+
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is not None:
+        _DEFAULT_CACHE.close()
+        _DEFAULT_CACHE = None
+
+
+def describe_stats(cache: Optional[PlanCache]) -> List[str]:
+    """生成首选项面板中展示的统计文本；只读取内存中的计数，不访问数据库。"""
+
+    if cache is None:
+        return ["本次会话尚未使用计划缓存"]
+    stats = cache.stats
+    entries = cache.disk_entries()
+    return [
+        f"内存命中 {stats.memory_hits}，磁盘命中 {stats.disk_hits}，未命中 {stats.misses}",
+        f"命中率 {stats.hit_rate:.0%}，磁盘条目 {'未读取' if entries is None else entries}",
+    ]
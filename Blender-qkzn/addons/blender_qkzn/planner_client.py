@@ -3,36 +3,132 @@
 from __future__ import annotations
 
 import re
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from . import llm_client, utils
+from . import llm_client, materials, tracing, utils
+from .plan_cache import PlanCache, cache_key
 from .schemas import LLMConfig, Plan, PlanStep, validate_plan
 
+_PRIMITIVE_OPS: Dict[str, str] = {
+    "立方体": "mesh.primitive_cube_add",
+    "方块": "mesh.primitive_cube_add",
+    "cube": "mesh.primitive_cube_add",
+    "球体": "mesh.primitive_uv_sphere_add",
+    "圆球": "mesh.primitive_uv_sphere_add",
+}
 
-_COLOR_PATTERN = "|".join(utils.available_color_words())
-_MATERIAL_PATTERN = "玻璃|金属|木纹|塑料"
 
-_ADD_CUBE_RE = re.compile(
-    rf"添加(?:一个)?(?:(?P<material>{_MATERIAL_PATTERN})材质的)?(?:(?P<color>{_COLOR_PATTERN})的?)?(立方体|方块|cube)",
-    re.IGNORECASE,
-)
-_ADD_SPHERE_RE = re.compile(
-    rf"添加(?:一个)?(?:(?P<material>{_MATERIAL_PATTERN})(?:材质)?的?)?(?:(?P<color>{_COLOR_PATTERN})的?)?(球体|圆球)",
-    re.IGNORECASE,
-)
-_APPLY_MATERIAL_RE = re.compile(
-    rf"应用(?:.*?)(?P<material>{_MATERIAL_PATTERN})(?:材质)?",
-    re.IGNORECASE,
-)
-_MOVE_RE = re.compile(
-    r"移动到\s*X(?P<x>-?\d+(?:\.\d+)?)\s*Y(?P<y>-?\d+(?:\.\d+)?)\s*Z(?P<z>-?\d+(?:\.\d+)?)",
+def _alternation(words: Iterable[str]) -> str:
+    """按长度降序拼接候选词，保证较长的词优先匹配。"""
+
+    return "|".join(re.escape(word) for word in sorted(set(words), key=len, reverse=True))
+
+
+def _material_words() -> List[str]:
+    """读取材质预设中的别名；规则里统一允许可选的“材质”后缀，因此去掉别名自带的后缀。"""
+
+    words = []
+    for preset in materials.load_presets().values():
+        for alias in preset.get("aliases", []):
+            stem = alias[: -len("材质")] if alias.endswith("材质") else alias
+            if stem:
+                words.append(stem)
+    return words
+
+
+_COLOR_PATTERN = _alternation(utils.available_color_words())
+_MATERIAL_PATTERN = _alternation(_material_words())
+_SHAPE_PATTERN = _alternation(_PRIMITIVE_OPS)
+_NUMBER_PATTERN = r"-?\d+(?:\.\d+)?"
+# 规则之间允许的间隔：不跨越分句标点，也不越过其他规则的起始字面量，避免吞掉后续分句
+_CLAUSE_GAP = r"(?:(?!添加|应用|移动到)[^，。,;；\n])*?"
+
+
+def _add_steps(match: re.Match[str]) -> List[PlanStep]:
+    steps = [PlanStep(op=_PRIMITIVE_OPS[match.group("add_shape").lower()], args={})]
+    material = match.group("add_material")
+    color = match.group("add_color")
+    if material:
+        steps.append(PlanStep(op="material.assign", args={"spec": material}))
+    elif color:
+        steps.append(PlanStep(op="material.assign", args={"spec": color}))
+    return steps
+
+
+def _apply_steps(match: re.Match[str]) -> List[PlanStep]:
+    return [PlanStep(op="material.assign", args={"spec": match.group("apply_material")})]
+
+
+def _move_steps(match: re.Match[str]) -> List[PlanStep]:
+    location = (
+        float(match.group("move_x")),
+        float(match.group("move_y")),
+        float(match.group("move_z")),
+    )
+    return [PlanStep(op="object.move", args={"location": location})]
+
+
+# 每条规则为 (规则名, 起始字面量, 其余模式, 处理函数)。所有分支以字面量开头，
+# 组合后的正则可以按首字符集合直接跳过无关文本；内部分组需以规则名为前缀，避免合并后重名
+_RULES: List[Tuple[str, str, str, Callable[[re.Match[str]], List[PlanStep]]]] = [
+    (
+        "add",
+        "添加",
+        rf"(?:一个)?(?:(?P<add_material>{_MATERIAL_PATTERN})(?:材质)?的?)?"
+        rf"(?:(?P<add_color>{_COLOR_PATTERN})的?)?(?P<add_shape>{_SHAPE_PATTERN})",
+        _add_steps,
+    ),
+    (
+        "apply",
+        "应用",
+        rf"{_CLAUSE_GAP}(?P<apply_material>{_MATERIAL_PATTERN})(?:材质)?",
+        _apply_steps,
+    ),
+    (
+        "move",
+        "移动到",
+        rf"\s*X(?P<move_x>{_NUMBER_PATTERN})\s*Y(?P<move_y>{_NUMBER_PATTERN})\s*Z(?P<move_z>{_NUMBER_PATTERN})",
+        _move_steps,
+    ),
+]
+_RULE_HANDLERS = {name: handler for name, _prefix, _pattern, handler in _RULES}
+_COMMAND_RE = re.compile(
+    "|".join(
+        f"{re.escape(prefix)}(?P<{name}>{pattern})" for name, prefix, pattern, _handler in _RULES
+    ),
     re.IGNORECASE,
 )
 
 
-def parse_command(text: str, use_llm: bool = False, llm_config: Optional[LLMConfig] = None) -> Plan:
-    """将中文命令解析为 Plan，如果启用 LLM 则优先调用外部接口。"""
+def match_steps(text: str) -> List[PlanStep]:
+    """单次扫描文本，按出现顺序生成规则匹配到的步骤。"""
+
+    steps: List[PlanStep] = []
+    for match in _COMMAND_RE.finditer(text):
+        # 每个分支都是命名分组，lastgroup 不会为 None
+        steps.extend(_RULE_HANDLERS[str(match.lastgroup)](match))
+    return steps
+
+
+def parse_command(
+    text: str,
+    use_llm: bool = False,
+    llm_config: Optional[LLMConfig] = None,
+    cache: Optional[PlanCache] = None,
+) -> Plan:
+    """将中文命令解析为 Plan，如果启用 LLM 则优先调用外部接口。
 
+    传入 cache 时先按 (规范化命令, LLM 地址) 查找缓存。只缓存 LLM 计划：规则解析本身不到一毫秒，
+    写 sqlite 反而更慢，且规则更新后旧计划不会残留；LLM 失败回退得到的规则计划也不缓存，下次仍会重试 LLM。
+    """
+
+    with tracing.span("parse_command", "planning", {"use_llm": use_llm}):
+        return _parse_command(text, use_llm, llm_config, cache)
+
+
+def _parse_command(
+    text: str, use_llm: bool, llm_config: Optional[LLMConfig], cache: Optional[PlanCache]
+) -> Plan:
     cleaned = text.strip()
     if not cleaned:
         raise ValueError("请输入有效的命令文本")
@@ -40,55 +136,81 @@ def parse_command(text: str, use_llm: bool = False, llm_config: Optional[LLMConf
     logger = utils.get_logger(__name__)
 
     if use_llm:
+        config = llm_config or LLMConfig(api_url=None, api_key=None, timeout=30)
+        llm_key = cache_key(cleaned, "llm", config.api_url)
+        cached = cache.get(llm_key) if cache is not None else None
+        if cached is not None:
+            logger.info("命中计划缓存（LLM）")
+            return cached
         try:
-            config = llm_config or LLMConfig(api_url=None, api_key=None, timeout=30)
             plan_obj = llm_client.generate_plan(cleaned, config)
             logger.info("LLM 解析成功，返回计划")
-            return validate_plan(plan_obj)
+            plan = validate_plan(plan_obj)
+            if cache is not None:
+                cache.put(llm_key, plan)
+            return plan
         except Exception as exc:  # pragma: no cover - 网络相关异常在测试中难模拟
             logger.warning("LLM 解析失败，回退到规则解析：%s", exc)
 
-    steps: List[PlanStep] = []
-
-    for match in _ADD_CUBE_RE.finditer(cleaned):
-        color = match.group("color")
-        material = match.group("material")
-        steps.append(PlanStep(op="mesh.primitive_cube_add", args={}))
-        if material:
-            steps.append(PlanStep(op="material.assign", args={"spec": material}))
-        if color and not material:
-            steps.append(PlanStep(op="material.assign", args={"spec": color}))
-
-    for match in _ADD_SPHERE_RE.finditer(cleaned):
-        color = match.group("color")
-        material = match.group("material")
-        steps.append(PlanStep(op="mesh.primitive_uv_sphere_add", args={}))
-        if material:
-            steps.append(PlanStep(op="material.assign", args={"spec": material}))
-        if color and not material:
-            steps.append(PlanStep(op="material.assign", args={"spec": color}))
-
-    for match in _APPLY_MATERIAL_RE.finditer(cleaned):
-        material = match.group("material")
-        steps.append(PlanStep(op="material.assign", args={"spec": material}))
-
-    move_match = _MOVE_RE.search(cleaned)
-    if move_match:
-        steps.append(
-            PlanStep(
-                op="object.move",
-                args={
-                    "location": (
-                        float(move_match.group("x")),
-                        float(move_match.group("y")),
-                        float(move_match.group("z")),
-                    )
-                },
-            )
-        )
+    steps = match_steps(cleaned)
 
     if not steps:
         raise ValueError("未能解析命令，请尝试更简单的描述或启用 LLM")
 
     logger.info("规则解析生成 %d 步计划", len(steps))
     return Plan(steps=steps)
+
+
+def stream_command(
+    text: str,
+    llm_config: Optional[LLMConfig] = None,
+    cache: Optional[PlanCache] = None,
+) -> Iterator[PlanStep]:
+    """流式规划：LLM 每返回一个步骤就立即产出，流结束后把完整计划写入缓存。
+
+    缓存命中时直接产出缓存的步骤；在收到第一个步骤之前失败会回退到规则解析，
+    之后的失败则继续抛出，因为前面的步骤可能已经执行。
+    """
+
+    cleaned = text.strip()
+    if not cleaned:
+        raise ValueError("请输入有效的命令文本")
+
+    logger = utils.get_logger(__name__)
+    config = llm_config or LLMConfig(api_url=None, api_key=None, timeout=30)
+    llm_key = cache_key(cleaned, "llm", config.api_url)
+    cached = cache.get(llm_key) if cache is not None else None
+    if cached is not None:
+        logger.info("命中计划缓存（LLM）")
+        yield from cached.steps
+        return
+
+    steps: List[PlanStep] = []
+    try:
+        for step in llm_client.stream_plan(cleaned, config):
+            steps.append(step)
+            yield step
+    except Exception as exc:
+        if steps:
+            raise
+        logger.warning("LLM 流式解析失败，回退到规则解析：%s", exc)
+        yield from parse_command(cleaned, cache=cache).steps
+        return
+
+    if cache is not None:
+        cache.put(llm_key, Plan(steps=steps))
+
+
+def config_from_preferences(prefs: Optional[object]) -> Optional[LLMConfig]:
+    """根据插件首选项构造 LLM 配置，没有首选项时返回 None。"""
+
+    if not prefs:
+        return None
+    return LLMConfig(
+        api_url=getattr(prefs, "api_url", None) or None,
+        api_key=getattr(prefs, "api_key", None) or None,
+        timeout=int(getattr(prefs, "timeout", 30)),
+        connect_timeout=float(getattr(prefs, "connect_timeout", 5.0)),
+        max_retries=int(getattr(prefs, "max_retries", 2)),
+        stream=bool(getattr(prefs, "stream_plan", False)),
+    )
@@ -0,0 +1,152 @@
+"""后台规划任务：在工作线程中请求 LLM，主线程轮询结果后再执行计划。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional
+
+from . import planner_client, utils
+from .plan_cache import PlanCache
+from .schemas import LLMConfig, Plan, PlanStep
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+Planner = Callable[..., Plan]
+Streamer = Callable[..., Iterator[PlanStep]]
+
+
+class PlanningJob:
+    """单条命令的后台规划任务。
+
+    bpy 只能在主线程使用，因此线程里只做文本到计划的转换；取消时无法中断正在进行的 HTTP 请求，
+    只会丢弃其结果。LLM 配置启用流式计划时，到达的步骤放入队列，主线程通过 take_steps 边收边执行。
+    """
+
+    def __init__(
+        self,
+        command: str,
+        use_llm: bool = False,
+        llm_config: Optional[LLMConfig] = None,
+        cache: Optional[PlanCache] = None,
+        planner: Planner = planner_client.parse_command,
+        streamer: Streamer = planner_client.stream_command,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.command = command
+        self.use_llm = use_llm
+        self.llm_config = llm_config
+        self.cache = cache
+        self.plan: Optional[Plan] = None
+        self.error: Optional[BaseException] = None
+        self.streaming = bool(use_llm and llm_config is not None and llm_config.stream)
+        self._planner = planner
+        self._streamer = streamer
+        self._pending: Deque[PlanStep] = deque()
+        self.received = 0
+        self._clock = clock
+        self._started = clock()
+        self._finished: Optional[float] = None
+        self._state = RUNNING
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="qkzn-planning", daemon=True)
+
+    def start(self) -> "PlanningJob":
+        self._started = self._clock()
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            if self.streaming:
+                plan = self._stream()
+            else:
+                plan = self._planner(
+                    self.command, use_llm=self.use_llm, llm_config=self.llm_config, cache=self.cache
+                )
+        except BaseException as exc:  # noqa: BLE001 - 异常交给主线程报告
+            self._finish(FAILED, error=exc)
+        else:
+            self._finish(DONE, plan=plan)
+
+    def _stream(self) -> Optional[Plan]:
+        steps: List[PlanStep] = []
+        for step in self._streamer(self.command, llm_config=self.llm_config, cache=self.cache):
+            if self.state != RUNNING:
+                # 已取消：停止读取，关闭生成器时连接随之释放
+                return None
+            steps.append(step)
+            self._pending.append(step)
+            self.received += 1
+        return Plan(steps=steps)
+
+    def take_steps(self) -> List[PlanStep]:
+        """取出流式模式下已到达但尚未执行的步骤（主线程调用）。"""
+
+        taken: List[PlanStep] = []
+        while self._pending:
+            taken.append(self._pending.popleft())
+        return taken
+
+    def _finish(
+        self, state: str, plan: Optional[Plan] = None, error: Optional[BaseException] = None
+    ) -> None:
+        with self._lock:
+            if self._state != RUNNING:
+                return
+            self._state = state
+            self.plan = plan
+            self.error = error
+            self._finished = self._clock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    @property
+    def elapsed(self) -> float:
+        end = self._finished if self._finished is not None else self._clock()
+        return end - self._started
+
+    def cancel(self) -> bool:
+        """请求取消；任务已结束时返回 False。"""
+
+        with self._lock:
+            if self._state != RUNNING:
+                return False
+            self._state = CANCELLED
+            self._finished = self._clock()
+        utils.get_logger(__name__).info("已取消规划：%s", self.command)
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        """阻塞等待线程结束（用于测试与无界面脚本）。"""
+
+        self._thread.join(timeout)
+        return self.state
+
+
+_ACTIVE_JOB: Optional[PlanningJob] = None
+
+
+def active_job() -> Optional[PlanningJob]:
+    """当前正在规划的任务，面板据此显示进度。"""
+
+    return _ACTIVE_JOB
+
+
+def set_active_job(job: Optional[PlanningJob]) -> None:
+    global _ACTIVE_JOB
+    _ACTIVE_JOB = job
+
+
+def cancel_active_job() -> bool:
+    """取消当前任务，没有任务时返回 False。"""
+
+    job = _ACTIVE_JOB
+    return job.cancel() if job is not None else False
@@ -0,0 +1,184 @@
+"""输入预取：用户编辑命令时防抖后在后台请求 LLM，按下执行时直接复用结果。"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Tuple
+
+from . import llm_client, plan_cache, planner_client, utils
+from .plan_cache import PlanCache, cache_key
+from .schemas import LLMConfig, Plan, validate_plan
+
+DEFAULT_DELAY = 0.6
+DEFAULT_SIZE = 8
+
+Generator = Callable[[str, LLMConfig], Any]
+TimerFactory = Callable[[float, Callable[[], None]], Any]
+
+
+def _thread_timer(delay: float, callback: Callable[[], None]) -> threading.Timer:
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    return timer
+
+
+class Prefetcher:
+    """防抖的投机预取器。
+
+    每次输入变化都会取消尚未触发的计时器；请求返回时若输入已不是该命令则丢弃结果。
+    正在进行的 HTTP 请求无法中断，只能丢弃。结果保存在一个小型 LRU 中，同时写入计划缓存（如有）。
+    """
+
+    def __init__(
+        self,
+        delay: float = DEFAULT_DELAY,
+        size: int = DEFAULT_SIZE,
+        generator: Generator = llm_client.generate_plan,
+        timer_factory: TimerFactory = _thread_timer,
+    ) -> None:
+        self.delay = delay
+        self.size = size
+        self.requests = 0
+        self.discarded = 0
+        self._generator = generator
+        self._timer_factory = timer_factory
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._current: Optional[str] = None
+        self._timer: Optional[Any] = None
+        self._inflight: Optional[Tuple[str, "Future[Optional[Plan]]"]] = None
+        self._results: "OrderedDict[str, Plan]" = OrderedDict()
+
+    @staticmethod
+    def key(text: str, cfg: LLMConfig) -> str:
+        return cache_key(text.strip(), "llm", cfg.api_url)
+
+    def schedule(self, text: str, cfg: LLMConfig, cache: Optional[PlanCache] = None) -> None:
+        """输入变化时调用：重置防抖计时器，静止 delay 秒后才真正发起请求。"""
+
+        cleaned = text.strip()
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not cleaned or not cfg.api_url:
+                self._current = None
+                return
+            key = self.key(cleaned, cfg)
+            self._current = key
+            if key in self._results or (self._inflight is not None and self._inflight[0] == key):
+                return
+            self._timer = self._timer_factory(
+                self.delay, lambda: self._fire(generation, cleaned, cfg, cache)
+            )
+            self._timer.start()
+
+    def _fire(self, generation: int, text: str, cfg: LLMConfig, cache: Optional[PlanCache]) -> None:
+        key = self.key(text, cfg)
+        future: "Future[Optional[Plan]]" = Future()
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._timer = None
+            self._inflight = (key, future)
+            self.requests += 1
+        logger = utils.get_logger(__name__)
+        logger.debug("预取命令：%s", text)
+        plan: Optional[Plan]
+        try:
+            plan = validate_plan(self._generator(text, cfg))
+        except Exception as exc:  # noqa: BLE001 - 预取失败不影响正常执行
+            logger.debug("预取失败：%s", exc)
+            plan = None
+        with self._lock:
+            if self._inflight is not None and self._inflight[1] is future:
+                self._inflight = None
+            if plan is not None and key != self._current:
+                self.discarded += 1
+                plan = None
+            if plan is not None:
+                self._results[key] = plan
+                self._results.move_to_end(key)
+                while len(self._results) > self.size:
+                    self._results.popitem(last=False)
+        if plan is not None and cache is not None:
+            cache.put(key, plan)
+        future.set_result(plan)
+
+    def take(self, text: str, cfg: LLMConfig, timeout: Optional[float] = None) -> Optional[Plan]:
+        """取出已预取的计划；同一命令的请求仍在进行时最多等待 timeout 秒。"""
+
+        key = self.key(text, cfg)
+        with self._lock:
+            plan = self._results.pop(key, None)
+            inflight = self._inflight
+        if plan is not None:
+            return plan
+        if inflight is None or inflight[0] != key or timeout == 0:
+            return None
+        try:
+            return inflight[1].result(timeout)
+        except Exception:  # noqa: BLE001 - 等待超时视为未命中
+            return None
+
+    def cancel(self) -> None:
+        """取消待触发的请求并使进行中的请求失效。"""
+
+        with self._lock:
+            self._generation += 1
+            self._current = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def clear(self) -> None:
+        self.cancel()
+        with self._lock:
+            self._results.clear()
+
+
+PREFETCHER = Prefetcher()
+
+
+def prefetched_planner(
+    command: str,
+    use_llm: bool = False,
+    llm_config: Optional[LLMConfig] = None,
+    cache: Optional[PlanCache] = None,
+) -> Plan:
+    """后台规划任务使用的规划函数：优先复用预取结果，否则正常规划。"""
+
+    if use_llm and llm_config is not None and llm_config.api_url:
+        plan = PREFETCHER.take(command, llm_config, timeout=float(llm_config.timeout))
+        if plan is not None:
+            utils.get_logger(__name__).info("命中预取结果")
+            return plan
+    return planner_client.parse_command(
+        command, use_llm=use_llm, llm_config=llm_config, cache=cache
+    )
+
+
+def on_input_update(scene: Any, _context: Any) -> None:
+    """Scene.ai_input 的 update 回调，仅在首选项启用预取且本次会使用 LLM 时生效。
+
+    属性以 TEXTEDIT_UPDATE 注册，输入框每次编辑都会调用，由 PREFETCHER 防抖。
+    """
+
+    prefs = utils.get_preferences()
+    if prefs is None or not getattr(prefs, "prefetch_enabled", False):
+        return
+    cfg = planner_client.config_from_preferences(prefs)
+    use_llm = bool(getattr(scene, "ai_use_llm", False)) or bool(
+        getattr(prefs, "use_llm_default", False)
+    )
+    if cfg is None or cfg.stream or not use_llm:
+        return
+    PREFETCHER.delay = float(getattr(prefs, "prefetch_delay", DEFAULT_DELAY))
+    cache = None
+    if getattr(prefs, "plan_cache_enabled", True):
+        cache = plan_cache.get_default_cache(prefs)
+    PREFETCHER.schedule(getattr(scene, "ai_input", ""), cfg, cache)
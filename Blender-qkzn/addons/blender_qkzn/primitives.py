@@ -0,0 +1,312 @@
+"""数据 API 图元：不经过 bpy.ops，直接用 bpy.data 构建网格并链接到集合。
+
+bpy.ops 每次调用都要准备上下文、压入撤销并更新场景，场景对象越多越慢；这里的构建只与图元自身大小相关。
+几何与 bpy.ops 默认参数一致（尺寸、顶点与面数、朝外的法线、对象与网格名称），UV 为简单展开，
+并非 Blender 的立方体十字布局。
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+try:
+    import bpy
+except ImportError:  # pragma: no cover - 测试环境无 bpy
+    bpy = None  # type: ignore[assignment, unused-ignore]
+
+Vector3 = Tuple[float, float, float]
+# (顶点坐标, 面的顶点索引, 每个面角的 UV)
+Geometry = Tuple[List[Vector3], List[Tuple[int, ...]], List[Tuple[float, float]]]
+# 写入网格用的扁平数组：(顶点坐标, 面角的顶点索引, 面的起始面角, 面的面角数, 面角 UV)；
+# 主线程计算时为列表，进程池返回的结果打包为 array
+MeshArrays = Tuple[Sequence[float], Sequence[int], Sequence[int], Sequence[int], Sequence[float]]
+GeometryKey = Tuple[str, Tuple[Tuple[str, Hashable], ...]]
+
+_TRANSFORM_ARGS = frozenset(
+    {"location", "rotation", "scale", "align", "enter_editmode", "calc_uvs"}
+)
+
+# 与 bmesh 立方体图元一致的顶点顺序与面
+_CUBE_FACES = ((0, 1, 3, 2), (2, 3, 7, 6), (6, 7, 5, 4), (4, 5, 1, 0), (2, 6, 4, 0), (7, 3, 1, 5))
+_QUAD_UVS = ((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0))
+
+
+def cube_geometry(size: float = 2.0) -> Geometry:
+    half = size / 2.0
+    verts = [(x * half, y * half, z * half) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]
+    uvs = [uv for _face in _CUBE_FACES for uv in _QUAD_UVS]
+    return verts, list(_CUBE_FACES), uvs
+
+
+def plane_geometry(size: float = 2.0) -> Geometry:
+    half = size / 2.0
+    verts = [(-half, -half, 0.0), (half, -half, 0.0), (half, half, 0.0), (-half, half, 0.0)]
+    return verts, [(0, 1, 2, 3)], list(_QUAD_UVS)
+
+
+def uv_sphere_geometry(segments: int = 32, ring_count: int = 16, radius: float = 1.0) -> Geometry:
+    """经纬球：两极各一个顶点，极点处为三角形，其余为四边形。"""
+
+    verts: List[Vector3] = [(0.0, 0.0, radius)]
+    for ring in range(1, ring_count):
+        theta = math.pi * ring / ring_count
+        z = radius * math.cos(theta)
+        r = radius * math.sin(theta)
+        for segment in range(segments):
+            phi = 2.0 * math.pi * segment / segments
+            verts.append((r * math.cos(phi), r * math.sin(phi), z))
+    bottom = len(verts)
+    verts.append((0.0, 0.0, -radius))
+
+    def ring_vertex(ring: int, segment: int) -> int:
+        return 1 + (ring - 1) * segments + segment % segments
+
+    faces: List[Tuple[int, ...]] = []
+    uvs: List[Tuple[float, float]] = []
+    for segment in range(segments):
+        u0 = segment / segments
+        u1 = (segment + 1) / segments
+        v_top = 1.0 - 1.0 / ring_count
+        faces.append((0, ring_vertex(1, segment), ring_vertex(1, segment + 1)))
+        uvs.extend((((u0 + u1) / 2.0, 1.0), (u0, v_top), (u1, v_top)))
+        for ring in range(1, ring_count - 1):
+            v0 = 1.0 - ring / ring_count
+            v1 = 1.0 - (ring + 1) / ring_count
+            faces.append(
+                (
+                    ring_vertex(ring, segment),
+                    ring_vertex(ring + 1, segment),
+                    ring_vertex(ring + 1, segment + 1),
+                    ring_vertex(ring, segment + 1),
+                )
+            )
+            uvs.extend(((u0, v0), (u0, v1), (u1, v1), (u1, v0)))
+        v_bottom = 1.0 / ring_count
+        faces.append(
+            (ring_vertex(ring_count - 1, segment), bottom, ring_vertex(ring_count - 1, segment + 1))
+        )
+        uvs.extend(((u0, v_bottom), ((u0 + u1) / 2.0, 0.0), (u1, v_bottom)))
+    return verts, faces, uvs
+
+
+def cylinder_geometry(vertices: int = 32, radius: float = 1.0, depth: float = 2.0) -> Geometry:
+    """侧面为四边形，两端为 n 边形封口。"""
+
+    half = depth / 2.0
+    verts: List[Vector3] = []
+    for index in range(vertices):
+        phi = 2.0 * math.pi * index / vertices
+        x, y = radius * math.cos(phi), radius * math.sin(phi)
+        verts.extend(((x, y, -half), (x, y, half)))
+    faces: List[Tuple[int, ...]] = []
+    uvs: List[Tuple[float, float]] = []
+    for index in range(vertices):
+        nxt = (index + 1) % vertices
+        faces.append((2 * index, 2 * nxt, 2 * nxt + 1, 2 * index + 1))
+        u0, u1 = index / vertices, (index + 1) / vertices
+        uvs.extend(((u0, 0.0), (u1, 0.0), (u1, 0.5), (u0, 0.5)))
+    cap_uv = []
+    for index in range(vertices):
+        phi = 2.0 * math.pi * index / vertices
+        cap_uv.append((0.5 + 0.25 * math.cos(phi), 0.75 + 0.25 * math.sin(phi)))
+    faces.append(tuple(2 * index + 1 for index in range(vertices)))
+    uvs.extend(cap_uv)
+    faces.append(tuple(2 * index for index in reversed(range(vertices))))
+    uvs.extend(reversed(cap_uv))
+    return verts, faces, uvs
+
+
+class Primitive:
+    """一种数据 API 图元：bpy.ops 路径、默认名称、几何函数及其接受的参数。"""
+
+    def __init__(
+        self,
+        op: str,
+        name: str,
+        geometry: Callable[..., Geometry],
+        params: Sequence[str],
+        vertex_count: Callable[..., int],
+    ) -> None:
+        self.op = op
+        self.name = name
+        self.geometry = geometry
+        self.params: FrozenSet[str] = frozenset(params)
+        # 由尺寸参数估算顶点数，不必生成几何即可判断计算量
+        self.vertex_count = vertex_count
+
+    def supports(self, args: Dict[str, Any]) -> bool:
+        """参数超出支持范围（如 enter_editmode=True、对齐视图）时应回退到 bpy.ops。"""
+
+        if args.get("enter_editmode") or args.get("align", "WORLD") != "WORLD":
+            return False
+        return all(key in self.params or key in _TRANSFORM_ARGS for key in args)
+
+
+PRIMITIVES: Dict[str, Primitive] = {
+    primitive.op: primitive
+    for primitive in (
+        Primitive("mesh.primitive_cube_add", "Cube", cube_geometry, ("size",), lambda **_: 8),
+        Primitive("mesh.primitive_plane_add", "Plane", plane_geometry, ("size",), lambda **_: 4),
+        Primitive(
+            "mesh.primitive_uv_sphere_add",
+            "Sphere",
+            uv_sphere_geometry,
+            ("segments", "ring_count", "radius"),
+            lambda segments=32, ring_count=16, **_: segments * (ring_count - 1) + 2,
+        ),
+        Primitive(
+            "mesh.primitive_cylinder_add",
+            "Cylinder",
+            cylinder_geometry,
+            ("vertices", "radius", "depth"),
+            lambda vertices=32, **_: vertices * 2,
+        ),
+    )
+}
+
+
+def mesh_arrays(geometry: Geometry) -> MeshArrays:
+    """把几何展开为 foreach_set 需要的扁平数组，纯 Python 计算，可在其他线程或进程中执行。"""
+
+    verts, faces, uvs = geometry
+    loop_vertices = [index for face in faces for index in face]
+    loop_starts: List[int] = []
+    start = 0
+    for face in faces:
+        loop_starts.append(start)
+        start += len(face)
+    return (
+        [value for vert in verts for value in vert],
+        loop_vertices,
+        loop_starts,
+        [len(face) for face in faces],
+        [value for uv in uvs for value in uv],
+    )
+
+
+def geometry_key(op: str, args: Dict[str, Any]) -> Optional[GeometryKey]:
+    """几何只由图元类型与尺寸参数决定；参数不可哈希时返回 None。"""
+
+    primitive = PRIMITIVES.get(op)
+    if primitive is None:
+        return None
+    params = tuple(sorted((key, value) for key, value in args.items() if key in primitive.params))
+    try:
+        hash(params)
+    except TypeError:
+        return None
+    return op, params
+
+
+def geometry_vertices(key: GeometryKey) -> int:
+    """估算 geometry_key 对应几何的顶点数。"""
+
+    op, params = key
+    return PRIMITIVES[op].vertex_count(**dict(params))
+
+
+def build_arrays(key: GeometryKey) -> MeshArrays:
+    """按 geometry_key 生成网格数组；模块级函数，可提交到进程池。
+
+    结果打包为 array：跨进程传输时按字节序列化，比逐个序列化列表元素快一个数量级，数值与列表完全相同。
+    """
+
+    op, params = key
+    coords, loop_vertices, loop_starts, loop_totals, uvs = mesh_arrays(
+        PRIMITIVES[op].geometry(**dict(params))
+    )
+    return (
+        array("d", coords),
+        array("i", loop_vertices),
+        array("i", loop_starts),
+        array("i", loop_totals),
+        array("d", uvs),
+    )
+
+
+_PREPARED: Dict[GeometryKey, MeshArrays] = {}
+
+
+@contextmanager
+def use_prepared(arrays: Dict[GeometryKey, MeshArrays]) -> Iterator[None]:
+    """在上下文内让 add_primitive 直接使用预先算好的网格数组。"""
+
+    global _PREPARED
+    previous, _PREPARED = _PREPARED, arrays
+    try:
+        yield
+    finally:
+        _PREPARED = previous
+
+
+def write_mesh(mesh: Any, arrays: MeshArrays) -> Any:
+    """用 foreach_set 一次性写入顶点、面角与面，并生成 UV 层。"""
+
+    coords, loop_vertices, loop_starts, loop_totals, uvs = arrays
+    mesh.vertices.add(len(coords) // 3)
+    mesh.loops.add(len(loop_vertices))
+    mesh.polygons.add(len(loop_starts))
+    mesh.vertices.foreach_set("co", coords)
+    mesh.loops.foreach_set("vertex_index", loop_vertices)
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    if not bpy.types.MeshPolygon.bl_rna.properties[
+        "loop_total"
+    ].is_readonly:  # Blender 4.0 起由 loop_start 推导
+        mesh.polygons.foreach_set("loop_total", loop_totals)
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    uv_layer.data.foreach_set("uv", uvs)
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def fill_mesh(mesh: Any, geometry: Geometry) -> Any:
+    """把几何写入网格。"""
+
+    return write_mesh(mesh, mesh_arrays(geometry))
+
+
+def add_primitive(
+    op: str, args: Dict[str, Any], context: Optional[Any] = None, count: int = 1
+) -> Any:
+    """与 bpy.ops 图元等效：新对象放在 3D 游标处（或 location），链接到活动集合并成为唯一选中的活动对象。
+
+    count 大于 1 时几何只计算一次，但每个对象仍有独立的网格，与多次调用操作符的结果相同；返回最后一个对象。
+    在 use_prepared 上下文中会优先使用预先算好的网格数组。
+    """
+
+    if bpy is None:
+        raise RuntimeError("当前环境缺少 bpy，无法创建图元")
+    primitive = PRIMITIVES[op]
+    context = context or bpy.context
+    key = geometry_key(op, args)
+    arrays = _PREPARED.get(key) if key is not None else None
+    if arrays is None:
+        params = {name: value for name, value in args.items() if name in primitive.params}
+        arrays = mesh_arrays(primitive.geometry(**params))
+    obj = None
+    for _ in range(count):
+        mesh = write_mesh(bpy.data.meshes.new(primitive.name), arrays)
+        obj = bpy.data.objects.new(primitive.name, mesh)
+        obj.location = args.get("location", context.scene.cursor.location)
+        obj.rotation_euler = args.get("rotation", (0.0, 0.0, 0.0))
+        obj.scale = args.get("scale", (1.0, 1.0, 1.0))
+        context.collection.objects.link(obj)
+        for selected in context.selected_objects:
+            selected.select_set(False)
+        obj.select_set(True)
+        context.view_layer.objects.active = obj
+    return obj
@@ -0,0 +1,275 @@
+"""计划调度：把计划分析为按对象划分的步骤链，按链的顺序在进程池中准备几何，并按计划顺序流水线式地提交。
+
+执行器中的伪操作都作用于激活对象，添加图元会切换激活对象，因此计划天然划分为
+“添加 + 后续作用于它的伪操作” 的对象链；执行前就存在的伪操作作用于原激活对象，单独成链；
+其他 bpy.ops 可能读写任意状态，作为屏障依赖之前的所有链，之后的链又依赖它。
+带 target 的伪操作通过句柄作用于指定对象，归入绑定该句柄的链；作用于多个句柄时单独成链，依赖各句柄所在的链。
+链的编号顺序即一个拓扑序，几何按这个顺序提交到进程池。主线程仍按计划顺序提交步骤：
+不同链的材质赋值可能改写同一个具名材质（未命名的字典描述都对应 QKZN_Custom），调换顺序会改变结果。
+添加步骤只等待自己的几何，后面的几何在前面的步骤写入 bpy.data 时继续计算。
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pickle import PicklingError
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import executor, primitives, tracing, utils
+from .optimizer import PSEUDO_OPS, is_add
+from .schemas import PlanStep, step_targets
+
+# 单个几何的顶点数达到该值才交给进程池：本机测得每个任务的进程间往返约 0.15 ms，而 512 顶点的 UV 球
+# 计算约 1.4 ms；更小的几何在主线程计算比传输更快（见 tools/bench_scheduler.py）
+POOL_MIN_VERTICES = 512
+# 达到上述大小的几何少于该数量时不使用进程池，进程池的启动开销不值得
+MIN_PARALLEL = 8
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+@dataclass
+class Chain:
+    """DAG 中的一个节点：作用于同一对象的连续步骤，或一个屏障步骤。"""
+
+    index: int
+    steps: List[int]
+    creates: bool = False
+    barrier: bool = False
+    depends_on: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ScheduleReport:
+    """调度统计；wait_seconds 为主线程提交时等待进程池结果的总时间。"""
+
+    chains: int = 0
+    barriers: int = 0
+    geometries: int = 0
+    pooled: int = 0
+    shared: int = 0
+    workers: int = 1
+    wait_seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"对象链 {self.chains}，屏障 {self.barriers}；几何 {self.geometries} 种（共用 {self.shared} 次），"
+            f"其中 {self.pooled} 种由 {self.workers} 个进程预先计算，提交时等待 {self.wait_seconds:.3f} 秒"
+        )
+
+
+def build_chains(steps: Sequence[PlanStep]) -> List[Chain]:
+    """把步骤划分为对象链并记录依赖；步骤下标从 0 开始。"""
+
+    chains: List[Chain] = []
+    current: Optional[Chain] = None
+    last_barrier: Optional[int] = None
+    since_barrier: List[int] = []
+    # 句柄 → 绑定它的链
+    owners: Dict[str, int] = {}
+
+    def start(index: int, creates: bool) -> Chain:
+        chain = Chain(len(chains), [index], creates=creates)
+        if last_barrier is not None:
+            chain.depends_on.append(last_barrier)
+        chains.append(chain)
+        since_barrier.append(chain.index)
+        return chain
+
+    for index, step in enumerate(steps):
+        if is_add(step):
+            current = start(index, creates=True)
+            if step.bind is not None:
+                owners[step.bind] = current.index
+        elif step.op in PSEUDO_OPS and step.target is not None:
+            handles = step_targets(step)
+            # 屏障之前绑定的句柄所在的链已被屏障依赖，这里只需依赖屏障
+            owned = [owners[handle] for handle in handles if owners.get(handle) in since_barrier]
+            if len(handles) == 1 and owned:
+                chains[owned[0]].steps.append(index)
+            else:
+                start(index, creates=False).depends_on.extend(sorted(set(owned)))
+        elif step.op in PSEUDO_OPS:
+            if current is None:
+                # 作用于执行前（或屏障之后）的激活对象
+                current = start(index, creates=False)
+            else:
+                current.steps.append(index)
+        else:
+            depends = since_barrier or ([last_barrier] if last_barrier is not None else [])
+            barrier = Chain(len(chains), [index], barrier=True, depends_on=list(depends))
+            chains.append(barrier)
+            last_barrier = barrier.index
+            since_barrier = []
+            current = None
+    return chains
+
+
+def _data_key(step: PlanStep, backend: str) -> Optional[primitives.GeometryKey]:
+    """由数据 API 构建的图元步骤返回其几何键，其余步骤返回 None。"""
+
+    if (step.backend or backend) != "data":
+        return None
+    primitive = primitives.PRIMITIVES.get(step.op)
+    if primitive is None or not primitive.supports(step.args):
+        return None
+    return primitives.geometry_key(step.op, step.args)
+
+
+def geometry_keys(steps: Sequence[PlanStep], backend: str) -> List[primitives.GeometryKey]:
+    """按首次出现顺序列出需要由数据 API 构建的图元几何，相同参数只出现一次。"""
+
+    keys: Dict[primitives.GeometryKey, None] = {}
+    for step in steps:
+        key = _data_key(step, backend)
+        if key is not None:
+            keys.setdefault(key, None)
+    return list(keys)
+
+
+def submit_order(steps: Sequence[PlanStep], chains: Sequence[Chain]) -> List[PlanStep]:
+    """按链的编号列出创建对象的步骤，即几何提交到进程池的顺序。"""
+
+    return [steps[chain.steps[0]] for chain in chains if chain.creates]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            # spawn 不复制 Blender 进程的状态，子进程只导入纯 Python 的几何函数
+            _POOL = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    """关闭进程池，卸载插件时调用。"""
+
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+        _POOL_WORKERS = 0
+
+
+def _pool_sized(key: primitives.GeometryKey) -> bool:
+    """几何是否大到值得交给进程池；参数尚未校验，估算失败的几何留给主线程，由对应步骤自行报错。"""
+
+    try:
+        return primitives.geometry_vertices(key) >= POOL_MIN_VERTICES
+    except Exception:
+        return False
+
+
+def submit_geometry(
+    keys: Sequence[primitives.GeometryKey], workers: int, pool: Optional[Executor] = None
+) -> Dict[primitives.GeometryKey, "Future[primitives.MeshArrays]"]:
+    """按给定顺序把足够大的几何提交到进程池；几何太少或太小时返回空字典，由提交阶段在主线程计算。"""
+
+    large = [key for key in keys if _pool_sized(key)]
+    if workers <= 1 or len(large) < MIN_PARALLEL:
+        return {}
+    try:
+        target = pool or _get_pool(workers)
+        return {key: target.submit(primitives.build_arrays, key) for key in large}
+    except (BrokenProcessPool, OSError, RuntimeError) as exc:
+        utils.get_logger(__name__).warning("进程池不可用，改为在主线程准备几何：%s", exc)
+        if pool is None:
+            shutdown_pool()
+        return {}
+
+
+def _pipeline(
+    steps: Sequence[PlanStep],
+    backend: str,
+    futures: Dict[primitives.GeometryKey, "Future[primitives.MeshArrays]"],
+    prepared: Dict[primitives.GeometryKey, primitives.MeshArrays],
+    report: ScheduleReport,
+    own_pool: bool,
+) -> Iterator[Tuple[int, PlanStep]]:
+    """按计划顺序产出 (计划序号, 步骤)；产出添加步骤前只等待它自己的几何。
+
+    子进程中计算失败的几何不放入 prepared，由 add_primitive 在主线程重新计算，错误归于该步骤。
+    """
+
+    for index, step in enumerate(steps):
+        key = _data_key(step, backend)
+        future = futures.pop(key, None) if key is not None else None
+        if key is not None and future is not None:
+            start = time.perf_counter()
+            try:
+                prepared[key] = future.result()
+            except (BrokenProcessPool, OSError, PicklingError) as exc:
+                # 其余几何改由 add_primitive 在主线程计算
+                utils.get_logger(__name__).warning("进程池不可用，改为在主线程准备几何：%s", exc)
+                for pending in futures.values():
+                    pending.cancel()
+                futures.clear()
+                if own_pool:
+                    shutdown_pool()
+            except Exception as exc:
+                utils.get_logger(__name__).debug(
+                    "几何准备失败，交由步骤 %s 在主线程计算：%s", index + 1, exc
+                )
+            report.wait_seconds += time.perf_counter() - start
+        yield index + 1, step
+
+
+def execute_scheduled(
+    plan_input: Any,
+    backend: Optional[str] = None,
+    workers: Optional[int] = None,
+    transactional: bool = False,
+    undo_steps: bool = False,
+    pool: Optional[Executor] = None,
+) -> ScheduleReport:
+    """按对象链调度执行计划；场景结果与 executor.execute_plan 相同。
+
+    workers 默认取 CPU 核数；可传入 pool 复用外部的执行器（例如测试中的线程池）。
+    日志与事务中的步骤序号仍为计划中的序号。
+    """
+
+    plan, default_backend = executor.prepare_plan(plan_input, backend)
+    workers = max(1, workers if workers is not None else os.cpu_count() or 1)
+    chains = build_chains(plan.steps)
+    # 几何按链的顺序排列，先提交的链的几何先算好
+    keys = geometry_keys(submit_order(plan.steps, chains), default_backend)
+    with tracing.span("prepare", "execution", {"geometries": len(keys), "workers": workers}):
+        futures = submit_geometry(keys, workers, pool)
+    data_adds = sum(
+        step.repeat for step in plan.steps if _data_key(step, default_backend) is not None
+    )
+    report = ScheduleReport(
+        chains=sum(1 for chain in chains if not chain.barrier),
+        barriers=sum(1 for chain in chains if chain.barrier),
+        geometries=len(keys),
+        pooled=len(futures),
+        shared=max(0, data_adds - len(keys)),
+        workers=workers,
+    )
+
+    prepared: Dict[primitives.GeometryKey, primitives.MeshArrays] = {}
+    items = _pipeline(plan.steps, default_backend, futures, prepared, report, own_pool=pool is None)
+    try:
+        with primitives.use_prepared(prepared):
+            executor.execute_indexed(items, default_backend, transactional, undo_steps)
+    finally:
+        # 提前失败时不再等待尚未开始的几何
+        for future in futures.values():
+            future.cancel()
+    utils.get_logger(__name__).info("计划调度：%s", report.summary())
+    return report
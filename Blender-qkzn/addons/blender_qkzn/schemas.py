@@ -2,36 +2,128 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field, ValidationError, root_validator
 
+BACKENDS = ("ops", "data")
+
+# 对象句柄形如 $obj1：添加步骤以 bind 绑定新对象，后续步骤以 target 引用
+_HANDLE_PATTERN = re.compile(r"^\$[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _check_backend(values: Dict[str, Any]) -> Dict[str, Any]:
+    backend = values.get("backend")
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"未知执行后端：{backend}，可选 {', '.join(BACKENDS)}")
+    return values
+
+
+def step_targets(step: "PlanStep") -> List[str]:
+    """步骤 target 引用的句柄列表；未指定时为空，表示作用于激活对象。"""
+
+    if step.target is None:
+        return []
+    if isinstance(step.target, str):
+        return [step.target]
+    return list(step.target)
+
+
+def _check_handles(values: Dict[str, Any]) -> Dict[str, Any]:
+    bind = values.get("bind")
+    if bind is not None and (not isinstance(bind, str) or not _HANDLE_PATTERN.match(bind)):
+        raise ValueError(f"对象句柄格式不正确：{bind!r}，需形如 $obj1")
+    if bind is not None and values.get("repeat", 1) != 1:
+        raise ValueError(f"绑定句柄 {bind} 的步骤不能重复执行")
+    target = values.get("target")
+    if target is None:
+        return values
+    handles = [target] if isinstance(target, str) else target
+    if not isinstance(handles, list) or not handles:
+        raise ValueError("target 需为对象句柄或非空的句柄列表")
+    for handle in handles:
+        if not isinstance(handle, str) or not _HANDLE_PATTERN.match(handle):
+            raise ValueError(f"对象句柄格式不正确：{handle!r}，需形如 $obj1")
+    return values
+
 
 class PlanStep(BaseModel):
-    """单个计划步骤，描述一个 Blender 操作。"""
+    """单个计划步骤，描述一个 Blender 操作。
+
+    backend 为空时沿用计划或执行时指定的后端；repeat 为连续执行的次数，由优化器合并相同的添加步骤得到。
+    bind 把步骤执行后的激活对象（即新添加的对象）绑定到句柄；target 指定伪操作作用的句柄，
+    可为列表表示依次作用于多个对象，为空时作用于激活对象。
+    """
 
     op: str
     args: Dict[str, Any] = Field(default_factory=dict)
+    backend: Optional[str] = None
+    repeat: int = 1
+    bind: Optional[str] = None
+    target: Optional[Union[str, List[str]]] = None
+
+    @root_validator
+    def check_backend(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        repeat = values.get("repeat", 1)
+        if not isinstance(repeat, int) or repeat < 1:
+            raise ValueError(f"repeat 必须为正整数：{repeat}")
+        return _check_handles(_check_backend(values))
 
 
 class Plan(BaseModel):
     """完整计划，由多个步骤组成。"""
 
     steps: List[PlanStep]
+    backend: Optional[str] = None
 
     @root_validator
     def check_steps_not_empty(cls, values: Dict[str, Any]) -> Dict[str, Any]:
-        if not values.get("steps"):
+        steps = values.get("steps")
+        if not steps:
             raise ValueError("计划步骤不能为空")
-        return values
+        # 句柄只能绑定一次，且须在引用它的步骤之前绑定
+        bound = set()
+        for index, step in enumerate(steps, start=1):
+            for handle in step_targets(step):
+                if handle not in bound:
+                    raise ValueError(f"步骤 {index} 引用了未绑定的对象句柄 {handle}")
+            if step.bind is not None:
+                if step.bind in bound:
+                    raise ValueError(f"步骤 {index} 重复绑定对象句柄 {step.bind}")
+                bound.add(step.bind)
+        return _check_backend(values)
 
 
 class LLMConfig(BaseModel):
-    """LLM 请求配置。"""
+    """LLM 请求配置；timeout 为读取超时，连接超时单独配置。
+
+    batch_size 大于 0 表示服务端支持批量接口，一次请求携带多条命令；max_concurrency 限制同时进行的请求数。
+    """
 
     api_url: Optional[str]
     api_key: Optional[str]
     timeout: int = 30
+    connect_timeout: float = 5.0
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    stream: bool = False
+    batch_size: int = 0
+    max_concurrency: int = 4
+
+
+def validate_step(raw: Any) -> PlanStep:
+    """验证单个步骤，流式计划逐条到达时使用。"""
+
+    try:
+        if isinstance(raw, PlanStep):
+            return raw
+        if not isinstance(raw, dict):
+            raise TypeError("步骤数据结构不正确，需为包含 op 的字典")
+        return PlanStep(**raw)
+    except (ValidationError, TypeError, ValueError) as exc:
+        raise ValueError(f"步骤校验失败：{exc}") from exc
 
 
 def validate_plan(raw: Any) -> Plan:
@@ -41,7 +133,12 @@ def validate_plan(raw: Any) -> Plan:
         if isinstance(raw, Plan):
             return raw
         if isinstance(raw, dict) and "steps" in raw:
-            return Plan.parse_obj(raw)
+            steps = raw["steps"]
+            if not isinstance(steps, list):
+                raise TypeError("steps 字段需为列表")
+            return Plan(
+                steps=[PlanStep.parse_obj(item) for item in steps], backend=raw.get("backend")
+            )
         if isinstance(raw, list):
             return Plan(steps=[PlanStep.parse_obj(item) for item in raw])
         raise TypeError("计划数据结构不正确，需为列表或包含 steps 的字典")
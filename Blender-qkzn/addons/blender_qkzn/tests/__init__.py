@@ -0,0 +1 @@
+"""插件的单元测试与场景模拟器，作为 blender_qkzn.tests 包导入，不随插件打包。"""
@@ -0,0 +1,112 @@
+"""测试共用夹具：本地替身 HTTP 服务，用于模拟 LLM 接口。"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+import pytest
+
+# 处理函数接收请求体 JSON，返回 (状态码, 响应头, 响应体)；响应体为可迭代对象时按 chunked 逐块发送
+Body = Union[bytes, Iterable[bytes]]
+Response = Tuple[int, Dict[str, str], Body]
+Responder = Callable[[Dict[str, Any]], Response]
+
+
+class StubLLMServer:
+    """在后台线程运行的 HTTP/1.1 服务，记录请求与客户端连接。"""
+
+    def __init__(self, responder: Responder) -> None:
+        self.responder = responder
+        self.requests: List[Dict[str, Any]] = []
+        self.client_ports: List[int] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server 约定
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests.append(body)
+                stub.client_ports.append(self.client_address[1])
+                status, headers, payload = stub.responder(body)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                if isinstance(payload, bytes):
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in payload:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, *_args: Any) -> None:
+                return None
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/plan"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    def __enter__(self) -> "StubLLMServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# llm_server 夹具返回的工厂：传入处理函数，启动并返回替身服务
+ServerFactory = Callable[[Responder], StubLLMServer]
+
+
+def json_response(
+    payload: Any, status: int = 200, headers: Dict[str, str] | None = None
+) -> Tuple[int, Dict[str, str], bytes]:
+    """构造 JSON 响应。"""
+
+    merged = {"Content-Type": "application/json"}
+    merged.update(headers or {})
+    return status, merged, json.dumps(payload).encode("utf-8")
+
+
+def stream_response(
+    lines: Iterable[str], delay: float = 0.0, content_type: str = "application/x-ndjson"
+) -> Tuple[int, Dict[str, str], Iterator[bytes]]:
+    """构造逐行发送的流式响应，每行之前等待 delay 秒，模拟模型逐步生成。"""
+
+    def chunks() -> Iterator[bytes]:
+        for line in lines:
+            if delay:
+                time.sleep(delay)
+            yield (line + "\n").encode("utf-8")
+
+    return 200, {"Content-Type": content_type}, chunks()
+
+
+@pytest.fixture
+def llm_server() -> Iterator[ServerFactory]:
+    """返回启动替身服务的工厂，测试结束时统一关闭。"""
+
+    servers: List[StubLLMServer] = []
+
+    def start(responder: Responder) -> StubLLMServer:
+        server = StubLLMServer(responder).__enter__()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
@@ -0,0 +1,511 @@
+"""纯 Python 的场景模拟器，在没有 Blender 的环境中代替 bpy 运行与基准测试计划。
+
+仅供测试与 tools/ 下的基准脚本使用，不随插件打包。
+
+只实现执行器、材质、数据 API 图元与事务会用到的接口：bpy.data 中的对象、网格与材质集合，
+激活对象与选择、活动集合、3D 游标，以及规划器会生成的 bpy.ops 图元和少量对象操作。
+数据块按名称建立索引，重名时像 Blender 一样追加 .001 后缀；选择状态只记录被选中的对象，
+因此添加、查找与取消选择都与场景规模无关，百万步的计划也能在秒级完成。
+
+用法::
+
+    from blender_qkzn.tests import fake_scene  # addons 目录需在 sys.path 中
+    scene = fake_scene.install()
+    executor.execute_plan(plan)
+    assert len(scene.data.objects) == 3
+"""
+
+from __future__ import annotations
+
+import itertools
+from functools import lru_cache
+from types import ModuleType, SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from blender_qkzn import executor, materials, primitives, transaction
+
+# 与 Blender 相同，session_uid 在会话内全局递增
+_SESSION_UIDS = itertools.count(1)
+
+_PRINCIPLED_INPUTS = {
+    "Base Color": (0.8, 0.8, 0.8, 1.0),
+    "Metallic": 0.0,
+    "Roughness": 0.5,
+    "IOR": 1.45,
+    "Alpha": 1.0,
+    "Transmission": 0.0,
+    "Emission Strength": 0.0,
+}
+
+# bpy.ops 图元：操作名 -> 新对象与网格的默认名称
+_OPS_PRIMITIVES: Dict[str, str] = {
+    "primitive_cube_add": "Cube",
+    "primitive_plane_add": "Plane",
+    "primitive_uv_sphere_add": "Sphere",
+    "primitive_ico_sphere_add": "Icosphere",
+    "primitive_cylinder_add": "Cylinder",
+    "primitive_cone_add": "Cone",
+    "primitive_torus_add": "Torus",
+}
+
+
+class FakeID:
+    """数据块基类：名称与会话内唯一的 session_uid。"""
+
+    __slots__ = ("name", "session_uid", "__weakref__")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.session_uid = next(_SESSION_UIDS)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name!r}>"
+
+
+class IDCollection:
+    """bpy.data 中的数据块集合，按名称索引。"""
+
+    def __init__(self, factory: Any) -> None:
+        self._factory = factory
+        self._items: Dict[str, Any] = {}
+        # 每个基础名称下一个可能空闲的后缀，避免重名时从 .001 逐个尝试
+        self._next_suffix: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._items.values()))
+
+    def __contains__(self, item: Any) -> bool:
+        if isinstance(item, str):
+            return item in self._items
+        name = getattr(item, "name", None)
+        return isinstance(name, str) and self._items.get(name) is item
+
+    def __getitem__(self, key: Union[str, int]) -> Any:
+        if isinstance(key, int):
+            return list(self._items.values())[key]
+        return self._items[key]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._items.get(name, default)
+
+    def keys(self) -> List[str]:
+        return list(self._items)
+
+    def _unique_name(self, name: str) -> str:
+        if name not in self._items:
+            return name
+        base, dot, suffix = name.rpartition(".")
+        if not (dot and suffix.isdigit()):
+            base = name
+        number = self._next_suffix.get(base, 1)
+        while f"{base}.{number:03d}" in self._items:
+            number += 1
+        self._next_suffix[base] = number + 1
+        return f"{base}.{number:03d}"
+
+    def new(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        item = self._factory(self._unique_name(name), *args, **kwargs)
+        self._items[item.name] = item
+        return item
+
+    def remove(self, item: Any, do_unlink: bool = True) -> None:
+        if item not in self:
+            raise ReferenceError(f"{item!r} 不在集合中")
+        del self._items[item.name]
+        base, dot, suffix = item.name.rpartition(".")
+        if dot and suffix.isdigit() and int(suffix) < self._next_suffix.get(base, 1):
+            self._next_suffix[base] = int(suffix)
+        if do_unlink:
+            _SCENES.unlink(item)
+
+
+class ElementCollection:
+    """网格的顶点、面角或面：只记录数量与 foreach_set 写入的数据。"""
+
+    __slots__ = ("count", "data")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.data: Optional[Dict[str, List[Any]]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, count: int) -> None:
+        self.count += count
+
+    def foreach_set(self, attr: str, values: Sequence[Any]) -> None:
+        if self.data is None:
+            self.data = {}
+        self.data[attr] = list(values)
+
+
+class UVLayer:
+    __slots__ = ("name", "data")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.data = ElementCollection()
+
+
+class UVLayers(List[UVLayer]):
+    def new(self, name: str = "UVMap") -> UVLayer:
+        layer = UVLayer(name)
+        self.append(layer)
+        return layer
+
+
+class MaterialList(List[Any]):
+    """网格的材质槽列表，Blender 中同样支持 append、clear 与下标赋值。"""
+
+
+class Mesh(FakeID):
+    __slots__ = ("vertices", "loops", "polygons", "edges", "materials", "_uv_layers")
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.vertices = ElementCollection()
+        self.loops = ElementCollection()
+        self.polygons = ElementCollection()
+        self.edges = ElementCollection()
+        self.materials = MaterialList()
+        self._uv_layers: Optional[UVLayers] = None
+
+    @property
+    def uv_layers(self) -> UVLayers:
+        # 通过 bpy.ops 添加的网格很少访问 UV，延迟创建
+        if self._uv_layers is None:
+            self._uv_layers = UVLayers()
+        return self._uv_layers
+
+    def update(self, calc_edges: bool = False) -> None:
+        if calc_edges and not self.edges.count:
+            # 闭合流形网格的边数等于面角数的一半，足够用于统计
+            self.edges.count = self.loops.count // 2
+
+
+class NodeSocket:
+    def __init__(self, name: str, default_value: Any) -> None:
+        self.name = name
+        self.default_value = default_value
+
+
+class Node:
+    def __init__(self, name: str, inputs: Dict[str, Any]) -> None:
+        self.name = name
+        self.inputs = {key: NodeSocket(key, value) for key, value in inputs.items()}
+
+
+class _Nodes(Dict[str, Node]):
+    def new(self, node_type: str) -> Node:
+        node = Node("Principled BSDF", _PRINCIPLED_INPUTS)
+        self[node.name] = node
+        return node
+
+    def remove(self, node: Node) -> None:
+        del self[node.name]
+
+
+class Material(FakeID):
+    __slots__ = ("node_tree", "_use_nodes")
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.node_tree: Optional[Any] = None
+        self._use_nodes = False
+
+    @property
+    def use_nodes(self) -> bool:
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value: bool) -> None:
+        self._use_nodes = bool(value)
+        if value and self.node_tree is None:
+            nodes = _Nodes()
+            nodes.new("ShaderNodeBsdfPrincipled")
+            self.node_tree = SimpleNamespace(nodes=nodes)
+
+
+class Object(FakeID):
+    __slots__ = ("data", "type", "_location", "_rotation", "_scale", "smooth")
+
+    def __init__(self, name: str, data: Optional[Mesh]) -> None:
+        super().__init__(name)
+        self.data = data
+        self.type = "MESH" if isinstance(data, Mesh) else "EMPTY"
+        self._location: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self._rotation: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self._scale: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+        self.smooth = False
+
+    @staticmethod
+    def _vector(value: Iterable[float]) -> Tuple[float, float, float]:
+        x, y, z = value
+        return (float(x), float(y), float(z))
+
+    @property
+    def location(self) -> Tuple[float, float, float]:
+        return self._location
+
+    @location.setter
+    def location(self, value: Iterable[float]) -> None:
+        self._location = self._vector(value)
+
+    @property
+    def rotation_euler(self) -> Tuple[float, float, float]:
+        return self._rotation
+
+    @rotation_euler.setter
+    def rotation_euler(self, value: Iterable[float]) -> None:
+        self._rotation = self._vector(value)
+
+    @property
+    def scale(self) -> Tuple[float, float, float]:
+        return self._scale
+
+    @scale.setter
+    def scale(self, value: Iterable[float]) -> None:
+        self._scale = self._vector(value)
+
+    @property
+    def material_slots(self) -> List[Any]:
+        materials = self.data.materials if self.data is not None else ()
+        return [
+            SimpleNamespace(name=material.name if material else "", material=material)
+            for material in materials
+        ]
+
+    def select_set(self, state: bool) -> None:
+        _SCENES.current.select(self, state)
+
+    def select_get(self) -> bool:
+        return id(self) in _SCENES.current.selected
+
+
+class SceneCollection:
+    """活动集合：记录链接的对象，保持链接顺序。"""
+
+    def __init__(self) -> None:
+        self._objects: Dict[int, Object] = {}
+        self.objects = SimpleNamespace(link=self.link, unlink=self.unlink)
+
+    def link(self, obj: Object) -> None:
+        if id(obj) in self._objects:
+            raise RuntimeError(f"对象 {obj.name} 已链接到集合")
+        self._objects[id(obj)] = obj
+
+    def unlink(self, obj: Object) -> None:
+        self._objects.pop(id(obj), None)
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __iter__(self) -> Iterator[Object]:
+        return iter(list(self._objects.values()))
+
+
+class FakeScene:
+    """一个场景：活动集合、3D 游标、激活对象与选择集。"""
+
+    def __init__(self) -> None:
+        self.collection = SceneCollection()
+        self.cursor = SimpleNamespace(location=(0.0, 0.0, 0.0))
+        self.view_layer = SimpleNamespace(objects=SimpleNamespace(active=None))
+        self.selected: Dict[int, Object] = {}
+
+    @property
+    def objects(self) -> List[Object]:
+        return list(self.collection)
+
+    def select(self, obj: Object, state: bool) -> None:
+        if state:
+            self.selected[id(obj)] = obj
+        else:
+            self.selected.pop(id(obj), None)
+
+    def deselect_all(self) -> None:
+        self.selected.clear()
+
+    def unlink(self, item: Any) -> None:
+        if isinstance(item, Object):
+            self.collection.unlink(item)
+            self.selected.pop(id(item), None)
+            if self.view_layer.objects.active is item:
+                self.view_layer.objects.active = None
+
+
+class _SceneRegistry:
+    """记录当前场景，供对象的 select_set 与集合删除时取消链接使用。"""
+
+    def __init__(self) -> None:
+        self.current = FakeScene()
+
+    def unlink(self, item: Any) -> None:
+        self.current.unlink(item)
+
+
+_SCENES = _SceneRegistry()
+
+
+class Context:
+    """bpy.context 的子集，属性都指向当前场景。"""
+
+    def __init__(self, scene: FakeScene) -> None:
+        self._scene = scene
+        self.scene = SimpleNamespace(cursor=scene.cursor, objects=scene.collection)
+        self.collection = scene.collection
+        self.view_layer = scene.view_layer
+
+    @property
+    def active_object(self) -> Optional[Object]:
+        active: Optional[Object] = self.view_layer.objects.active
+        return active
+
+    @property
+    def object(self) -> Optional[Object]:
+        return self.active_object
+
+    @property
+    def selected_objects(self) -> List[Object]:
+        return list(self._scene.selected.values())
+
+
+class BlendData:
+    def __init__(self) -> None:
+        self.objects = IDCollection(Object)
+        self.meshes = IDCollection(Mesh)
+        self.materials = IDCollection(Material)
+
+    def batch_remove(self, ids: Iterable[Any]) -> None:
+        for item in list(ids):
+            for collection in (self.objects, self.meshes, self.materials):
+                if collection.get(item.name) is item:
+                    collection.remove(item)
+                    break
+
+
+@lru_cache(maxsize=None)
+def _geometry_counts(op: str, params: Tuple[Tuple[str, Any], ...]) -> Tuple[int, int, int]:
+    primitive = primitives.PRIMITIVES.get(f"mesh.{op}")
+    if primitive is None:
+        return 0, 0, 0
+    verts, faces, _uvs = primitive.geometry(**dict(params))
+    return len(verts), sum(len(face) for face in faces), len(faces)
+
+
+class OpsModule:
+    """bpy.ops 的子模块：属性即操作；dir() 只列出已实现的操作，与执行器的存在性检查一致。"""
+
+    def __init__(self, name: str, operators: Dict[str, Any]) -> None:
+        self._name = name
+        self._operators = operators
+        for op_name, operator in operators.items():
+            setattr(self, op_name, operator)
+
+    def __dir__(self) -> List[str]:
+        return list(self._operators)
+
+
+class FakeBpy(ModuleType):
+    """可以直接赋值给各模块 bpy 变量的模拟模块。"""
+
+    def __init__(self) -> None:
+        super().__init__("bpy")
+        self.scene = FakeScene()
+        _SCENES.current = self.scene
+        self.data = BlendData()
+        self.context = Context(self.scene)
+        self.calls: Dict[str, int] = {}
+        mesh_ops = {
+            name: self._primitive_operator(name, default)
+            for name, default in _OPS_PRIMITIVES.items()
+        }
+        self.ops = SimpleNamespace(
+            mesh=OpsModule("mesh", mesh_ops),
+            object=OpsModule(
+                "object",
+                {
+                    "shade_smooth": self._shade_operator(True),
+                    "shade_flat": self._shade_operator(False),
+                    "delete": self._delete_selected,
+                    "select_all": self._select_all,
+                },
+            ),
+        )
+        self.types = SimpleNamespace(
+            MeshPolygon=SimpleNamespace(
+                bl_rna=SimpleNamespace(properties={"loop_total": SimpleNamespace(is_readonly=True)})
+            )
+        )
+
+    def _count(self, path: str) -> None:
+        self.calls[path] = self.calls.get(path, 0) + 1
+
+    def _primitive_operator(self, op: str, default_name: str) -> Any:
+        path = f"mesh.{op}"
+        primitive = primitives.PRIMITIVES.get(path)
+        params = primitive.params if primitive is not None else frozenset()
+
+        def operator(*_call_args: Any, **kwargs: Any) -> Set[str]:
+            # 位置参数对应 bpy.ops 的执行上下文与 undo 标志，这里忽略
+            self._count(path)
+            key = tuple(sorted((name, value) for name, value in kwargs.items() if name in params))
+            vertices, loops, polygons = _geometry_counts(op, key)
+            mesh = self.data.meshes.new(default_name)
+            mesh.vertices.add(vertices)
+            mesh.loops.add(loops)
+            mesh.polygons.add(polygons)
+            mesh.update(calc_edges=True)
+            obj = self.data.objects.new(default_name, mesh)
+            obj.location = kwargs.get("location", self.scene.cursor.location)
+            obj.rotation_euler = kwargs.get("rotation", (0.0, 0.0, 0.0))
+            obj.scale = kwargs.get("scale", (1.0, 1.0, 1.0))
+            self.scene.collection.link(obj)
+            self.scene.deselect_all()
+            obj.select_set(True)
+            self.scene.view_layer.objects.active = obj
+            return {"FINISHED"}
+
+        return operator
+
+    def _shade_operator(self, smooth: bool) -> Any:
+        def operator(*_call_args: Any, **_kwargs: Any) -> Set[str]:
+            self._count("object.shade_smooth" if smooth else "object.shade_flat")
+            for obj in self.scene.selected.values():
+                obj.smooth = smooth
+            return {"FINISHED"}
+
+        return operator
+
+    def _delete_selected(self, *_call_args: Any, **_kwargs: Any) -> Set[str]:
+        self._count("object.delete")
+        for obj in list(self.scene.selected.values()):
+            self.data.objects.remove(obj)
+        return {"FINISHED"}
+
+    def _select_all(self, *_call_args: Any, action: str = "TOGGLE", **_kwargs: Any) -> Set[str]:
+        self._count("object.select_all")
+        if action == "DESELECT" or (action == "TOGGLE" and self.scene.selected):
+            self.scene.deselect_all()
+        else:
+            for obj in self.scene.collection:
+                obj.select_set(True)
+        return {"FINISHED"}
+
+
+def _default_modules() -> List[ModuleType]:
+    return [executor, materials, primitives, transaction]
+
+
+def install(modules: Optional[Iterable[ModuleType]] = None) -> FakeBpy:
+    """创建新的空场景并替换各模块的 bpy，返回模拟模块；执行器的操作缓存同时清空。"""
+
+    fake = FakeBpy()
+    for module in modules if modules is not None else _default_modules():
+        module.bpy = fake  # type: ignore[attr-defined]
+    executor.clear_operator_cache()
+    return fake
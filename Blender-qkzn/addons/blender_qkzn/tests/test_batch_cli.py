@@ -0,0 +1,40 @@
+"""批量规划命令行的单元测试。"""
+
+from __future__ import annotations
+
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import batch_cli
+
+
+def test_plan_commands_keeps_input_order_and_errors() -> None:
+    lines = ["添加一个红色立方体", "", "随便说点什么", "添加一个金属球体"]
+    records, stats = batch_cli.plan_commands(batch_cli.iter_commands(lines), workers=1)
+    assert [record["line"] for record in records] == [1, 3, 4]
+    assert records[0]["plan"]["steps"][0]["op"] == "mesh.primitive_cube_add"
+    assert "error" in records[1]
+    assert (stats.lines, stats.planned, stats.failed) == (3, 2, 1)
+
+
+def test_plan_commands_with_process_pool_matches_serial() -> None:
+    commands = list(
+        batch_cli.iter_commands(["添加一个立方体", "添加一个蓝色球体，移动到 X1 Y2 Z3"] * 10)
+    )
+    serial, _ = batch_cli.plan_commands(commands, workers=1)
+    pooled, stats = batch_cli.plan_commands(commands, workers=2, chunk_size=3)
+    assert pooled == serial
+    assert stats.workers == 2
+
+
+def test_write_jsonl_outputs_one_record_per_line() -> None:
+    records, _ = batch_cli.plan_commands([(1, "添加一个立方体")])
+    buffer = io.StringIO()
+    batch_cli.write_jsonl(records, buffer)
+    lines = buffer.getvalue().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["text"] == "添加一个立方体"
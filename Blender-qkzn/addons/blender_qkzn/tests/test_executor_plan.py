@@ -5,17 +5,18 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 from types import SimpleNamespace
+from typing import Any, List, Tuple
 from unittest.mock import MagicMock
 
 import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-from blender_qkzn import executor
+from blender_qkzn import executor, materials
 from blender_qkzn.schemas import Plan, PlanStep
 
 
-def _prepare_fake_bpy() -> None:
+def _prepare_fake_bpy(monkeypatch: pytest.MonkeyPatch) -> Tuple[MagicMock, SimpleNamespace]:
     cube_add = MagicMock(name="cube_add")
     fake_mesh = SimpleNamespace(primitive_cube_add=cube_add)
     fake_ops = SimpleNamespace(mesh=fake_mesh)
@@ -28,14 +29,15 @@ def _prepare_fake_bpy() -> None:
     )
     fake_context = SimpleNamespace(active_object=active_object)
 
-    executor.bpy = SimpleNamespace(ops=fake_ops, context=fake_context)  # type: ignore[attr-defined]
-    executor.materials.apply_material = MagicMock(name="apply_material")  # type: ignore[assignment]
+    monkeypatch.setattr(executor, "bpy", SimpleNamespace(ops=fake_ops, context=fake_context))
+    monkeypatch.setattr(materials, "apply_material", MagicMock(name="apply_material"))
+    executor.clear_operator_cache()
 
     return cube_add, active_object
 
 
-def test_execute_plan_success() -> None:
-    cube_add, active_object = _prepare_fake_bpy()
+def test_execute_plan_success(monkeypatch: pytest.MonkeyPatch) -> None:
+    cube_add, active_object = _prepare_fake_bpy(monkeypatch)
 
     plan = Plan(
         steps=[
@@ -48,15 +50,80 @@ def test_execute_plan_success() -> None:
     executor.execute_plan(plan)
 
     cube_add.assert_called_once()
-    executor.materials.apply_material.assert_called_once_with(active_object, "玻璃")  # type: ignore[attr-defined]
+    materials.apply_material.assert_called_once_with(active_object, "玻璃")  # type: ignore[attr-defined]
     assert executor.bpy.context.active_object.location == (1.0, 2.0, 3.0)  # type: ignore[attr-defined]
 
 
-def test_execute_plan_failure_raises() -> None:
-    cube_add, _ = _prepare_fake_bpy()
+def test_execute_plan_failure_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    cube_add, _ = _prepare_fake_bpy(monkeypatch)
     cube_add.side_effect = RuntimeError("boom")
 
     plan = Plan(steps=[PlanStep(op="mesh.primitive_cube_add", args={})])
 
     with pytest.raises(executor.ExecutionError):
         executor.execute_plan(plan)
+
+
+def test_unknown_op_rejected_before_any_step_runs(monkeypatch: pytest.MonkeyPatch) -> None:
+    cube_add, _ = _prepare_fake_bpy(monkeypatch)
+
+    plan = Plan(
+        steps=[
+            PlanStep(op="mesh.primitive_cube_add", args={}),
+            PlanStep(op="mesh.primitive_teapot_add", args={}),
+            PlanStep(op="object", args={}),
+        ]
+    )
+
+    with pytest.raises(
+        executor.ExecutionError, match="mesh.primitive_teapot_add（步骤 2）、object（步骤 3）"
+    ):
+        executor.execute_plan(plan)
+    cube_add.assert_not_called()
+
+
+def test_bpy_operators_resolved_once_per_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    cube_add, _ = _prepare_fake_bpy(monkeypatch)
+    lookups: List[str] = []
+
+    class CountingMesh:
+        def __getattr__(self, name: str) -> Any:
+            lookups.append(name)
+            if name == "primitive_cube_add":
+                return cube_add
+            raise AttributeError(name)
+
+        def __dir__(self) -> List[str]:
+            return ["primitive_cube_add"]
+
+    executor.bpy.ops = SimpleNamespace(mesh=CountingMesh())  # type: ignore[attr-defined]
+    executor.clear_operator_cache()
+
+    executor.execute_plan(Plan(steps=[PlanStep(op="mesh.primitive_cube_add", args={})] * 50))
+
+    assert cube_add.call_count == 50
+    assert lookups == ["primitive_cube_add"]
+
+
+def test_registered_handler_dispatch(monkeypatch: pytest.MonkeyPatch) -> None:
+    _prepare_fake_bpy(monkeypatch)
+    seen = []
+
+    @executor.register_step_handler("test.record")
+    def _record(step: PlanStep) -> None:
+        seen.append(step.args["value"])
+
+    try:
+        assert "test.record" in executor.registered_ops()
+        executor.execute_plan(Plan(steps=[PlanStep(op="test.record", args={"value": 1})]))
+    finally:
+        executor._HANDLERS.pop("test.record")
+    assert seen == [1]
+
+
+def test_repeated_step_runs_operator_repeat_times(monkeypatch: pytest.MonkeyPatch) -> None:
+    cube_add, _ = _prepare_fake_bpy(monkeypatch)
+    executor.execute_plan(
+        Plan(steps=[PlanStep(op="mesh.primitive_cube_add", args={"size": 1.0}, repeat=3)])
+    )
+    assert cube_add.call_count == 3
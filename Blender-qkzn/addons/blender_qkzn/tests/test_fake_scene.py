@@ -0,0 +1,143 @@
+"""场景模拟器的测试：执行器、材质、数据 API 图元与事务在模拟场景上原样运行。"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import executor, materials, planner_client, primitives
+from blender_qkzn.schemas import Plan, PlanStep
+from blender_qkzn.tests import fake_scene
+
+
+@pytest.fixture
+def scene() -> fake_scene.FakeBpy:
+    return fake_scene.install()
+
+
+def test_rules_plan_runs_against_fake_scene(scene: fake_scene.FakeBpy) -> None:
+    executor.execute_plan(planner_client.parse_command("添加一个红色立方体"))
+    executor.execute_plan(planner_client.parse_command("添加一个球体"))
+    executor.execute_plan(planner_client.parse_command("移动到 X1 Y2 Z3"))
+    executor.execute_plan(planner_client.parse_command("应用玻璃材质"))
+
+    cube, sphere = scene.data.objects
+    assert (cube.name, cube.data.name, len(cube.data.vertices)) == ("Cube", "Cube", 8)
+    assert [slot.name for slot in cube.material_slots] == ["QKZN_Color_红色"]
+    assert sphere.location == (1.0, 2.0, 3.0)
+    assert [slot.name for slot in sphere.material_slots] == ["QKZN_Glass"]
+    assert (cube.select_get(), sphere.select_get()) == (False, True)
+    assert scene.context.selected_objects == [sphere]
+    assert scene.context.active_object is sphere
+    red = scene.data.materials["QKZN_Color_红色"]
+    base_color = red.node_tree.nodes.get("Principled BSDF").inputs.get("Base Color")
+    assert base_color.default_value == [1.0, 0.0, 0.0, 1.0]
+    assert scene.calls == {"mesh.primitive_cube_add": 1, "mesh.primitive_uv_sphere_add": 1}
+
+
+def test_material_reassignment_replaces_first_slot(scene: fake_scene.FakeBpy) -> None:
+    scene.ops.mesh.primitive_cube_add()
+    obj = scene.context.active_object
+    assert obj is not None
+    materials.apply_material(obj, "红色")
+    materials.apply_material(obj, "蓝色")
+    materials.apply_material(obj, "蓝色")
+    assert [slot.name for slot in obj.material_slots] == ["QKZN_Color_蓝色"]
+    assert len(scene.data.materials) == 2
+
+
+def test_names_get_suffixes_and_freed_names_are_reused(scene: fake_scene.FakeBpy) -> None:
+    for _ in range(3):
+        scene.ops.mesh.primitive_cube_add()
+    assert scene.data.objects.keys() == ["Cube", "Cube.001", "Cube.002"]
+    scene.data.objects.remove(scene.data.objects["Cube.001"])
+    scene.ops.mesh.primitive_cube_add(location=(1, 0, 0))
+    assert "Cube.001" in scene.data.objects
+    assert scene.data.objects["Cube.001"].location == (1.0, 0.0, 0.0)
+    assert len(scene.context.scene.objects) == 3
+    assert len(scene.data.meshes) == 4
+
+
+def test_ops_and_data_backends_build_the_same_scene() -> None:
+    plan = Plan(
+        steps=[
+            PlanStep(op="mesh.primitive_cube_add", args={"size": 3.0, "location": [1, 2, 3]}),
+            PlanStep(op="mesh.primitive_uv_sphere_add", args={"segments": 8, "ring_count": 4}),
+            PlanStep(op="mesh.primitive_cylinder_add", args={}, repeat=2),
+        ]
+    )
+    summaries = []
+    for backend in ("ops", "data"):
+        scene = fake_scene.install()
+        executor.execute_plan(plan, backend=backend)
+        summaries.append(
+            [
+                (
+                    obj.name,
+                    obj.location,
+                    len(obj.data.vertices),
+                    len(obj.data.loops),
+                    len(obj.data.polygons),
+                )
+                for obj in scene.data.objects
+            ]
+        )
+        assert scene.context.selected_objects == [scene.data.objects["Cylinder.001"]]
+    assert summaries[0] == summaries[1]
+    assert scene.calls == {}
+    assert len(scene.data.meshes["Cube"].uv_layers[0].data.data["uv"]) == 48
+    assert primitives.PRIMITIVES["mesh.primitive_cube_add"].name == "Cube"
+
+
+def test_transaction_rollback_unlinks_created_objects(scene: fake_scene.FakeBpy) -> None:
+    scene.ops.mesh.primitive_cube_add()
+    existing = scene.context.active_object
+    plan = Plan(
+        steps=[
+            PlanStep(op="mesh.primitive_uv_sphere_add"),
+            PlanStep(op="material.assign", args={"spec": "红色"}),
+            PlanStep(
+                op="mesh.primitive_cube_add", args={"enter_editmode": "不支持"}, backend="data"
+            ),
+            PlanStep(op="object.move", args={"location": "上面"}),
+        ]
+    )
+    with pytest.raises(executor.ExecutionError, match="步骤 4 失败"):
+        executor.execute_plan(plan, transactional=True)
+    assert scene.data.objects.keys() == ["Cube"]
+    assert scene.data.meshes.keys() == ["Cube"]
+    assert len(scene.data.materials) == 0
+    assert scene.context.scene.objects and list(scene.context.scene.objects) == [existing]
+    assert scene.context.active_object is None
+
+
+def test_unknown_operator_is_rejected_like_blender(scene: fake_scene.FakeBpy) -> None:
+    with pytest.raises(executor.ExecutionError, match="未知操作"):
+        executor.execute_plan(Plan(steps=[PlanStep(op="mesh.primitive_teapot_add")]))
+
+
+def test_large_plan_stays_fast(scene: fake_scene.FakeBpy) -> None:
+    cycle = [
+        PlanStep(op="mesh.primitive_cube_add"),
+        PlanStep(op="material.assign", args={"spec": "红色"}),
+        PlanStep(op="object.move", args={"location": [1, 2, 3]}),
+    ]
+    count = 30000
+    plan = Plan(steps=[cycle[index % 3] for index in range(count)])
+    logging.disable(logging.INFO)
+    try:
+        start = time.perf_counter()
+        executor.execute_plan(plan)
+        elapsed = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+    assert len(scene.data.objects) == count // 3
+    assert scene.data.objects["Cube.9999"].location == (1.0, 2.0, 3.0)
+    # 宽松上限，仅用于发现数量级的性能回退（本地约 15 µs/步）
+    assert elapsed / count < 300e-6
@@ -0,0 +1,184 @@
+"""对象句柄的测试：绑定、引用、校验，以及基于句柄的优化与调度，在场景模拟器上运行。"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import executor, materials, optimizer, scheduler
+from blender_qkzn.schemas import Plan, PlanStep, validate_plan
+from blender_qkzn.tests import fake_scene
+
+CUBE = "mesh.primitive_cube_add"
+SPHERE = "mesh.primitive_uv_sphere_add"
+
+
+@pytest.fixture
+def scene() -> fake_scene.FakeBpy:
+    return fake_scene.install()
+
+
+def snapshot(scene: fake_scene.FakeBpy) -> List[Tuple[str, Any, List[str]]]:
+    return [
+        (obj.name, obj.location, [slot.name for slot in obj.material_slots])
+        for obj in scene.data.objects
+    ]
+
+
+def test_targets_resolve_through_handles_not_active_object(scene: fake_scene.FakeBpy) -> None:
+    plan = validate_plan(
+        [
+            {"op": CUBE, "bind": "$box"},
+            {"op": SPHERE, "bind": "$ball"},
+            {"op": "material.assign", "args": {"spec": "红色"}, "target": "$box"},
+            {"op": "object.move", "args": {"location": [1, 2, 3]}, "target": "$box"},
+            {"op": "material.assign", "args": {"spec": "蓝色"}},
+        ]
+    )
+    executor.execute_plan(plan)
+    assert snapshot(scene) == [
+        ("Cube", (1.0, 2.0, 3.0), ["QKZN_Color_红色"]),
+        ("Sphere", (0.0, 0.0, 0.0), ["QKZN_Color_蓝色"]),
+    ]
+    assert scene.context.active_object is scene.data.objects["Sphere"]
+
+
+def test_plan_rejects_unbound_and_duplicate_handles() -> None:
+    with pytest.raises(ValueError, match="步骤 1 引用了未绑定的对象句柄 \\$box"):
+        validate_plan(
+            [
+                {"op": "material.assign", "args": {"spec": "红色"}, "target": "$box"},
+                {"op": CUBE, "bind": "$box"},
+            ]
+        )
+    with pytest.raises(ValueError, match="重复绑定"):
+        validate_plan([{"op": CUBE, "bind": "$box"}, {"op": SPHERE, "bind": "$box"}])
+    with pytest.raises(ValueError, match="格式不正确"):
+        validate_plan([{"op": CUBE, "bind": "box"}])
+    with pytest.raises(ValueError, match="不能重复执行"):
+        PlanStep(op=CUBE, bind="$box", repeat=2)
+
+
+def test_streamed_step_with_unknown_handle_fails_at_runtime(scene: fake_scene.FakeBpy) -> None:
+    steps = iter(
+        [
+            PlanStep(op=CUBE),
+            PlanStep(op="object.move", args={"location": [1, 0, 0]}, target="$gone"),
+        ]
+    )
+    with pytest.raises(executor.ExecutionError, match="步骤 2 失败"):
+        executor.execute_steps(steps, transactional=True)
+    assert len(scene.data.objects) == 0
+
+
+def test_multi_target_assignment_resolves_material_once(
+    scene: fake_scene.FakeBpy, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: List[Tuple[Any, ...]] = []
+    ensure = materials.ensure_material
+
+    def counting_ensure(*args: Any) -> Any:
+        calls.append(args)
+        return ensure(*args)
+
+    monkeypatch.setattr(materials, "ensure_material", counting_ensure)
+    plan = Plan(
+        steps=[
+            PlanStep(op=CUBE, bind="$a"),
+            PlanStep(op=CUBE, bind="$b"),
+            PlanStep(op=CUBE, bind="$c"),
+            PlanStep(op="material.assign", args={"spec": "金属"}, target=["$a", "$b", "$c"]),
+        ]
+    )
+    executor.execute_plan(plan)
+    assert len(calls) == 1
+    assert all(
+        [slot.name for slot in obj.material_slots] == ["QKZN_Metal"] for obj in scene.data.objects
+    )
+
+
+def test_optimizer_batches_targeted_assignments_and_keeps_result() -> None:
+    steps = []
+    for index in range(6):
+        steps.append(PlanStep(op=CUBE, bind=f"$o{index}"))
+        steps.append(PlanStep(op="material.assign", args={"spec": "红色"}, target=f"$o{index}"))
+    steps.append(PlanStep(op="material.assign", args={"spec": "蓝色"}, target="$o0"))
+    steps.append(PlanStep(op="object.move", args={"location": [5, 0, 0]}, target="$o1"))
+    plan = Plan(steps=steps)
+
+    optimized, report = optimizer.optimize_plan(plan)
+    assert report.batched_assignments == 5
+    assert [(item.op, item.target) for item in optimized.steps[-2:]] == [
+        ("material.assign", "$o0"),
+        ("material.assign", ["$o1", "$o2", "$o3", "$o4", "$o5"]),
+    ]
+
+    results = []
+    for candidate in (plan, optimized):
+        scene = fake_scene.install()
+        executor.execute_plan(candidate)
+        results.append(snapshot(scene))
+    assert results[0] == results[1]
+    assert results[0][0][2] == ["QKZN_Color_蓝色"]
+
+
+def test_optimizer_keeps_targets_that_alias_the_active_object() -> None:
+    plan = Plan(
+        steps=[
+            PlanStep(op=CUBE, bind="$a"),
+            PlanStep(op="material.assign", args={"spec": "红色"}, target="$a"),
+            PlanStep(op="material.assign", args={"spec": "蓝色"}),
+            PlanStep(op=CUBE, bind="$b"),
+            PlanStep(op="material.assign", args={"spec": "红色"}, target="$b"),
+            PlanStep(op="object.move", args={"location": [1, 0, 0]}, target="$a"),
+        ]
+    )
+    optimized, report = optimizer.optimize_plan(plan)
+    # $a 同时被作用于激活对象的赋值写入，顺序必须保留；只剩 $b 一个可移动的赋值，不改写
+    assert [item.dict() for item in optimized.steps] == [item.dict() for item in plan.steps]
+    assert report.batched_assignments == 0 and report.fused_moves == 0
+
+
+def test_optimizer_keeps_order_of_assignments_to_a_shared_material() -> None:
+    def spec(*color: float) -> Dict[str, Any]:
+        return {"name": "M", "principled": {"Base Color": [*color, 1.0]}}
+
+    plan = Plan(
+        steps=[
+            PlanStep(op=CUBE, bind="$a"),
+            PlanStep(op=CUBE, bind="$b"),
+            PlanStep(op=CUBE),
+            PlanStep(op="material.assign", args={"spec": spec(1.0, 0.0, 0.0)}, target="$a"),
+            PlanStep(op="material.assign", args={"spec": spec(1.0, 0.0, 0.0)}, target="$b"),
+            PlanStep(op="material.assign", args={"spec": spec(0.0, 0.0, 1.0)}),
+        ]
+    )
+    optimized, report = optimizer.optimize_plan(plan)
+    assert report.batched_assignments == 0
+    colors = []
+    for candidate in (plan, optimized):
+        scene = fake_scene.install()
+        executor.execute_plan(candidate)
+        bsdf = scene.data.materials["M"].node_tree.nodes.get("Principled BSDF")
+        colors.append(bsdf.inputs.get("Base Color").default_value)
+    assert colors == [[0.0, 0.0, 1.0, 1.0]] * 2
+
+
+def test_scheduler_attaches_targeted_steps_to_bound_chains() -> None:
+    steps = [
+        PlanStep(op=CUBE, bind="$a"),
+        PlanStep(op=SPHERE, bind="$b"),
+        PlanStep(op="material.assign", args={"spec": "红色"}, target="$a"),
+        PlanStep(op="material.assign", args={"spec": "蓝色"}, target=["$a", "$b"]),
+    ]
+    chains = scheduler.build_chains(steps)
+    assert [(chain.steps, chain.depends_on) for chain in chains] == [
+        ([0, 2], []),
+        ([1], []),
+        ([3], [0, 1]),
+    ]
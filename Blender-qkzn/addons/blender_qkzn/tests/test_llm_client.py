@@ -0,0 +1,176 @@
+"""LLM 客户端的单元测试，使用本地替身 HTTP 服务。"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import llm_client  # noqa: E402
+from blender_qkzn.schemas import LLMConfig  # noqa: E402
+from blender_qkzn.tests.conftest import Response, ServerFactory, json_response  # noqa: E402
+
+PLAN = {"plan": [{"op": "mesh.primitive_cube_add", "args": {}}]}
+
+
+def make_client(url: str, sleeps: List[float], **overrides: Any) -> llm_client.LLMClient:
+    cfg = LLMConfig(api_url=url, api_key="secret", timeout=5, **overrides)
+    return llm_client.LLMClient(cfg, sleep=sleeps.append, jitter=lambda: 0.5)
+
+
+def test_retries_on_5xx_then_succeeds(llm_server: ServerFactory) -> None:
+    statuses = [503, 502, 200]
+
+    def respond(_body: Dict[str, Any]) -> Response:
+        status = statuses.pop(0)
+        return json_response(PLAN if status == 200 else {"error": "busy"}, status)
+
+    server = llm_server(respond)
+    sleeps: List[float] = []
+    steps = make_client(server.url, sleeps, max_retries=2, backoff_base=0.1).generate_plan(
+        "添加立方体"
+    )
+    assert [step.op for step in steps] == ["mesh.primitive_cube_add"]
+    assert len(server.requests) == 3
+    assert sleeps == pytest.approx([0.05, 0.1])
+
+
+def test_honours_retry_after_and_gives_up(llm_server: ServerFactory) -> None:
+    server = llm_server(
+        lambda _body: json_response({"error": "slow down"}, 429, {"Retry-After": "3"})
+    )
+    sleeps: List[float] = []
+    client = make_client(server.url, sleeps, max_retries=1, backoff_max=2.0)
+    with pytest.raises(requests.HTTPError):
+        client.generate_plan("添加立方体")
+    assert len(server.requests) == 2
+    assert sleeps == [2.0]
+
+
+def test_does_not_retry_client_errors(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: json_response({"error": "bad"}, 400))
+    sleeps: List[float] = []
+    with pytest.raises(requests.HTTPError):
+        make_client(server.url, sleeps).generate_plan("添加立方体")
+    assert len(server.requests) == 1
+    assert sleeps == []
+
+
+def test_session_reuses_connection(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: json_response(PLAN))
+    client = make_client(server.url, [])
+    for _ in range(5):
+        client.generate_plan("添加立方体")
+    assert len(set(server.client_ports)) == 1
+    assert client.timeouts == (5.0, 5.0)
+
+
+def test_module_level_generate_plan_shares_client(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: json_response(PLAN))
+    cfg = LLMConfig(api_url=server.url, api_key=None, timeout=5)
+    try:
+        llm_client.generate_plan("a", cfg)
+        llm_client.generate_plan("b", LLMConfig(api_url=server.url, api_key=None, timeout=5))
+        assert llm_client.get_client(cfg) is llm_client.get_client(
+            LLMConfig(api_url=server.url, api_key=None, timeout=5)
+        )
+        assert len(set(server.client_ports)) == 1
+    finally:
+        llm_client.close_clients()
+
+
+def test_connection_errors_are_retried() -> None:
+    sleeps: List[float] = []
+    client = make_client("http://127.0.0.1:9/plan", sleeps, max_retries=2, connect_timeout=0.5)
+    with pytest.raises(requests.ConnectionError):
+        client.generate_plan("添加立方体")
+    assert len(sleeps) == 2
+
+
+def plan_for(prompt: str) -> List[Dict[str, Any]]:
+    op = "mesh.primitive_uv_sphere_add" if "球" in prompt else "mesh.primitive_cube_add"
+    return [{"op": op, "args": {}}]
+
+
+def test_generate_plans_aligns_results_with_per_item_errors(llm_server: ServerFactory) -> None:
+    def respond(body: Dict[str, Any]) -> Response:
+        if "坏" in body["prompt"]:
+            return json_response({"error": "bad"}, 400)
+        return json_response({"plan": plan_for(body["prompt"])})
+
+    server = llm_server(respond)
+    client = make_client(server.url, [], max_concurrency=3)
+    texts = ["添加立方体", "添加球", "坏命令", "添加球"] * 5
+    results = client.generate_plans(texts)
+    client.close()
+    assert [result.text for result in results] == texts
+    assert [result.ok for result in results] == [True, True, False, True] * 5
+    steps, error = results[1].steps, results[2].error
+    assert steps is not None and steps[0].op == "mesh.primitive_uv_sphere_add"
+    assert error is not None and "400" in error
+    assert len(server.requests) == len(texts)
+
+
+def test_generate_plans_packs_prompts_into_batches(llm_server: ServerFactory) -> None:
+    def respond(body: Dict[str, Any]) -> Response:
+        plans = [
+            {"error": "bad"} if "坏" in prompt else {"plan": plan_for(prompt)}
+            for prompt in body["prompts"]
+        ]
+        return json_response({"plans": plans})
+
+    server = llm_server(respond)
+    client = make_client(server.url, [], batch_size=4)
+    texts = [f"添加球 {index}" if index % 3 else "坏命令" for index in range(10)]
+    results = client.generate_plans(texts)
+    client.close()
+    assert sorted(len(body["prompts"]) for body in server.requests) == [2, 4, 4]
+    assert [result.ok for result in results] == [index % 3 != 0 for index in range(10)]
+    assert all(
+        result.steps is not None and result.steps[0].op == "mesh.primitive_uv_sphere_add"
+        for result in results
+        if result.ok
+    )
+
+
+def test_batch_with_wrong_length_fails_whole_chunk(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: json_response({"plans": [plan_for("x")]}))
+    client = make_client(server.url, [], batch_size=2)
+    results = client.generate_plans(["a", "b", "c"])
+    client.close()
+    assert [result.ok for result in results] == [False, False, True]
+    error = results[0].error
+    assert error is not None and "条数不符" in error
+
+
+def test_generate_plans_bounds_concurrency(llm_server: ServerFactory) -> None:
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def respond(body: Dict[str, Any]) -> Response:
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return json_response({"plan": plan_for(body["prompt"])})
+
+    server = llm_server(respond)
+    client = make_client(server.url, [], max_concurrency=3)
+    start = time.perf_counter()
+    results = client.generate_plans(["添加立方体"] * 12)
+    elapsed = time.perf_counter() - start
+    client.close()
+    assert all(result.ok for result in results)
+    assert active[1] == 3
+    # 12 个 50ms 请求、并发 3：约 4 轮，远小于串行的 0.6 秒
+    assert elapsed < 0.45
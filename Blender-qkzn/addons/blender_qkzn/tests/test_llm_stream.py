@@ -0,0 +1,161 @@
+"""流式计划协议的测试，使用逐行发送的本地替身服务。"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, List
+from unittest.mock import patch
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import (  # noqa: E402
+    executor,
+    llm_client,
+    plan_cache,
+    planner_client,
+    planning_jobs,
+)
+from blender_qkzn.schemas import LLMConfig  # noqa: E402
+from blender_qkzn.tests.conftest import ServerFactory, json_response, stream_response  # noqa: E402
+
+STEPS = [
+    {"op": "mesh.primitive_cube_add", "args": {}},
+    {"op": "material.assign", "args": {"spec": "红色"}},
+    {"op": "mesh.primitive_uv_sphere_add", "args": {}},
+    {"op": "object.move", "args": {"location": [1, 2, 0]}},
+]
+
+
+def make_config(url: str, **overrides: Any) -> LLMConfig:
+    return LLMConfig(api_url=url, api_key=None, timeout=5, max_retries=0, stream=True, **overrides)
+
+
+def ndjson(steps: List[Any]) -> List[str]:
+    return [json.dumps(step) for step in steps]
+
+
+def test_parse_stream_line_handles_ndjson_and_sse() -> None:
+    assert llm_client.parse_stream_line('{"op": "a"}') == {"op": "a"}
+    assert llm_client.parse_stream_line('data: {"step": {"op": "a"}}') == {"op": "a"}
+    assert llm_client.parse_stream_line("data: [DONE]") == llm_client.STREAM_DONE
+    for ignored in ("", "   ", ": keep-alive", "event: step", "id: 3", "retry: 100", "data:"):
+        assert llm_client.parse_stream_line(ignored) is None
+    with pytest.raises(ValueError):
+        llm_client.parse_stream_line("data: {broken")
+
+
+def test_first_step_arrives_before_plan_finishes(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: stream_response(ndjson(STEPS), delay=0.1))
+    client = llm_client.LLMClient(make_config(server.url))
+    start = time.perf_counter()
+    arrivals = []
+    for step in client.stream_plan("添加红色立方体和球体"):
+        arrivals.append((time.perf_counter() - start, step.op))
+    client.close()
+
+    assert [op for _, op in arrivals] == [step["op"] for step in STEPS]
+    assert server.requests[0]["stream"] is True
+    # 每行间隔 0.1 秒：首个步骤在整份计划生成完之前就已到达
+    assert arrivals[0][0] < 0.3
+    assert arrivals[-1][0] >= 0.35
+
+
+def test_sse_stream_stops_at_done_marker(llm_server: ServerFactory) -> None:
+    lines = [
+        ": open",
+        "event: step",
+        f"data: {json.dumps({'step': STEPS[0]})}",
+        "",
+        "data: [DONE]",
+        "",
+    ]
+    lines.append(f"data: {json.dumps(STEPS[2])}")
+    server = llm_server(lambda _body: stream_response(lines, content_type="text/event-stream"))
+    client = llm_client.LLMClient(make_config(server.url))
+    assert [step.op for step in client.stream_plan("x")] == ["mesh.primitive_cube_add"]
+    client.close()
+
+
+def test_invalid_step_fails_after_valid_ones(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: stream_response(ndjson([STEPS[0], {"args": {}}])))
+    client = llm_client.LLMClient(make_config(server.url))
+    received = []
+    with pytest.raises(ValueError, match="步骤校验失败"):
+        for step in client.stream_plan("x"):
+            received.append(step.op)
+    assert received == ["mesh.primitive_cube_add"]
+    client.close()
+
+
+def test_empty_stream_is_rejected(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: stream_response(["data: [DONE]"]))
+    client = llm_client.LLMClient(make_config(server.url))
+    with pytest.raises(ValueError, match="计划步骤不能为空"):
+        list(client.stream_plan("x"))
+    client.close()
+
+
+def test_stream_command_caches_completed_plan(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: stream_response(ndjson(STEPS)))
+    cache = plan_cache.PlanCache()
+    config = make_config(server.url)
+    try:
+        first = [step.op for step in planner_client.stream_command("添加", config, cache)]
+        second = [step.op for step in planner_client.stream_command("添加", config, cache)]
+    finally:
+        llm_client.close_clients()
+    assert first == second == [step["op"] for step in STEPS]
+    assert len(server.requests) == 1
+
+
+def test_stream_command_falls_back_to_rules_before_first_step(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: json_response({"error": "bad"}, 400))
+    try:
+        ops = [
+            step.op
+            for step in planner_client.stream_command("添加一个立方体", make_config(server.url))
+        ]
+    finally:
+        llm_client.close_clients()
+    assert ops == ["mesh.primitive_cube_add"]
+
+
+def test_executor_runs_each_step_as_it_arrives(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: stream_response(ndjson(STEPS[:1] * 3), delay=0.1))
+    client = llm_client.LLMClient(make_config(server.url))
+    executed = []
+    start = time.perf_counter()
+    with patch.object(
+        executor, "_execute_single_step", lambda *_: executed.append(time.perf_counter() - start)
+    ):
+        executor.execute_steps(client.stream_plan("x"))
+    client.close()
+    assert len(executed) == 3
+    assert executed[0] < 0.2
+    assert executed[-1] - executed[0] >= 0.15
+
+
+def test_streaming_job_queues_steps_for_main_thread(llm_server: ServerFactory) -> None:
+    server = llm_server(lambda _body: stream_response(ndjson(STEPS), delay=0.05))
+    job = planning_jobs.PlanningJob("添加", use_llm=True, llm_config=make_config(server.url))
+    assert job.streaming
+    try:
+        job.start()
+        taken: List[str] = []
+        while job.state == planning_jobs.RUNNING:
+            taken.extend(step.op for step in job.take_steps())
+            time.sleep(0.01)
+        taken.extend(step.op for step in job.take_steps())
+    finally:
+        llm_client.close_clients()
+    assert job.state == planning_jobs.DONE
+    assert taken == [step["op"] for step in STEPS]
+    assert job.received == len(STEPS)
+    assert job.plan is not None and len(job.plan.steps) == len(STEPS)
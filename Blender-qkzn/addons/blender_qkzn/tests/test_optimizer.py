@@ -0,0 +1,157 @@
+"""计划优化器的单元测试，无需 bpy。"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import optimizer
+from blender_qkzn.schemas import Plan, PlanStep
+
+CUBE = "mesh.primitive_cube_add"
+SPHERE = "mesh.primitive_uv_sphere_add"
+
+
+def step(op: str, **args: Any) -> PlanStep:
+    return PlanStep(op=op, args=args)
+
+
+def assign(spec: str) -> PlanStep:
+    return step("material.assign", spec=spec)
+
+
+def move(x: float, y: float = 0.0, z: float = 0.0) -> PlanStep:
+    return step("object.move", location=[x, y, z])
+
+
+def simulate(plan: Plan) -> List[Dict[str, Any]]:
+    """按执行器语义在纯 Python 场景中执行计划，用于比较优化前后的结果。
+
+    字典描述的材质按名称共用，最后一项记录每个共用材质最终的节点参数。
+    """
+
+    objects: List[Dict[str, Any]] = []
+    shared: Dict[str, Any] = {}
+    active: Optional[Dict[str, Any]] = None
+    for item in plan.steps:
+        for _ in range(item.repeat):
+            if optimizer.is_add(item):
+                active = {
+                    "op": item.op,
+                    "location": list(item.args.get("location", [0, 0, 0])),
+                    "material": None,
+                }
+                objects.append(active)
+            elif item.op == "material.assign":
+                assert active is not None
+                spec = item.args["spec"]
+                if isinstance(spec, dict):
+                    shared[spec.get("name", "QKZN_Custom")] = spec.get("principled")
+                    spec = spec.get("name", "QKZN_Custom")
+                active["material"] = spec
+            elif item.op == "object.move":
+                assert active is not None
+                active["location"] = list(item.args["location"])
+            else:
+                objects.append({"op": item.op})
+    return objects + [shared]
+
+
+def test_dead_material_and_move_assignments_are_removed() -> None:
+    plan = Plan(
+        steps=[step(CUBE), assign("红色"), move(1), assign("蓝色"), move(2), assign("木纹")]
+    )
+    optimized, report = optimizer.optimize_plan(plan)
+    assert [item.op for item in optimized.steps] == [CUBE, "material.assign"]
+    assert optimized.steps[0].args == {"location": [2, 0, 0]}
+    assert optimized.steps[1].args == {"spec": "木纹"}
+    assert (report.dead_assignments, report.fused_moves, report.removed) == (3, 1, 4)
+    assert simulate(optimized) == simulate(plan)
+
+
+def test_dict_assignments_that_rewrite_a_shared_material_are_kept() -> None:
+    red = {"name": "M", "principled": {"Base Color": [1.0, 0.0, 0.0, 1.0]}}
+    blue = {"name": "M", "principled": {"Base Color": [0.0, 0.0, 1.0, 1.0]}}
+    plan = Plan(
+        steps=[step(CUBE), step("material.assign", spec=red), step(CUBE)]
+        + [step("material.assign", spec=blue), assign("玻璃"), assign("红色")]
+    )
+    optimized, report = optimizer.optimize_plan(plan)
+    # 第二个立方体最终为红色，但蓝色的赋值把共用的 M 改成了蓝色，只有预设赋值可以删除
+    assert [item.args["spec"] for item in optimized.steps[3:]] == [blue, "红色"]
+    assert report.dead_assignments == 1
+    assert simulate(optimized) == simulate(plan)
+    assert simulate(plan)[-1] == {"M": blue["principled"]}
+
+
+def test_assignments_are_not_merged_across_adds_or_unknown_ops() -> None:
+    plan = Plan(
+        steps=[
+            step(CUBE),
+            assign("红色"),
+            step(SPHERE),
+            assign("蓝色"),
+            step("object.shade_smooth"),
+            assign("绿色"),
+            move(3),
+        ]
+    )
+    optimized, report = optimizer.optimize_plan(plan)
+    assert report.dead_assignments == 0
+    # 未知操作之后的移动作用于球体，但不能越过屏障并入添加步骤
+    assert report.fused_moves == 0
+    assert simulate(optimized) == simulate(plan)
+
+
+def test_move_is_fused_into_add_even_after_material() -> None:
+    plan = Plan(steps=[step(CUBE, size=1.0), assign("红色"), move(1, 2, 3)])
+    optimized, report = optimizer.optimize_plan(plan)
+    assert [item.op for item in optimized.steps] == [CUBE, "material.assign"]
+    assert optimized.steps[0].args == {"size": 1.0, "location": [1, 2, 3]}
+    assert report.fused_moves == 1
+    # 原计划保持不变
+    assert plan.steps[0].args == {"size": 1.0}
+
+
+def test_invalid_move_is_left_for_the_executor() -> None:
+    plan = Plan(steps=[step(CUBE), step("object.move", location="上面")])
+    optimized, report = optimizer.optimize_plan(plan)
+    assert len(optimized.steps) == 2
+    assert report.removed == 0
+
+
+def test_identical_adds_are_run_length_batched() -> None:
+    plan = Plan(steps=[step(CUBE)] * 4 + [step(SPHERE), step(SPHERE, radius=2.0), step(CUBE)])
+    optimized, report = optimizer.optimize_plan(plan)
+    assert [(item.op, item.repeat) for item in optimized.steps] == [
+        (CUBE, 4),
+        (SPHERE, 1),
+        (SPHERE, 1),
+        (CUBE, 1),
+    ]
+    assert report.batched_adds == 3
+    assert simulate(optimized) == simulate(plan)
+
+
+def test_repeated_add_keeps_moves_separate() -> None:
+    plan = Plan(steps=[PlanStep(op=CUBE, repeat=3), move(5)])
+    optimized, report = optimizer.optimize_plan(plan)
+    assert report.fused_moves == 0
+    assert simulate(optimized) == simulate(plan)
+
+
+def test_verbose_llm_style_plan_shrinks_and_keeps_result() -> None:
+    steps: List[PlanStep] = []
+    for index in range(10):
+        steps.extend([step(CUBE), assign("默认"), assign("红色"), move(0), move(index)])
+    steps.extend([step(SPHERE), step(SPHERE), step(SPHERE)])
+    plan = Plan(steps=steps, backend="data")
+    optimized, report = optimizer.optimize_plan(plan)
+    assert report.steps_before == 53
+    assert report.steps_after == 21
+    assert "减少 32" in report.summary()
+    assert optimized.backend == "data"
+    assert simulate(optimized) == simulate(plan)
@@ -0,0 +1,172 @@
+"""计划缓存的单元测试。"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import llm_client, plan_cache, planner_client
+from blender_qkzn.schemas import LLMConfig, Plan, PlanStep
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_plan() -> Plan:
+    return Plan(steps=[PlanStep(op="object.move", args={"location": (1.0, 2.0, 3.0)})])
+
+
+def test_cache_key_normalizes_text_and_separates_modes() -> None:
+    key = plan_cache.cache_key("添加一个  立方体", "rules")
+    assert key == plan_cache.cache_key("  添加一个 立方体 ", "rules")
+    assert key == plan_cache.cache_key("添加一个　立方体", "rules")
+    assert key != plan_cache.cache_key("添加一个 立方体", "llm", "http://a")
+    assert plan_cache.cache_key("x", "llm", "http://a") != plan_cache.cache_key(
+        "x", "llm", "http://b"
+    )
+
+
+def test_memory_then_disk_hits(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    cache = plan_cache.PlanCache(path)
+    cache.put("k", make_plan())
+    hit = cache.get("k")
+    assert hit is not None and hit.steps[0].args["location"] == [1.0, 2.0, 3.0]
+    assert cache.stats.memory_hits == 1
+    cache.close()
+
+    reopened = plan_cache.PlanCache(path)
+    assert reopened.get("k") is not None
+    assert reopened.get("k") is not None
+    stats = reopened.stats
+    assert (stats.disk_hits, stats.memory_hits, stats.misses) == (1, 1, 0)
+    assert reopened.get("missing") is None
+    assert reopened.stats.misses == 1
+
+
+def test_execution_backends_survive_round_trip(tmp_path: Path) -> None:
+    cache = plan_cache.PlanCache(tmp_path / "cache.sqlite3")
+    plan = Plan(steps=[PlanStep(op="mesh.primitive_cube_add", backend="ops")], backend="data")
+    cache.put("k", plan)
+    cache.close()
+    cached = plan_cache.PlanCache(tmp_path / "cache.sqlite3").get("k")
+    assert cached is not None
+    assert cached.backend == "data"
+    assert cached.steps[0].backend == "ops"
+
+
+def test_ttl_and_size_eviction(tmp_path: Path) -> None:
+    clock = FakeClock()
+    cache = plan_cache.PlanCache(
+        tmp_path / "cache.sqlite3", memory_size=1, max_rows=2, ttl=60.0, clock=clock
+    )
+    for key in ("a", "b", "c"):
+        cache.put(key, make_plan())
+        clock.now += 1.0
+    assert cache.disk_entries() == 2
+    assert cache.get("a") is None
+    clock.now += 120.0
+    assert cache.get("c") is None
+    assert cache.get("b") is None
+    assert cache.disk_entries() == 0
+
+
+def test_parse_command_uses_cache_for_llm_plans() -> None:
+    cache = plan_cache.PlanCache()
+    config = LLMConfig(api_url="http://llm.local/plan", api_key=None, timeout=5)
+    steps = [PlanStep(op="mesh.primitive_cube_add", args={})]
+    with patch.object(llm_client, "generate_plan", return_value=steps) as generate:
+        for _ in range(3):
+            plan = planner_client.parse_command(
+                "做点什么", use_llm=True, llm_config=config, cache=cache
+            )
+            assert [step.op for step in plan.steps] == ["mesh.primitive_cube_add"]
+    assert generate.call_count == 1
+    assert cache.stats.memory_hits == 2
+
+
+def test_llm_failure_falls_back_without_caching_under_llm_key() -> None:
+    cache = plan_cache.PlanCache()
+    config = LLMConfig(api_url="http://llm.local/plan", api_key=None, timeout=5)
+    with patch.object(llm_client, "generate_plan", side_effect=RuntimeError("down")) as generate:
+        for _ in range(2):
+            plan = planner_client.parse_command(
+                "添加一个立方体", use_llm=True, llm_config=config, cache=cache
+            )
+            assert plan.steps[0].op == "mesh.primitive_cube_add"
+    assert generate.call_count == 2
+    assert cache.get(plan_cache.cache_key("添加一个立方体", "llm", config.api_url)) is None
+
+
+def test_cache_key_includes_cache_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    key = plan_cache.cache_key("x", "llm", "http://a")
+    monkeypatch.setattr(plan_cache, "CACHE_VERSION", plan_cache.CACHE_VERSION + 1)
+    assert plan_cache.cache_key("x", "llm", "http://a") != key
+
+
+def test_disk_is_trimmed_only_above_the_row_limit(tmp_path: Path) -> None:
+    cache = plan_cache.PlanCache(tmp_path / "cache.sqlite3", max_rows=2)
+    statements: List[str] = []
+    cache.put("a", make_plan())
+    db = cache._db()
+    assert db is not None
+    db.set_trace_callback(statements.append)
+    cache.put("b", make_plan())
+    cache.put("b", make_plan())
+    assert not any("NOT IN" in statement for statement in statements)
+    cache.put("c", make_plan())
+    assert sum("NOT IN" in statement for statement in statements) == 1
+    # 条目数由计数器维护，写入时不再统计整张表
+    assert not any("COUNT" in statement for statement in statements)
+    assert cache.disk_entries() == 2
+
+
+def test_stats_read_row_counter_without_touching_sqlite(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "cache.sqlite3"
+    cache = plan_cache.PlanCache(path)
+    for key in ("a", "b"):
+        cache.put(key, make_plan())
+    cache.close()
+
+    reopened = plan_cache.PlanCache(path)
+    assert reopened.disk_entries() is None
+    assert "磁盘条目 未读取" in plan_cache.describe_stats(reopened)[1]
+    assert reopened.get("a") is not None
+    assert reopened.disk_entries() == 2
+
+    statements: List[str] = []
+    db = reopened._db()
+    assert db is not None
+    db.set_trace_callback(statements.append)
+    assert "磁盘条目 2" in plan_cache.describe_stats(reopened)[1]
+    assert statements == []
+    reopened.clear()
+    assert reopened.disk_entries() == 0
+
+    # 首选项绘制时只读取已有实例，不创建缓存目录与数据库
+    monkeypatch.setattr(plan_cache, "_DEFAULT_CACHE", None)
+    assert plan_cache.describe_stats(plan_cache.peek_default_cache()) == [
+        "本次会话尚未使用计划缓存"
+    ]
+
+
+def test_rules_plans_are_not_cached(tmp_path: Path) -> None:
+    cache = plan_cache.PlanCache(tmp_path / "cache.sqlite3")
+    for _ in range(2):
+        plan = planner_client.parse_command("添加一个立方体", cache=cache)
+        assert plan.steps[0].op == "mesh.primitive_cube_add"
+    assert not cache.disk_entries()
+    assert (cache.stats.memory_hits, cache.stats.disk_hits, cache.stats.misses) == (0, 0, 0)
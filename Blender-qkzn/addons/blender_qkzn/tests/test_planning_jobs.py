@@ -0,0 +1,109 @@
+"""后台规划任务的单元测试。"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import planning_jobs
+from blender_qkzn.schemas import LLMConfig, Plan, PlanStep
+from blender_qkzn.tests.conftest import Response, ServerFactory, json_response
+
+
+def cube_plan() -> Plan:
+    return Plan(steps=[PlanStep(op="mesh.primitive_cube_add")])
+
+
+def blocking_planner(release: threading.Event, plan: Plan) -> Callable[..., Plan]:
+    def planner(command: str, **_kwargs: Any) -> Plan:
+        release.wait(5)
+        return plan
+
+    return planner
+
+
+def test_job_runs_planner_off_main_thread() -> None:
+    seen: Dict[str, Any] = {}
+
+    def planner(command: str, use_llm: bool, llm_config: Any, cache: Any) -> Plan:
+        seen.update(command=command, use_llm=use_llm, thread=threading.current_thread())
+        return cube_plan()
+
+    job = planning_jobs.PlanningJob("添加一个立方体", use_llm=True, planner=planner).start()
+    assert job.wait(5) == planning_jobs.DONE
+    assert seen["thread"] is not threading.main_thread()
+    assert seen["use_llm"] is True
+    assert job.plan is not None
+    assert [step.op for step in job.plan.steps] == ["mesh.primitive_cube_add"]
+
+
+def test_job_reports_running_until_planner_returns() -> None:
+    release = threading.Event()
+    job = planning_jobs.PlanningJob("x", planner=blocking_planner(release, cube_plan())).start()
+    assert job.state == planning_jobs.RUNNING
+    release.set()
+    assert job.wait(5) == planning_jobs.DONE
+
+
+def test_cancel_discards_late_result() -> None:
+    release = threading.Event()
+    job = planning_jobs.PlanningJob("x", planner=blocking_planner(release, cube_plan())).start()
+    assert job.cancel() is True
+    release.set()
+    assert job.wait(5) == planning_jobs.CANCELLED
+    assert job.plan is None
+    assert job.cancel() is False
+
+
+def test_planner_errors_are_kept_for_the_main_thread() -> None:
+    def planner(command: str, **_kwargs: Any) -> Plan:
+        raise ValueError("坏计划")
+
+    job = planning_jobs.PlanningJob("x", planner=planner).start()
+    assert job.wait(5) == planning_jobs.FAILED
+    assert isinstance(job.error, ValueError)
+
+
+def test_elapsed_stops_when_job_finishes() -> None:
+    ticks = iter([0.0, 10.0, 12.5, 99.0])
+    job = planning_jobs.PlanningJob(
+        "x", planner=lambda command, **_: cube_plan(), clock=lambda: next(ticks)
+    )
+    job.start()
+    job.wait(5)
+    assert job.elapsed == 2.5
+
+
+def test_active_job_cancel_helper() -> None:
+    release = threading.Event()
+    job = planning_jobs.PlanningJob("x", planner=blocking_planner(release, cube_plan())).start()
+    planning_jobs.set_active_job(job)
+    try:
+        assert planning_jobs.cancel_active_job() is True
+        assert job.state == planning_jobs.CANCELLED
+    finally:
+        release.set()
+        planning_jobs.set_active_job(None)
+    assert planning_jobs.cancel_active_job() is False
+
+
+def test_job_plans_against_slow_llm_without_blocking(llm_server: ServerFactory) -> None:
+    release = threading.Event()
+
+    def respond(_request: Dict[str, Any]) -> Response:
+        release.wait(5)
+        return json_response({"steps": [{"op": "mesh.primitive_uv_sphere_add", "args": {}}]})
+
+    server = llm_server(respond)
+    config = LLMConfig(api_url=server.url, api_key="k", timeout=5, max_retries=0)
+    job = planning_jobs.PlanningJob("添加一个球", use_llm=True, llm_config=config).start()
+    # 请求挂起期间主线程仍可轮询
+    assert job.state == planning_jobs.RUNNING
+    release.set()
+    assert job.wait(5) == planning_jobs.DONE
+    assert job.plan is not None
+    assert [step.op for step in job.plan.steps] == ["mesh.primitive_uv_sphere_add"]
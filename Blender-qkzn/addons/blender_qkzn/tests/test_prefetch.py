@@ -0,0 +1,195 @@
+"""输入预取的单元测试，使用手动触发的计时器。"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional, Tuple
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import plan_cache, planner_client, prefetch, utils
+from blender_qkzn.schemas import LLMConfig, PlanStep
+
+CONFIG = LLMConfig(api_url="http://llm.local/plan", api_key=None, timeout=5)
+
+
+class ManualTimer:
+    def __init__(self, delay: float, callback: Callable[[], None]) -> None:
+        self.delay = delay
+        self.callback = callback
+        self.cancelled = False
+
+    def start(self) -> None:
+        return None
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def fire(self) -> None:
+        if not self.cancelled:
+            self.callback()
+
+
+def make_prefetcher(
+    generator: Optional[Callable[[str, LLMConfig], Any]] = None,
+) -> Tuple[prefetch.Prefetcher, List[ManualTimer], List[str]]:
+    timers: List[ManualTimer] = []
+    calls: List[str] = []
+
+    def default_generator(text: str, _cfg: LLMConfig) -> List[PlanStep]:
+        calls.append(text)
+        return [PlanStep(op="mesh.primitive_cube_add", args={"size": len(text)})]
+
+    def factory(delay: float, callback: Callable[[], None]) -> ManualTimer:
+        timer = ManualTimer(delay, callback)
+        timers.append(timer)
+        return timer
+
+    fetcher = prefetch.Prefetcher(
+        delay=0.5, generator=generator or default_generator, timer_factory=factory
+    )
+    return fetcher, timers, calls
+
+
+def test_keystrokes_are_debounced_to_one_request() -> None:
+    fetcher, timers, calls = make_prefetcher()
+    for text in ("添", "添加", "添加一个", "添加一个立方体"):
+        fetcher.schedule(text, CONFIG)
+    assert [timer.cancelled for timer in timers] == [True, True, True, False]
+    for timer in timers:
+        timer.fire()
+    assert calls == ["添加一个立方体"]
+    plan = fetcher.take("添加一个立方体 ", CONFIG)
+    assert plan is not None and plan.steps[0].args == {"size": 7}
+    # 取出后不再保留
+    assert fetcher.take("添加一个立方体", CONFIG) is None
+
+
+def test_input_update_callback_debounces_each_edit(monkeypatch: pytest.MonkeyPatch) -> None:
+    fetcher, timers, calls = make_prefetcher()
+    prefs = SimpleNamespace(
+        prefetch_enabled=True,
+        api_url=CONFIG.api_url,
+        use_llm_default=True,
+        prefetch_delay=0.25,
+        plan_cache_enabled=False,
+    )
+    monkeypatch.setattr(utils, "get_preferences", lambda: prefs)
+    monkeypatch.setattr(prefetch, "PREFETCHER", fetcher)
+    scene = SimpleNamespace(ai_input="", ai_use_llm=False)
+    # 以 TEXTEDIT_UPDATE 注册时 Blender 每次编辑都调用回调
+    for text in ("添", "添加", "添加立方体"):
+        scene.ai_input = text
+        prefetch.on_input_update(scene, None)
+    assert [timer.cancelled for timer in timers] == [True, True, False]
+    assert fetcher.delay == 0.25
+    for timer in timers:
+        timer.fire()
+    assert calls == ["添加立方体"]
+
+
+def test_result_for_outdated_text_is_discarded() -> None:
+    release = threading.Event()
+
+    def slow_generator(text: str, _cfg: LLMConfig) -> List[PlanStep]:
+        release.wait(5)
+        return [PlanStep(op="mesh.primitive_cube_add")]
+
+    fetcher, timers, _calls = make_prefetcher(slow_generator)
+    fetcher.schedule("添加立方体", CONFIG)
+    worker = threading.Thread(target=timers[0].fire)
+    worker.start()
+    time.sleep(0.05)
+    fetcher.schedule("添加球体", CONFIG)
+    release.set()
+    worker.join(5)
+    assert fetcher.discarded == 1
+    assert fetcher.take("添加立方体", CONFIG) is None
+
+
+def test_take_waits_for_matching_inflight_request() -> None:
+    release = threading.Event()
+
+    def slow_generator(text: str, _cfg: LLMConfig) -> List[PlanStep]:
+        release.wait(5)
+        return [PlanStep(op="mesh.primitive_uv_sphere_add")]
+
+    fetcher, timers, _calls = make_prefetcher(slow_generator)
+    fetcher.schedule("添加球体", CONFIG)
+    worker = threading.Thread(target=timers[0].fire)
+    worker.start()
+    time.sleep(0.05)
+    assert fetcher.take("别的命令", CONFIG, timeout=0.1) is None
+    threading.Timer(0.05, release.set).start()
+    plan = fetcher.take("添加球体", CONFIG, timeout=5)
+    worker.join(5)
+    assert plan is not None and plan.steps[0].op == "mesh.primitive_uv_sphere_add"
+
+
+def test_returning_to_inflight_text_keeps_its_result() -> None:
+    release = threading.Event()
+
+    def slow_generator(text: str, _cfg: LLMConfig) -> List[PlanStep]:
+        release.wait(5)
+        return [PlanStep(op="mesh.primitive_cube_add")]
+
+    fetcher, timers, _calls = make_prefetcher(slow_generator)
+    fetcher.schedule("添加立方体", CONFIG)
+    worker = threading.Thread(target=timers[0].fire)
+    worker.start()
+    time.sleep(0.05)
+    fetcher.schedule("添加立方", CONFIG)
+    fetcher.schedule("添加立方体", CONFIG)
+    # 同一命令已在请求中，不再重复发起
+    assert len(timers) == 2
+    release.set()
+    worker.join(5)
+    assert fetcher.take("添加立方体", CONFIG) is not None
+
+
+def test_failures_and_cache_writes() -> None:
+    def failing(text: str, _cfg: LLMConfig) -> List[PlanStep]:
+        raise RuntimeError("offline")
+
+    fetcher, timers, _calls = make_prefetcher(failing)
+    fetcher.schedule("添加立方体", CONFIG)
+    timers[0].fire()
+    assert fetcher.take("添加立方体", CONFIG) is None
+
+    cache = plan_cache.PlanCache()
+    fetcher, timers, _calls = make_prefetcher()
+    fetcher.schedule("添加立方体", CONFIG, cache)
+    timers[0].fire()
+    assert cache.get(plan_cache.cache_key("添加立方体", "llm", CONFIG.api_url)) is not None
+
+
+def test_lru_keeps_only_recent_results() -> None:
+    fetcher, timers, _calls = make_prefetcher()
+    fetcher.size = 2
+    for text in ("a", "b", "c"):
+        fetcher.schedule(text, CONFIG)
+        timers[-1].fire()
+    assert fetcher.take("a", CONFIG) is None
+    assert fetcher.take("c", CONFIG) is not None
+
+
+def test_prefetched_planner_prefers_prefetched_plan() -> None:
+    fetcher, timers, _calls = make_prefetcher()
+    fetcher.schedule("添加一个立方体", CONFIG)
+    timers[0].fire()
+    with (
+        patch.object(prefetch, "PREFETCHER", fetcher),
+        patch.object(planner_client, "parse_command") as parse,
+    ):
+        plan = prefetch.prefetched_planner("添加一个立方体", use_llm=True, llm_config=CONFIG)
+        parse.assert_not_called()
+        prefetch.prefetched_planner("添加一个立方体", use_llm=True, llm_config=CONFIG)
+        parse.assert_called_once()
+    assert plan.steps[0].op == "mesh.primitive_cube_add"
@@ -0,0 +1,236 @@
+"""数据 API 图元与执行后端选择的测试。"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import executor, primitives
+from blender_qkzn.primitives import Vector3
+from blender_qkzn.schemas import Plan, PlanStep, validate_plan
+
+
+def face_normal(verts: Sequence[Vector3], face: Sequence[int]) -> Vector3:
+    # Newell 法计算多边形法线
+    nx = ny = nz = 0.0
+    for index, current in enumerate(face):
+        x0, y0, z0 = verts[current]
+        x1, y1, z1 = verts[face[(index + 1) % len(face)]]
+        nx += (y0 - y1) * (z0 + z1)
+        ny += (z0 - z1) * (x0 + x1)
+        nz += (x0 - x1) * (y0 + y1)
+    return nx, ny, nz
+
+
+def face_center(verts: Sequence[Vector3], face: Sequence[int]) -> Tuple[float, ...]:
+    return tuple(sum(verts[index][axis] for index in face) / len(face) for axis in range(3))
+
+
+@pytest.mark.parametrize(
+    "geometry, vert_count, face_count, extent",
+    [
+        (primitives.cube_geometry(), 8, 6, (1.0, 1.0, 1.0)),
+        (primitives.uv_sphere_geometry(), 482, 512, (1.0, 1.0, 1.0)),
+        (primitives.cylinder_geometry(), 64, 34, (1.0, 1.0, 1.0)),
+        (primitives.cube_geometry(size=3.0), 8, 6, (1.5, 1.5, 1.5)),
+        (
+            primitives.uv_sphere_geometry(segments=8, ring_count=4, radius=2.0),
+            26,
+            32,
+            (2.0, 2.0, 2.0),
+        ),
+    ],
+)
+def test_geometry_matches_operator_defaults(
+    geometry: primitives.Geometry, vert_count: int, face_count: int, extent: Vector3
+) -> None:
+    verts, faces, uvs = geometry
+    assert len(verts) == vert_count
+    assert len(faces) == face_count
+    assert len(uvs) == sum(len(face) for face in faces)
+    for axis in range(3):
+        assert max(vert[axis] for vert in verts) == pytest.approx(extent[axis])
+        assert min(vert[axis] for vert in verts) == pytest.approx(-extent[axis])
+    # 图元为以原点为中心的凸体：法线必须朝外
+    for face in faces:
+        normal = face_normal(verts, face)
+        center = face_center(verts, face)
+        assert sum(n * c for n, c in zip(normal, center)) > 0
+
+
+def test_plane_geometry_faces_up() -> None:
+    verts, faces, _uvs = primitives.plane_geometry()
+    assert face_normal(verts, faces[0])[2] > 0
+
+
+class FakeCollection:
+    def __init__(self) -> None:
+        self.data: Dict[str, List[Any]] = {}
+        self.count = 0
+
+    def add(self, count: int) -> None:
+        self.count += count
+
+    def foreach_set(self, attr: str, values: Iterable[Any]) -> None:
+        self.data[attr] = list(values)
+
+
+class FakeMesh:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.vertices = FakeCollection()
+        self.loops = FakeCollection()
+        self.polygons = FakeCollection()
+        self.uv_layers = SimpleNamespace(new=self._new_uv)
+        self.uv: Optional[FakeCollection] = None
+        self.updated = False
+
+    def _new_uv(self, name: str) -> SimpleNamespace:
+        self.uv = FakeCollection()
+        return SimpleNamespace(name=name, data=self.uv)
+
+    def update(self, calc_edges: bool = False) -> None:
+        self.updated = calc_edges
+
+
+class FakeObject:
+    def __init__(self, name: str, data: Any) -> None:
+        self.name = name
+        self.data = data
+        self.location = (0.0, 0.0, 0.0)
+        self.rotation_euler = (0.0, 0.0, 0.0)
+        self.scale = (1.0, 1.0, 1.0)
+        self.selected = False
+
+    def select_set(self, state: bool) -> None:
+        self.selected = state
+
+
+def unique_name(existing: List[Any], name: str) -> str:
+    names = {item.name for item in existing}
+    candidate, suffix = name, 0
+    while candidate in names:
+        suffix += 1
+        candidate = f"{name}.{suffix:03d}"
+    return candidate
+
+
+def install_fake_bpy() -> SimpleNamespace:
+    meshes: List[FakeMesh] = []
+    objects: List[FakeObject] = []
+    linked: List[FakeObject] = []
+
+    def new_mesh(name: str) -> FakeMesh:
+        mesh = FakeMesh(unique_name(meshes, name))
+        meshes.append(mesh)
+        return mesh
+
+    def new_object(name: str, data: Any) -> FakeObject:
+        obj = FakeObject(unique_name(objects, name), data)
+        objects.append(obj)
+        return obj
+
+    view_layer = SimpleNamespace(objects=SimpleNamespace(active=None))
+
+    class Context:
+        scene = SimpleNamespace(cursor=SimpleNamespace(location=(0.5, 0.0, 0.0)))
+        collection = SimpleNamespace(objects=SimpleNamespace(link=linked.append))
+        view_layer: Any = None
+
+        @property
+        def selected_objects(self) -> List[FakeObject]:
+            return [obj for obj in linked if obj.selected]
+
+        @property
+        def active_object(self) -> Any:
+            return view_layer.objects.active
+
+    Context.view_layer = view_layer
+    cube_add = MagicMock(name="cube_add")
+    fake = SimpleNamespace(
+        data=SimpleNamespace(
+            meshes=SimpleNamespace(new=new_mesh), objects=SimpleNamespace(new=new_object)
+        ),
+        context=Context(),
+        ops=SimpleNamespace(
+            mesh=SimpleNamespace(
+                primitive_cube_add=cube_add, primitive_uv_sphere_add=MagicMock(name="sphere_add")
+            )
+        ),
+        types=SimpleNamespace(
+            MeshPolygon=SimpleNamespace(
+                bl_rna=SimpleNamespace(properties={"loop_total": SimpleNamespace(is_readonly=True)})
+            )
+        ),
+        meshes=meshes,
+        linked=linked,
+        cube_add=cube_add,
+    )
+    primitives.bpy = fake  # type: ignore[attr-defined]
+    executor.bpy = fake  # type: ignore[attr-defined]
+    executor.clear_operator_cache()
+    return fake
+
+
+def test_add_primitive_links_selects_and_places_object() -> None:
+    fake = install_fake_bpy()
+    first = primitives.add_primitive("mesh.primitive_cube_add", {}, fake.context)
+    second = primitives.add_primitive(
+        "mesh.primitive_cube_add",
+        {"size": 1.0, "location": (1, 2, 3), "scale": (2, 2, 2)},
+        fake.context,
+    )
+    assert (first.name, second.name, second.data.name) == ("Cube", "Cube.001", "Cube.001")
+    assert first.location == (0.5, 0.0, 0.0)
+    assert second.location == (1, 2, 3) and second.scale == (2, 2, 2)
+    assert fake.context.selected_objects == [second]
+    assert fake.context.view_layer.objects.active is second
+    mesh = second.data
+    assert (mesh.vertices.count, mesh.loops.count, mesh.polygons.count) == (8, 24, 6)
+    assert max(mesh.vertices.data["co"]) == 0.5
+    assert mesh.polygons.data["loop_start"] == [0, 4, 8, 12, 16, 20]
+    assert "loop_total" not in mesh.polygons.data
+    assert len(mesh.uv.data["uv"]) == 48 and mesh.updated
+
+
+def test_backend_selection_per_plan_and_per_step() -> None:
+    fake = install_fake_bpy()
+    plan = validate_plan(
+        {
+            "backend": "data",
+            "steps": [
+                {"op": "mesh.primitive_cube_add", "args": {}},
+                {"op": "mesh.primitive_cube_add", "args": {}, "backend": "ops"},
+                {"op": "mesh.primitive_uv_sphere_add", "args": {"radius": 0.5}},
+            ],
+        }
+    )
+    executor.execute_plan(plan)
+    assert [obj.name for obj in fake.linked] == ["Cube", "Sphere"]
+    fake.cube_add.assert_called_once_with()
+    assert fake.meshes[1].vertices.count == 482
+
+
+def test_data_backend_falls_back_to_ops_for_unsupported_args() -> None:
+    fake = install_fake_bpy()
+    executor.execute_plan(
+        Plan(steps=[PlanStep(op="mesh.primitive_cube_add", args={"enter_editmode": True})]),
+        backend="data",
+    )
+    fake.cube_add.assert_called_once_with(enter_editmode=True)
+    assert fake.linked == []
+
+
+def test_unknown_backend_is_rejected() -> None:
+    with pytest.raises(ValueError, match="未知执行后端"):
+        PlanStep(op="mesh.primitive_cube_add", backend="gpu")
+    install_fake_bpy()
+    with pytest.raises(executor.ExecutionError, match="未知执行后端"):
+        executor.execute_plan(Plan(steps=[PlanStep(op="mesh.primitive_cube_add")]), backend="gpu")
@@ -41,3 +41,46 @@ def test_parse_multi_shape_materials() -> None:
     ]
     assert plan.steps[1].args["spec"] == "木纹"
     assert plan.steps[3].args["spec"] == "金属"
+
+
+def test_parse_steps_follow_sentence_order() -> None:
+    plan = planner_client.parse_command("添加金属球体，再添加立方体")
+    ops = [step.op for step in plan.steps]
+    assert ops == [
+        "mesh.primitive_uv_sphere_add",
+        "material.assign",
+        "mesh.primitive_cube_add",
+    ]
+
+
+def test_parse_moves_attach_to_preceding_object() -> None:
+    text = "添加一个立方体，移动到 X1 Y0 Z0，再添加一个红色圆球，移动到X2Y3Z-1"
+    plan = planner_client.parse_command(text)
+    ops = [step.op for step in plan.steps]
+    assert ops == [
+        "mesh.primitive_cube_add",
+        "object.move",
+        "mesh.primitive_uv_sphere_add",
+        "material.assign",
+        "object.move",
+    ]
+    assert plan.steps[4].args["location"] == (2.0, 3.0, -1.0)
+
+
+def test_parse_material_aliases_from_presets() -> None:
+    plan = planner_client.parse_command("添加一个木材立方体，应用塑料材质")
+    assert [step.args.get("spec") for step in plan.steps] == [None, "木材", "塑料"]
+
+
+def test_apply_does_not_swallow_following_clauses() -> None:
+    plan = planner_client.parse_command("应用材质，添加一个玻璃球体")
+    ops = [step.op for step in plan.steps]
+    assert ops == ["mesh.primitive_uv_sphere_add", "material.assign"]
+    assert plan.steps[1].args["spec"] == "玻璃"
+
+    plan = planner_client.parse_command("应用一下金属材质，添加一个红色立方体")
+    assert [(step.op, step.args.get("spec")) for step in plan.steps] == [
+        ("material.assign", "金属"),
+        ("mesh.primitive_cube_add", None),
+        ("material.assign", "红色"),
+    ]
@@ -0,0 +1,217 @@
+"""计划调度的测试：对象链划分、并行准备几何与提交结果的一致性。"""
+
+from __future__ import annotations
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import executor, primitives, scheduler
+from blender_qkzn.schemas import Plan, PlanStep
+from blender_qkzn.tests import fake_scene
+
+SPHERE = "mesh.primitive_uv_sphere_add"
+
+
+def step(op: str, **args: Any) -> PlanStep:
+    return PlanStep(op=op, args=args)
+
+
+def material_spec(name: str, *color: float) -> Dict[str, Any]:
+    return {"name": name, "principled": {"Base Color": [*color, 1.0]}}
+
+
+def procedural_plan(count: int) -> Plan:
+    steps: List[PlanStep] = []
+    for index in range(count):
+        # 32 段 17 环约 500 个顶点，达到交给进程池的大小
+        args = {"radius": 1.0 + index % 10 * 0.1, "segments": 32 + index % 3, "ring_count": 17}
+        steps.append(step(SPHERE, location=[index, 0, 0], **args))
+        steps.append(step("material.assign", spec="红色" if index % 2 else "玻璃"))
+    return Plan(steps=steps, backend="data")
+
+
+def scene_summary(scene: fake_scene.FakeBpy) -> List[Any]:
+    rows: List[Any] = [
+        (
+            obj.name,
+            obj.location,
+            [slot.name for slot in obj.material_slots],
+            obj.data.vertices.data["co"],
+            obj.data.polygons.data["loop_start"],
+        )
+        for obj in scene.data.objects
+    ]
+    active = scene.context.active_object
+    return rows + [active.name if active is not None else None]
+
+
+def test_build_chains_groups_steps_per_object_and_orders_barriers() -> None:
+    steps = [
+        step("material.assign", spec="红色"),
+        step("mesh.primitive_cube_add"),
+        step("object.move", location=[1, 0, 0]),
+        step(SPHERE),
+        step("object.shade_smooth"),
+        step("material.assign", spec="蓝色"),
+        step("mesh.primitive_cube_add"),
+    ]
+    chains = scheduler.build_chains(steps)
+    assert [(chain.steps, chain.creates, chain.barrier, chain.depends_on) for chain in chains] == [
+        ([0], False, False, []),
+        ([1, 2], True, False, []),
+        ([3], True, False, []),
+        ([4], False, True, [0, 1, 2]),
+        ([5], False, False, [3]),
+        ([6], True, False, [3]),
+    ]
+
+
+def test_geometry_keys_only_cover_data_backend_adds() -> None:
+    steps = [
+        step(SPHERE, radius=2.0, location=[1, 0, 0]),
+        step(SPHERE, location=[5, 0, 0], radius=2.0),
+        PlanStep(op="mesh.primitive_cube_add", backend="ops"),
+        step("mesh.primitive_cube_add", enter_editmode=True),
+        step("mesh.primitive_torus_add"),
+    ]
+    assert scheduler.geometry_keys(steps, "data") == [(SPHERE, (("radius", 2.0),))]
+    assert scheduler.geometry_keys(steps, "ops") == []
+
+
+def test_scheduled_execution_matches_sequential_execution() -> None:
+    plan = procedural_plan(40)
+    sequential = fake_scene.install()
+    executor.execute_plan(plan)
+    expected = scene_summary(sequential)
+
+    scheduled = fake_scene.install()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        report = scheduler.execute_scheduled(plan, workers=4, pool=pool)
+    assert scene_summary(scheduled) == expected
+    counts = (report.chains, report.barriers, report.geometries, report.pooled, report.shared)
+    assert counts == (40, 0, 30, 30, 10)
+
+
+def test_shared_material_assignments_keep_plan_order() -> None:
+    # 两次赋值改写同一个具名材质，按链提交会先执行针对 $a 的那次
+    plan = Plan(
+        steps=[
+            PlanStep(op="mesh.primitive_cube_add", bind="$a"),
+            step("mesh.primitive_cube_add"),
+            step("material.assign", spec=material_spec("M", 0.0, 0.0, 1.0)),
+            PlanStep(
+                op="material.assign", args={"spec": material_spec("M", 1.0, 0.0, 0.0)}, target="$a"
+            ),
+        ],
+        backend="data",
+    )
+    sequential = fake_scene.install()
+    executor.execute_plan(plan)
+    scheduled = fake_scene.install()
+    scheduler.execute_scheduled(plan, workers=1)
+    for scene in (sequential, scheduled):
+        bsdf = scene.data.materials["M"].node_tree.nodes.get("Principled BSDF")
+        assert bsdf.inputs.get("Base Color").default_value == [1.0, 0.0, 0.0, 1.0]
+
+
+@pytest.mark.parametrize("segments", ["32", 32.5])
+def test_invalid_primitive_argument_fails_only_its_step(segments: Any) -> None:
+    # "32" 在估算顶点数时就出错，32.5 能估算但在进程池中生成几何时出错
+    plan = procedural_plan(10)
+    plan.steps.insert(4, step(SPHERE, segments=segments, ring_count=17))
+    sequential = fake_scene.install()
+    with pytest.raises(executor.ExecutionError):
+        executor.execute_plan(plan)
+    expected = scene_summary(sequential)
+
+    scheduled = fake_scene.install()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        with pytest.raises(executor.ExecutionError):
+            scheduler.execute_scheduled(plan, workers=4, pool=pool)
+    assert scene_summary(scheduled) == expected
+    assert len(scheduled.data.objects) == 10
+
+
+class LazyFuture:
+    def __init__(self, value: Any, on_result: Any) -> None:
+        self.value = value
+        self.on_result = on_result
+
+    def result(self) -> Any:
+        self.on_result()
+        if isinstance(self.value, BaseException):
+            raise self.value
+        return self.value
+
+    def cancel(self) -> bool:
+        return True
+
+
+def test_commit_waits_only_for_each_chains_geometry(monkeypatch: pytest.MonkeyPatch) -> None:
+    plan = procedural_plan(12)
+    keys = scheduler.geometry_keys(plan.steps, "data")
+    arrays = {key: primitives.build_arrays(key) for key in keys}
+    scene = fake_scene.install()
+    waits: List[int] = []
+
+    class Pool:
+        def submit(self, _fn: Any, key: Any) -> LazyFuture:
+            return LazyFuture(arrays[key], lambda: waits.append(len(scene.data.objects)))
+
+    def fail(_geometry: Any) -> Any:
+        raise AssertionError("提交阶段不应重新计算几何")
+
+    monkeypatch.setattr(primitives, "mesh_arrays", fail)
+    report = scheduler.execute_scheduled(plan, workers=2, pool=Pool())  # type: ignore[arg-type]
+    # 每条链在前一条链写入场景之后才取自己的几何
+    assert waits == list(range(12))
+    assert report.pooled == 12
+    assert primitives._PREPARED == {}
+
+
+def test_broken_pool_falls_back_to_main_thread() -> None:
+    plan = procedural_plan(10)
+    sequential = fake_scene.install()
+    executor.execute_plan(plan)
+    expected = scene_summary(sequential)
+
+    class BrokenPool:
+        def submit(self, *_args: Any) -> LazyFuture:
+            return LazyFuture(BrokenProcessPool("子进程异常退出"), lambda: None)
+
+    scene = fake_scene.install()
+    report = scheduler.execute_scheduled(plan, workers=2, pool=BrokenPool())  # type: ignore[arg-type]
+    assert scene_summary(scene) == expected
+    assert report.pooled == 10
+
+
+def test_small_geometry_stays_on_main_thread() -> None:
+    class NoPool:
+        def submit(self, *_args: Any) -> Any:
+            raise AssertionError("小几何不应提交到进程池")
+
+    small = [(SPHERE, (("ring_count", 4), ("segments", 8 + index))) for index in range(20)]
+    assert scheduler.submit_geometry(small, workers=4, pool=NoPool()) == {}  # type: ignore[arg-type]
+    assert (
+        scheduler.submit_geometry(
+            scheduler.geometry_keys(procedural_plan(4).steps, "data"), workers=4
+        )
+        == {}
+    )
+
+
+def test_process_pool_prepares_same_arrays() -> None:
+    keys = scheduler.geometry_keys(procedural_plan(10).steps, "data")
+    try:
+        futures = scheduler.submit_geometry(keys, workers=2)
+        arrays = {key: future.result() for key, future in futures.items()}
+    finally:
+        scheduler.shutdown_pool()
+    assert arrays == {key: primitives.build_arrays(key) for key in keys}
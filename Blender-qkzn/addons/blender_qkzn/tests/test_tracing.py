@@ -0,0 +1,135 @@
+"""执行追踪的测试：计时区间、Chrome trace 导出、汇总表与各阶段埋点。"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import executor, llm_client, planner_client, tracing
+from blender_qkzn.schemas import LLMConfig, Plan, PlanStep
+from blender_qkzn.tests.conftest import ServerFactory, json_response
+
+
+@pytest.fixture
+def tracer() -> Iterator[tracing.Tracer]:
+    tracing.TRACER.clear()
+    tracing.TRACER.enabled = True
+    try:
+        yield tracing.TRACER
+    finally:
+        tracing.TRACER.enabled = False
+        tracing.TRACER.clear()
+
+
+def test_disabled_tracer_records_nothing() -> None:
+    local = tracing.Tracer()
+    with local.span("op", "step", {"index": 1}) as args:
+        assert args is None
+    assert local.events == []
+
+
+def test_span_records_outcome_and_reraises() -> None:
+    ticks = itertools.count()
+    local = tracing.Tracer(clock=lambda: next(ticks) / 1000.0)
+    local.enabled = True
+    with local.span("ok", "step", {"index": 1}):
+        pass
+    with pytest.raises(RuntimeError):
+        with local.span("bad", "step"):
+            raise RuntimeError("boom")
+    first, second = local.events
+    assert (first.name, first.outcome, first.args, first.duration) == (
+        "ok",
+        "ok",
+        {"index": 1},
+        0.001,
+    )
+    assert second.outcome == "error"
+    assert second.args["error"] == "RuntimeError: boom"
+
+
+def test_chrome_trace_and_summary(tmp_path: Path) -> None:
+    durations = [1, 2, 3, 4, 100]
+    times = []
+    start = 10.0
+    for duration in durations:
+        times.extend([start, start + duration / 1000.0])
+        start += 1.0
+    times.extend([50.0, 50.5])
+    clock = iter(times)
+    local = tracing.Tracer(clock=lambda: next(clock))
+    local.enabled = True
+    for _ in durations:
+        with local.span("mesh.primitive_cube_add", "step"):
+            pass
+    with local.span("http", "llm"):
+        pass
+
+    path = local.export_chrome_trace(tmp_path / "trace" / "run.json")
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    events = trace["traceEvents"]
+    assert len(events) == 6
+    assert events[0]["ph"] == "X" and events[0]["ts"] == 0
+    assert events[1]["ts"] == pytest.approx(1e6) and events[1]["dur"] == pytest.approx(2000)
+    assert events[-1]["args"] == {"outcome": "ok"}
+
+    http, cube = local.summary()
+    assert (http["name"], http["count"], http["max_ms"]) == ("http", 1, pytest.approx(500))
+    assert cube["count"] == 5
+    assert cube["p50_ms"] == pytest.approx(3)
+    assert cube["p95_ms"] == pytest.approx(100)
+    table = local.format_summary().splitlines()
+    assert table[0].split() == ["name", "count", "errors", "p50", "ms", "p95", "ms", "max", "ms"]
+    assert table[2].startswith("step/mesh.primitive_cube_add")
+
+
+def test_executor_traces_each_step(tracer: tracing.Tracer) -> None:
+    @executor.register_step_handler("test.trace")
+    def _record(step: PlanStep) -> None:
+        if step.args.get("fail"):
+            raise RuntimeError("失败")
+
+    plan = Plan(
+        steps=[
+            PlanStep(op="test.trace", args={"name": "立方体"}),
+            PlanStep(op="test.trace", args={"fail": 1}),
+        ]
+    )
+    try:
+        with pytest.raises(executor.ExecutionError):
+            executor.execute_plan(plan)
+    finally:
+        executor._HANDLERS.pop("test.trace")
+    steps = [event for event in tracer.events if event.category == "step"]
+    assert [(event.args["index"], event.outcome) for event in steps] == [(1, "ok"), (2, "error")]
+    assert steps[0].args["args_size"] == len('{"name": "立方体"}'.encode("utf-8"))
+    assert steps[0].end <= steps[1].start
+    assert [event.name for event in tracer.events if event.category == "execution"] == ["validate"]
+
+
+def test_planning_and_http_phases_are_traced(
+    tracer: tracing.Tracer, llm_server: ServerFactory
+) -> None:
+    pytest.importorskip("requests")
+    server = llm_server(
+        lambda _body: json_response({"plan": [{"op": "mesh.primitive_cube_add", "args": {}}]})
+    )
+    config = LLMConfig(api_url=server.url, api_key=None, timeout=5, max_retries=0)
+    try:
+        planner_client.parse_command("添加立方体", use_llm=True, llm_config=config)
+    finally:
+        llm_client.close_clients()
+    names = {(event.category, event.name): event for event in tracer.events}
+    parse = names[("planning", "parse_command")]
+    http = names[("llm", "http")]
+    assert names[("llm", "validate")].outcome == "ok"
+    assert parse.args == {"use_llm": True}
+    # HTTP 区间嵌套在规划区间内
+    assert parse.start <= http.start <= http.end <= parse.end
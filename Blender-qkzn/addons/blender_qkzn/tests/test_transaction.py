@@ -0,0 +1,215 @@
+"""事务执行与回滚的测试，使用带 session_uid 的假 bpy。"""
+
+from __future__ import annotations
+
+import itertools
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from blender_qkzn import executor, materials, transaction
+from blender_qkzn.schemas import Plan, PlanStep
+from blender_qkzn.tests import fake_scene
+
+_UIDS = itertools.count(1)
+
+
+class FakeID:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.session_uid = next(_UIDS)
+
+
+class FakeMaterial(FakeID):
+    use_nodes = False
+    node_tree = None
+
+
+class FakeMesh(FakeID):
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.materials: List[Optional[FakeMaterial]] = []
+
+
+class FakeObject(FakeID):
+    def __init__(self, name: str, data: FakeMesh) -> None:
+        super().__init__(name)
+        self.data = data
+        self.location = (0.0, 0.0, 0.0)
+
+    @property
+    def material_slots(self) -> List[Any]:
+        return [
+            SimpleNamespace(name=material.name if material else "")
+            for material in self.data.materials
+        ]
+
+
+class FakeCollection(List[Any]):
+    def __init__(self, factory: Callable[..., Any]) -> None:
+        super().__init__()
+        self.factory = factory
+
+    def get(self, name: str) -> Any:
+        return next((item for item in self if item.name == name), None)
+
+    def new(self, name: str, *args: Any) -> Any:
+        item = self.factory(name, *args)
+        self.append(item)
+        return item
+
+
+def install_fake_bpy(existing: int = 2) -> SimpleNamespace:
+    data = SimpleNamespace(
+        objects=FakeCollection(FakeObject),
+        meshes=FakeCollection(FakeMesh),
+        materials=FakeCollection(FakeMaterial),
+    )
+    context = SimpleNamespace(active_object=None)
+
+    def batch_remove(ids: Iterable[Any]) -> None:
+        for block in list(ids):
+            for collection in (data.objects, data.meshes, data.materials):
+                if block in collection:
+                    collection.remove(block)
+        fake.removed_batches += 1
+
+    def cube_add(*_args: Any, **kwargs: Any) -> None:
+        obj = data.objects.new("Cube", data.meshes.new("Cube"))
+        obj.location = tuple(kwargs.get("location", (0.0, 0.0, 0.0)))
+        context.active_object = obj
+
+    def pair_add(**_kwargs: Any) -> None:
+        # 一次创建两个对象，激活对象只能解释其中一个
+        for name in ("Left", "Right"):
+            data.objects.new(name, data.meshes.new(name))
+
+    data.batch_remove = batch_remove
+    ops = SimpleNamespace(
+        mesh=SimpleNamespace(
+            primitive_cube_add=MagicMock(side_effect=cube_add),
+            primitive_pair_add=MagicMock(side_effect=pair_add),
+            primitive_broken_add=MagicMock(side_effect=RuntimeError("boom")),
+        )
+    )
+    fake = SimpleNamespace(data=data, context=context, ops=ops, removed_batches=0)
+    for _ in range(existing):
+        cube_add()
+    context.active_object = data.objects[0] if existing else None
+    for module in (executor, materials, transaction):
+        module.bpy = fake  # type: ignore[attr-defined]
+    executor.clear_operator_cache()
+    return fake
+
+
+def step(op: str, **args: Any) -> PlanStep:
+    return PlanStep(op=op, args=args)
+
+
+def names(collection: Iterable[Any]) -> List[str]:
+    return [item.name for item in collection]
+
+
+def test_failed_plan_is_rolled_back_completely() -> None:
+    fake = install_fake_bpy()
+    existing = fake.data.objects[0]
+    existing.data.materials.append(fake.data.materials.new("旧材质"))
+    before = (names(fake.data.objects), names(fake.data.meshes), names(fake.data.materials))
+    plan = Plan(
+        steps=[
+            step("object.move", location=[5, 0, 0]),
+            step("material.assign", spec="红色"),
+            step("mesh.primitive_cube_add", location=[1, 2, 3]),
+            step("material.assign", spec="蓝色"),
+            step("mesh.primitive_pair_add"),
+            step("mesh.primitive_broken_add"),
+            step("mesh.primitive_cube_add"),
+        ]
+    )
+    with pytest.raises(executor.ExecutionError, match="步骤 6 失败，已回滚此前成功的 5 个步骤"):
+        executor.execute_plan(plan, transactional=True)
+
+    assert (names(fake.data.objects), names(fake.data.meshes), names(fake.data.materials)) == before
+    assert existing.location == (0.0, 0.0, 0.0)
+    assert names(existing.data.materials) == ["旧材质"]
+    assert fake.removed_batches == 1
+    # 失败之后的步骤不再执行
+    assert fake.ops.mesh.primitive_cube_add.call_count == 1
+    assert transaction.current() is None
+
+
+def test_transaction_records_what_each_step_created() -> None:
+    fake = install_fake_bpy()
+    tx = transaction.Transaction().begin()
+    executor.run_step(1, step("mesh.primitive_cube_add"), tx=tx)
+    executor.run_step(2, step("material.assign", spec="红色"), tx=tx)
+    executor.run_step(3, step("mesh.primitive_pair_add"), tx=tx)
+    created = sorted((index, kind, block.name) for index, kind, block in tx.created)
+    assert created == [
+        (1, "meshes", "Cube"),
+        (1, "objects", "Cube"),
+        (2, "materials", "QKZN_Color_红色"),
+        (3, "meshes", "Left"),
+        (3, "meshes", "Right"),
+        (3, "objects", "Left"),
+        (3, "objects", "Right"),
+    ]
+    assert [(index, description) for index, description, _ in tx.changes] == [(2, "Cube.materials")]
+    assert tx.rollback() == (7, 1)
+    assert len(fake.data.objects) == 2
+
+
+def test_non_transactional_mode_keeps_running_after_failure() -> None:
+    fake = install_fake_bpy(existing=0)
+    plan = Plan(steps=[step("mesh.primitive_broken_add"), step("mesh.primitive_cube_add")])
+    with pytest.raises(executor.ExecutionError, match="成功 1 / 失败 1"):
+        executor.execute_plan(plan)
+    assert names(fake.data.objects) == ["Cube"]
+
+
+def test_successful_transaction_commits_and_passes_undo_flag() -> None:
+    fake = install_fake_bpy(existing=0)
+    plan = Plan(steps=[step("mesh.primitive_cube_add", location=[1, 0, 0])])
+    executor.execute_plan(plan, transactional=True, undo_steps=True)
+    fake.ops.mesh.primitive_cube_add.assert_called_once_with(
+        "EXEC_DEFAULT", True, location=[1, 0, 0]
+    )
+    assert fake.removed_batches == 0
+
+
+def test_stream_error_rolls_back_executed_steps() -> None:
+    fake = install_fake_bpy(existing=0)
+
+    def stream() -> Iterator[PlanStep]:
+        yield step("mesh.primitive_cube_add")
+        raise ValueError("连接中断")
+
+    with pytest.raises(ValueError, match="连接中断"):
+        executor.execute_steps(stream(), transactional=True)
+    assert len(fake.data.objects) == 0
+
+
+def test_rollback_restores_existing_material_inputs() -> None:
+    scene = fake_scene.install()
+    existing = scene.data.materials.new("QKZN_Color_红色")
+    existing.use_nodes = True
+    base_color = existing.node_tree.nodes["Principled BSDF"].inputs["Base Color"]
+    base_color.default_value = [0.2, 0.2, 0.2, 1.0]
+    bare = scene.data.materials.new("QKZN_Metal")
+    steps = [
+        step("mesh.primitive_cube_add"),
+        step("material.assign", spec="红色"),
+        step("material.assign", spec="金属"),
+        PlanStep(op="object.move", args={"location": [1, 0, 0]}, target="$gone"),
+    ]
+    with pytest.raises(executor.ExecutionError, match="步骤 4 失败"):
+        executor.execute_steps(iter(steps), transactional=True)
+    assert base_color.default_value == [0.2, 0.2, 0.2, 1.0]
+    assert bare.use_nodes is False
+    assert names(scene.data.materials) == ["QKZN_Color_红色", "QKZN_Metal"]
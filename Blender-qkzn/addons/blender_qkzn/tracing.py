@@ -0,0 +1,172 @@
+"""执行追踪：记录规划、HTTP 请求与每个执行步骤的起止时间，可导出 Chrome trace 与汇总表。
+
+默认关闭，关闭时 span() 直接返回空上下文，不计时也不分配事件。时间取自单调时钟
+time.perf_counter，导出时换算为相对首个事件的微秒，可在 chrome://tracing 或 Perfetto 中打开。
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, Union
+
+_NULL_SPAN: ContextManager[None] = nullcontext()
+
+
+@dataclass
+class TraceEvent:
+    """一段已结束的计时区间。"""
+
+    name: str
+    category: str
+    start: float
+    end: float
+    thread_id: int
+    outcome: str = "ok"
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def args_size(args: Any) -> int:
+    """参数序列化为 JSON 后的字节数，用于衡量步骤参数的大小。"""
+
+    return len(json.dumps(args, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    # 最近秩法：样本较少时不做插值
+    rank = max(1, math.ceil(fraction * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+class Tracer:
+    """线程安全的事件收集器，规划在后台线程、执行在主线程时都能记录。"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.enabled = False
+        self._clock = clock
+        self._events: List[TraceEvent] = []
+        self._lock = threading.Lock()
+
+    @property
+    def events(self) -> List[TraceEvent]:
+        with self._lock:
+            return list(self._events)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+
+    def span(
+        self, name: str, category: str, args: Optional[Dict[str, Any]] = None
+    ) -> ContextManager[Any]:
+        """计时一个区间；抛出异常时结果记为 error 并附带异常信息，异常照常向外传播。"""
+
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, dict(args or {}))
+
+    @contextmanager
+    def _span(self, name: str, category: str, args: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        outcome = "ok"
+        start = self._clock()
+        try:
+            yield args
+        except BaseException as exc:
+            outcome = "error"
+            args["error"] = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            event = TraceEvent(
+                name, category, start, self._clock(), threading.get_ident(), outcome, args
+            )
+            with self._lock:
+                self._events.append(event)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """转换为 Chrome trace-event 格式（完整事件 ph="X"，时间单位为微秒）。"""
+
+        events = self.events
+        origin = min((event.start for event in events), default=0.0)
+        pid = os.getpid()
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": event.name,
+                    "cat": event.category,
+                    "ph": "X",
+                    "ts": round((event.start - origin) * 1e6, 3),
+                    "dur": round(event.duration * 1e6, 3),
+                    "pid": pid,
+                    "tid": event.thread_id,
+                    "args": {"outcome": event.outcome, **event.args},
+                }
+                for event in sorted(events, key=lambda item: item.start)
+            ],
+        }
+
+    def export_chrome_trace(self, path: Union[str, Path]) -> Path:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("w", encoding="utf-8") as fh:
+            json.dump(self.to_chrome_trace(), fh, ensure_ascii=False, default=str)
+        return target
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """按 (类别, 名称) 汇总：次数、失败数与 p50/p95/最大耗时（毫秒），按总耗时降序。"""
+
+        groups: Dict[Tuple[str, str], List[TraceEvent]] = {}
+        for event in self.events:
+            groups.setdefault((event.category, event.name), []).append(event)
+        rows: List[Dict[str, Any]] = []
+        for (category, name), items in groups.items():
+            durations = sorted(event.duration * 1000.0 for event in items)
+            rows.append(
+                {
+                    "category": category,
+                    "name": name,
+                    "count": len(items),
+                    "errors": sum(1 for event in items if event.outcome != "ok"),
+                    "total_ms": sum(durations),
+                    "p50_ms": _percentile(durations, 0.5),
+                    "p95_ms": _percentile(durations, 0.95),
+                    "max_ms": durations[-1],
+                }
+            )
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def format_summary(self) -> str:
+        """汇总表的文本形式，便于写入日志。"""
+
+        rows = self.summary()
+        width = max([len(f"{row['category']}/{row['name']}") for row in rows] + [4])
+        lines = [
+            f"{'name':<{width}} {'count':>7} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+        ]
+        for row in rows:
+            label = f"{row['category']}/{row['name']}"
+            lines.append(
+                f"{label:<{width}} {row['count']:>7} {row['errors']:>6} "
+                f"{row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['max_ms']:>9.3f}"
+            )
+        return "\n".join(lines)
+
+
+TRACER = Tracer()
+
+
+def span(name: str, category: str, args: Optional[Dict[str, Any]] = None) -> ContextManager[Any]:
+    """在全局追踪器上计时一个区间。"""
+
+    return TRACER.span(name, category, args)
@@ -0,0 +1,186 @@
+"""事务执行：记录每个步骤创建的数据块与修改的属性，失败时就地回滚，无需重新加载文件。
+
+新建数据块通过 ``ID.session_uid`` 识别：该编号在会话内全局递增，事务开始时记下最大值，之后
+出现的更大编号即为事务内创建。每步结束后先检查激活对象及其数据、材质等候选项，只有集合数量
+的增长无法由候选项解释时才扫描对应集合，因此常见的 “添加 + 赋材质” 步骤不需要遍历场景。
+已有数据块的属性由步骤处理函数在修改前通过 record_property / record_restore 记入事务，
+包括 materials.ensure_material 对已有材质节点输入的改写。事务期间被删除的已有数据块无法恢复。
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from . import utils
+
+try:
+    import bpy
+except ImportError:  # pragma: no cover - 测试环境无 bpy
+    bpy = None  # type: ignore[assignment, unused-ignore]
+
+TRACKED = ("objects", "meshes", "materials")
+
+_CURRENT: Optional["Transaction"] = None
+
+
+def current() -> Optional["Transaction"]:
+    """返回正在执行步骤的事务，供步骤处理函数记录属性修改。"""
+
+    return _CURRENT
+
+
+def _snapshot(value: Any) -> Any:
+    # mathutils 向量等会随对象变化，需要复制一份
+    copy = getattr(value, "copy", None)
+    if callable(copy):
+        return copy()
+    if isinstance(value, list):
+        return list(value)
+    if hasattr(value, "__len__") and not isinstance(value, (str, bytes)):
+        # 节点输入的 bpy_prop_array 没有 copy()，同样是对底层数据的引用
+        return tuple(value)
+    return value
+
+
+class Transaction:
+    """一次计划执行的事务日志。"""
+
+    def __init__(self) -> None:
+        self.created: List[Tuple[int, str, Any]] = []
+        self.changes: List[Tuple[int, str, Callable[[], None]]] = []
+        self.step = 0
+        self._seen: Set[int] = set()
+        self._counts: Dict[str, int] = {}
+        self._watermark = 0
+        self._open = False
+
+    def begin(self) -> "Transaction":
+        if bpy is None:
+            raise RuntimeError("当前环境缺少 bpy，无法开启事务")
+        for name in TRACKED:
+            collection = getattr(bpy.data, name)
+            self._counts[name] = len(collection)
+            for block in collection:
+                self._watermark = max(self._watermark, block.session_uid)
+        self._open = True
+        return self
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    @contextmanager
+    def step_scope(self, index: int) -> Iterator["Transaction"]:
+        """包裹单个步骤：期间 current() 返回本事务，结束后（包括失败时）收集新建的数据块。"""
+
+        global _CURRENT
+        if not self._open:
+            raise RuntimeError("事务未开启或已结束")
+        self.step = index
+        previous, _CURRENT = _CURRENT, self
+        try:
+            yield self
+        finally:
+            _CURRENT = previous
+            self._collect_created()
+
+    def record_property(self, target: Any, attr: str) -> None:
+        """在修改前记下属性的旧值。"""
+
+        old = _snapshot(getattr(target, attr))
+        self.record_restore(
+            f"{getattr(target, 'name', target)}.{attr}", lambda: setattr(target, attr, old)
+        )
+
+    def record_materials(self, data: Any) -> None:
+        """在修改前记下网格的材质槽列表。"""
+
+        old = list(data.materials)
+
+        def restore() -> None:
+            data.materials.clear()
+            for material in old:
+                data.materials.append(material)
+
+        self.record_restore(f"{getattr(data, 'name', data)}.materials", restore)
+
+    def record_restore(self, description: str, restore: Callable[[], None]) -> None:
+        self.changes.append((self.step, description, restore))
+
+    def _is_new(self, block: Any) -> bool:
+        return (
+            block is not None
+            and id(block) not in self._seen
+            and getattr(block, "session_uid", 0) > self._watermark
+        )
+
+    def _add(self, name: str, block: Any) -> None:
+        self._seen.add(id(block))
+        self.created.append((self.step, name, block))
+
+    def _collect_created(self) -> None:
+        candidates: Dict[str, List[Any]] = {name: [] for name in TRACKED}
+        active = getattr(bpy.context, "active_object", None)
+        if active is not None:
+            candidates["objects"].append(active)
+            data = getattr(active, "data", None)
+            if data is not None:
+                candidates["meshes"].append(data)
+                candidates["materials"].extend(getattr(data, "materials", ()) or ())
+
+        for name in TRACKED:
+            collection = getattr(bpy.data, name)
+            count = len(collection)
+            grown = count - self._counts[name]
+            self._counts[name] = count
+            if grown <= 0:
+                continue
+            for block in candidates[name]:
+                if grown and self._is_new(block) and collection.get(block.name) is block:
+                    self._add(name, block)
+                    grown -= 1
+            if grown:
+                # 候选项不足以解释数量变化，例如一次添加多个对象
+                for block in collection:
+                    if self._is_new(block):
+                        self._add(name, block)
+
+    def commit(self) -> None:
+        self._open = False
+        utils.get_logger(__name__).info(
+            "事务提交：新建数据块 %d 个，属性修改 %d 处", len(self.created), len(self.changes)
+        )
+
+    def rollback(self) -> Tuple[int, int]:
+        """逆序恢复属性并删除事务内创建的数据块，返回 (删除数, 恢复数)。"""
+
+        self._open = False
+        restored = 0
+        for _step, description, restore in reversed(self.changes):
+            try:
+                restore()
+            except ReferenceError:
+                # 目标已被删除，无需恢复
+                continue
+            except Exception as exc:  # pragma: no cover - 错误路径
+                utils.get_logger(__name__).warning("恢复 %s 失败：%s", description, exc)
+                continue
+            restored += 1
+
+        blocks = [block for _step, _name, block in self.created]
+        batch_remove = getattr(bpy.data, "batch_remove", None)
+        if batch_remove is not None:
+            # 一次性删除，避免逐个删除时反复扫描引用关系
+            batch_remove(blocks)
+        else:  # pragma: no cover - 旧版本 Blender
+            for _step, name, block in reversed(self.created):
+                getattr(bpy.data, name).remove(block)
+        removed = len(blocks)
+        self.created.clear()
+        self.changes.clear()
+        self._seen.clear()
+        utils.get_logger(__name__).info(
+            "事务回滚：删除数据块 %d 个，恢复属性 %d 处", removed, restored
+        )
+        return removed, restored
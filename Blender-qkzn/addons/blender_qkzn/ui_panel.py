@@ -5,6 +5,8 @@ from __future__ import annotations
 import bpy
 from bpy.types import Panel
 
+from . import planning_jobs, tracing
+
 
 class QKZNAIAssistantPanel(Panel):
     """AI 助手面板，提供命令输入与操作按钮。"""
@@ -26,6 +28,22 @@ class QKZNAIAssistantPanel(Panel):
         op = row.operator("wm.addon_userpref_show", text="设置", icon="PREFERENCES")
         op.module = __package__
 
+        job = planning_jobs.active_job()
+        if job is not None:
+            box = layout.box()
+            timeout = job.llm_config.timeout if job.llm_config else None
+            text = f"正在请求 LLM… {job.elapsed:.1f} 秒"
+            if timeout and not job.streaming:
+                text += f" / {timeout} 秒"
+            if job.streaming:
+                text += f"，已收到 {job.received} 步"
+            box.label(text=text, icon="TIME")
+            box.operator("qkzn.cancel_ai_command", text="取消", icon="CANCEL")
+
         row = layout.row(align=True)
+        row.enabled = job is None
         row.operator("qkzn.run_ai_command", text="执行", icon="PLAY")
         row.operator("qkzn.clear_log", text="清空", icon="TRASH")
+
+        if tracing.TRACER.enabled:
+            layout.operator("qkzn.export_trace", text="导出执行追踪", icon="EXPORT")
@@ -0,0 +1,63 @@
+"""执行后端基准：在 Blender 后台对比 bpy.ops 与数据 API 添加大量图元的耗时，并核对两者结果一致。
+
+用法：blender -b --factory-startup --python tools/bench_execution_backends.py -- [--counts 500 1000 2000 4000]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import bpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "addons"))
+
+from blender_qkzn import executor  # noqa: E402
+from blender_qkzn.schemas import Plan, PlanStep  # noqa: E402
+
+OPS = ("mesh.primitive_cube_add", "mesh.primitive_uv_sphere_add")
+
+
+def reset_scene():
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def make_plan(count, backend):
+    steps = [
+        PlanStep(op=OPS[index % len(OPS)], args={"location": (index % 50 * 3.0, index // 50 * 3.0, 0.0)})
+        for index in range(count)
+    ]
+    return Plan(steps=steps, backend=backend)
+
+
+def run(count, backend):
+    reset_scene()
+    start = time.perf_counter()
+    executor.execute_plan(make_plan(count, backend))
+    elapsed = time.perf_counter() - start
+    summary = sorted(
+        (obj.name, len(obj.data.vertices), len(obj.data.polygons), tuple(round(v, 4) for v in obj.dimensions))
+        for obj in bpy.context.scene.objects
+    )
+    return elapsed, summary
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    print(f"{'objects':>8}{'ops s':>10}{'ops ms/obj':>12}{'data s':>10}{'data ms/obj':>13}{'match':>7}")
+    for count in args.counts:
+        ops_seconds, ops_summary = run(count, "ops")
+        data_seconds, data_summary = run(count, "data")
+        print(
+            f"{count:>8}{ops_seconds:>10.3f}{ops_seconds * 1000.0 / count:>12.3f}"
+            f"{data_seconds:>10.3f}{data_seconds * 1000.0 / count:>13.3f}{str(ops_summary == data_summary):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
@@ -0,0 +1,115 @@
+"""执行器分派基准：用假的 bpy 对比旧实现（逐步字符串比较 + 逐级 getattr）与分派表 + 操作缓存。
+
+用法：python tools/bench_executor_dispatch.py [--steps 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, List, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "addons"))
+
+from blender_qkzn import executor, utils  # noqa: E402
+from blender_qkzn.schemas import Plan, PlanStep  # noqa: E402
+
+
+class FakeOps:
+    """模拟 bpy.ops 子模块：属性访问与 dir() 都要付出查找代价。"""
+
+    def __init__(self, names: Sequence[str]) -> None:
+        for name in names:
+            setattr(self, name, lambda **_kwargs: None)
+
+
+def install_fake_bpy() -> None:
+    obj = SimpleNamespace(location=(0.0, 0.0, 0.0))
+    executor.bpy = SimpleNamespace(  # type: ignore[assignment]
+        ops=SimpleNamespace(
+            mesh=FakeOps(["primitive_cube_add", "primitive_uv_sphere_add", "primitive_cylinder_add"]),
+            object=FakeOps(["shade_smooth", "origin_set"]),
+        ),
+        context=SimpleNamespace(active_object=obj),
+    )
+    executor.materials.apply_material = lambda _obj, _spec: None  # type: ignore[assignment]
+    executor.clear_operator_cache()
+
+
+def legacy_resolve(path: str) -> Callable[..., Any]:
+    target: Any = executor.bpy.ops
+    for part in path.split("."):
+        target = getattr(target, part)
+    return target
+
+
+def legacy_execute(step: PlanStep) -> None:
+    """旧实现：每步获取 logger、比较字符串并逐级解析 bpy.ops。"""
+
+    logger = utils.get_logger("blender_qkzn.executor")
+    logger.debug("执行步骤: %s", step)
+    if step.op == "material.assign":
+        executor.materials.apply_material(executor.bpy.context.active_object, step.args.get("spec"))
+        return
+    if step.op == "object.move":
+        active_obj = executor.bpy.context.active_object
+        location = step.args.get("location")
+        if not isinstance(location, Sequence):
+            raise executor.ExecutionError("移动指令缺少 location 参数")
+        active_obj.location = location
+        return
+    legacy_resolve(step.op)(**step.args)
+
+
+def make_plan(count: int) -> Plan:
+    cycle: List[PlanStep] = [
+        PlanStep(op="mesh.primitive_cube_add", args={"size": 1.0}),
+        PlanStep(op="material.assign", args={"spec": "红色"}),
+        PlanStep(op="object.move", args={"location": (1.0, 2.0, 3.0)}),
+        PlanStep(op="mesh.primitive_uv_sphere_add", args={}),
+        PlanStep(op="object.shade_smooth", args={}),
+    ]
+    return Plan(steps=[cycle[index % len(cycle)] for index in range(count)])
+
+
+def timed(label: str, func: Callable[[], None], steps: int) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{elapsed:>10.3f}{elapsed * 1e6 / steps:>12.2f}")
+    return elapsed
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    install_fake_bpy()
+    plan = make_plan(args.steps)
+    # 只比较分派本身，逐步的 INFO 日志在两种实现中相同
+    logging.disable(logging.INFO)
+
+    print(f"{'case':<28}{'seconds':>10}{'us/step':>12}")
+
+    def run_legacy() -> None:
+        for step in plan.steps:
+            legacy_execute(step)
+
+    def run_dispatch() -> None:
+        for step in plan.steps:
+            executor._execute_single_step(step)
+
+    legacy = timed("legacy dispatch", run_legacy, args.steps)
+    current = timed("registry + cache", run_dispatch, args.steps)
+    timed("validate_ops", lambda: executor.validate_ops(plan.steps), args.steps)
+    timed("execute_plan (end to end)", lambda: executor.execute_plan(plan), args.steps)
+    print(f"dispatch speedup: {legacy / current:.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
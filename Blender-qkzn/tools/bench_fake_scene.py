@@ -0,0 +1,58 @@
+"""执行器开销基准：在纯 Python 场景模拟器上执行大规模计划，无需 Blender。
+
+用法：python tools/bench_fake_scene.py [--steps 10000 100000 1000000] [--backend ops|data] [--transactional] [--trace]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "addons"))
+
+from blender_qkzn import executor, tracing  # noqa: E402
+from blender_qkzn.schemas import Plan, PlanStep  # noqa: E402
+from blender_qkzn.tests import fake_scene  # noqa: E402
+
+# 规则规划器常见的输出：添加图元、赋材质、移动
+CYCLE = (
+    PlanStep(op="mesh.primitive_cube_add", args={}),
+    PlanStep(op="material.assign", args={"spec": "红色"}),
+    PlanStep(op="object.move", args={"location": [1.0, 2.0, 3.0]}),
+    PlanStep(op="mesh.primitive_uv_sphere_add", args={}),
+    PlanStep(op="material.assign", args={"spec": "玻璃"}),
+)
+
+
+def run(count, backend, transactional, trace):
+    plan = Plan(steps=[CYCLE[index % len(CYCLE)] for index in range(count)])
+    scene = fake_scene.install()
+    tracing.TRACER.clear()
+    tracing.TRACER.enabled = trace
+    start = time.perf_counter()
+    executor.execute_plan(plan, backend=backend, transactional=transactional)
+    elapsed = time.perf_counter() - start
+    tracing.TRACER.enabled = False
+    return elapsed, len(scene.data.objects)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--backend", choices=("ops", "data"), default="ops")
+    parser.add_argument("--transactional", action="store_true")
+    parser.add_argument("--trace", action="store_true", help="同时记录执行追踪并输出汇总表")
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    print(f"{'steps':>9}{'objects':>9}{'seconds':>10}{'us/step':>10}")
+    for count in args.steps:
+        elapsed, objects = run(count, args.backend, args.transactional, args.trace)
+        print(f"{count:>9}{objects:>9}{elapsed:>10.3f}{elapsed * 1e6 / count:>10.2f}")
+    if args.trace:
+        print(tracing.TRACER.format_summary())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
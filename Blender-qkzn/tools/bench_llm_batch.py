@@ -0,0 +1,99 @@
+"""批量 LLM 请求基准：本地替身服务注入固定延迟，对比逐条串行、有界并发与批量接口的吞吐。
+
+用法：python tools/bench_llm_batch.py [--prompts 200] [--latency 0.05] [--concurrency 8] [--batch-size 25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "addons"))
+
+from blender_qkzn import llm_client  # noqa: E402
+from blender_qkzn.schemas import LLMConfig  # noqa: E402
+
+STEP = {"op": "mesh.primitive_cube_add", "args": {}}
+
+
+def start_server(latency: float, per_item: float) -> ThreadingHTTPServer:
+    """单条请求延迟 latency；批量请求延迟 latency + per_item * 条数，模拟模型按条生成。"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 缓冲写出，避免响应头与响应体分两个包发送时触发延迟确认，使延迟只来自注入值
+        wbufsize = 64 * 1024
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server 约定
+            body: Dict[str, Any] = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompts = body.get("prompts")
+            if prompts is None:
+                time.sleep(latency)
+                payload = {"plan": [STEP]}
+            else:
+                time.sleep(latency + per_item * len(prompts))
+                payload = {"plans": [[STEP] for _ in prompts]}
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *_args: Any) -> None:
+            return None
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(url: str, prompts: List[str], **overrides: Any) -> float:
+    cfg = LLMConfig(api_url=url, api_key=None, timeout=30, max_retries=0, **overrides)
+    client = llm_client.LLMClient(cfg)
+    try:
+        start = time.perf_counter()
+        results = client.generate_plans(prompts)
+        elapsed = time.perf_counter() - start
+    finally:
+        client.close()
+    assert all(result.ok for result in results)
+    return elapsed
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--per-item", type=float, default=0.001, help="批量请求中每条命令额外的延迟（秒）")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    server = start_server(args.latency, args.per_item)
+    url = f"http://127.0.0.1:{server.server_address[1]}/plan"
+    prompts = [f"添加一个立方体 {index}" for index in range(args.prompts)]
+    cases = [
+        ("serial", {"max_concurrency": 1}),
+        (f"concurrent x{args.concurrency}", {"max_concurrency": args.concurrency}),
+        (f"batch {args.batch_size} x1", {"batch_size": args.batch_size, "max_concurrency": 1}),
+        (f"batch {args.batch_size} x{args.concurrency}", {"batch_size": args.batch_size, "max_concurrency": args.concurrency}),
+    ]
+    print(f"{'mode':<22}{'seconds':>10}{'prompts/s':>12}")
+    for name, overrides in cases:
+        elapsed = run(url, prompts, **overrides)
+        print(f"{name:<22}{elapsed:>10.3f}{len(prompts) / elapsed:>12.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
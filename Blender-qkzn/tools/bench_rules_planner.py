@@ -0,0 +1,95 @@
+"""规则规划器基准：多条正则分别全文扫描（旧实现）与单次组合扫描对比。
+
+用法：python tools/bench_rules_planner.py [--clauses 50] [--seconds 1]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "addons"))
+
+from blender_qkzn import planner_client, utils  # noqa: E402
+from blender_qkzn.schemas import PlanStep  # noqa: E402
+
+_LEGACY_COLOR = "|".join(utils.available_color_words())
+_LEGACY_MATERIAL = "玻璃|金属|木纹|塑料"
+_LEGACY_CUBE_RE = re.compile(
+    rf"添加(?:一个)?(?:(?P<material>{_LEGACY_MATERIAL})材质的)?(?:(?P<color>{_LEGACY_COLOR})的?)?(立方体|方块|cube)",
+    re.IGNORECASE,
+)
+_LEGACY_SPHERE_RE = re.compile(
+    rf"添加(?:一个)?(?:(?P<material>{_LEGACY_MATERIAL})(?:材质)?的?)?(?:(?P<color>{_LEGACY_COLOR})的?)?(球体|圆球)",
+    re.IGNORECASE,
+)
+_LEGACY_APPLY_RE = re.compile(rf"应用(?:.*?)(?P<material>{_LEGACY_MATERIAL})(?:材质)?", re.IGNORECASE)
+_LEGACY_MOVE_RE = re.compile(
+    r"移动到\s*X(?P<x>-?\d+(?:\.\d+)?)\s*Y(?P<y>-?\d+(?:\.\d+)?)\s*Z(?P<z>-?\d+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+
+
+def legacy_steps(text: str) -> List[PlanStep]:
+    """旧实现：每条规则各扫描一遍，步骤按规则分组。"""
+
+    steps: List[PlanStep] = []
+    for regex, op in ((_LEGACY_CUBE_RE, "mesh.primitive_cube_add"), (_LEGACY_SPHERE_RE, "mesh.primitive_uv_sphere_add")):
+        for match in regex.finditer(text):
+            steps.append(PlanStep(op=op, args={}))
+            if match.group("material"):
+                steps.append(PlanStep(op="material.assign", args={"spec": match.group("material")}))
+            elif match.group("color"):
+                steps.append(PlanStep(op="material.assign", args={"spec": match.group("color")}))
+    for match in _LEGACY_APPLY_RE.finditer(text):
+        steps.append(PlanStep(op="material.assign", args={"spec": match.group("material")}))
+    move = _LEGACY_MOVE_RE.search(text)
+    if move:
+        location = (float(move.group("x")), float(move.group("y")), float(move.group("z")))
+        steps.append(PlanStep(op="object.move", args={"location": location}))
+    return steps
+
+
+CLAUSES = [
+    "添加一个木纹材质的立方体",
+    "再添加一个金属球体",
+    "移动到 X1 Y-2 Z0.5",
+    "添加一个蓝色球体",
+    "然后把它放在桌子旁边",
+    "应用玻璃材质",
+]
+
+
+def measure(func: Callable[[str], List[PlanStep]], text: str, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        func(text)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clauses", type=int, nargs="+", default=[6, 60, 600])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    print(f"{'clauses':>8}{'chars':>8}{'steps':>12}{'legacy/s':>12}{'single/s':>12}{'MB/s':>8}{'speedup':>10}")
+    for clauses in args.clauses:
+        text = "，".join(CLAUSES[index % len(CLAUSES)] for index in range(clauses))
+        before = measure(legacy_steps, text, args.seconds)
+        after = measure(planner_client.match_steps, text, args.seconds)
+        megabytes = after * len(text.encode("utf-8")) / 1e6
+        steps = f"{len(legacy_steps(text))}/{len(planner_client.match_steps(text))}"
+        print(f"{clauses:>8}{len(text):>8}{steps:>12}{before:>12.0f}{after:>12.0f}{megabytes:>8.1f}{after / before:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""调度基准：在场景模拟器上用数据 API 创建大量参数各异的程序化对象，对比顺序执行与按链流水线准备几何。
+
+用法：python tools/bench_scheduler.py [--objects 500] [--workers 1 2 4 8] [--segments 64] [--rings 32]
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "addons"))
+
+from blender_qkzn import executor, scheduler  # noqa: E402
+from blender_qkzn.schemas import Plan, PlanStep  # noqa: E402
+from blender_qkzn.tests import fake_scene  # noqa: E402
+
+
+def make_plan(count, segments, rings):
+    steps = []
+    for index in range(count):
+        # 半径各不相同，每个对象的几何都需要单独计算
+        args = {"radius": 0.5 + index * 0.001, "segments": segments, "ring_count": rings}
+        args["location"] = [index % 25 * 3.0, index // 25 * 3.0, 0.0]
+        steps.append(PlanStep(op="mesh.primitive_uv_sphere_add", args=args))
+        steps.append(PlanStep(op="material.assign", args={"spec": "红色" if index % 2 else "金属"}))
+    return Plan(steps=steps, backend="data")
+
+
+def run_sequential(plan):
+    fake_scene.install()
+    # 回收上一轮的场景，避免垃圾回收的开销随运行顺序累积
+    gc.collect()
+    start = time.perf_counter()
+    executor.execute_plan(plan)
+    return time.perf_counter() - start
+
+
+def run_scheduled(plan, workers):
+    fake_scene.install()
+    gc.collect()
+    start = time.perf_counter()
+    report = scheduler.execute_scheduled(plan, workers=workers)
+    return time.perf_counter() - start, report
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--segments", type=int, default=64)
+    parser.add_argument("--rings", type=int, default=32)
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    plan = make_plan(args.objects, args.segments, args.rings)
+    print(
+        f"cpu_count={os.cpu_count()} objects={args.objects} segments={args.segments} rings={args.rings}"
+    )
+    print(f"{'mode':<14}{'total s':>10}{'pooled':>8}{'wait s':>9}{'speedup':>9}")
+    baseline = run_sequential(plan)
+    print(f"{'sequential':<14}{baseline:>10.3f}{'-':>8}{'-':>9}{1.0:>9.2f}")
+    for workers in sorted(set(args.workers)):
+        # 先热身一次，使进程池的启动开销不计入结果
+        run_scheduled(make_plan(scheduler.MIN_PARALLEL, args.segments, args.rings), workers)
+        total, report = run_scheduled(plan, workers)
+        print(
+            f"{f'workers={workers}':<14}{total:>10.3f}{report.pooled:>8}"
+            f"{report.wait_seconds:>9.3f}{baseline / total:>9.2f}"
+        )
+    scheduler.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
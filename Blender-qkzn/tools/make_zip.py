@@ -8,6 +8,8 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 ADDON_DIR = PROJECT_ROOT / "addons" / "blender_qkzn"
 OUTPUT = PROJECT_ROOT / "blender_qkzn.zip"
+# 测试与场景模拟器只在开发时使用，不随插件安装
+EXCLUDED_DIRS = {"tests", "__pycache__"}
 
 
 def main() -> None:
@@ -17,7 +19,7 @@ def main() -> None:
     print(f"正在打包 {ADDON_DIR} -> {OUTPUT}")
     with zipfile.ZipFile(OUTPUT, "w", zipfile.ZIP_DEFLATED) as zf:
         for path in ADDON_DIR.rglob("*"):
-            if path.is_file():
+            if path.is_file() and not EXCLUDED_DIRS.intersection(path.relative_to(ADDON_DIR).parts):
                 arcname = path.relative_to(PROJECT_ROOT)
                 zf.write(path, arcname.as_posix())
     print("打包完成")
@@ -8,11 +8,22 @@ bl_info = {
     "category": "3D View",
 }
 
-import bpy
 import json
 import math
 import re
-from mathutils import Vector
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # Blender 自带 numpy；纯 Python 环境下网格构建不可用
+    np = None
+
+try:
+    import bpy
+    from mathutils import Vector
+except ImportError:  # 非 Blender 环境（单元测试、批处理脚本）只使用纯 Python 部分
+    bpy = None
+    Vector = None
 
 
 UNIT_MAP = {
@@ -137,43 +148,118 @@ def ensure_material(name, preset=None, color=None):
     return mat
 
 
+MATERIAL_KEY_PROP = "nl_material_key"
+
+
+def material_key(preset=None, color=None):
+    # 颜色按 8 位通道量化，肉眼无差别的颜色共用一个材质
+    channels = tuple(min(255, max(0, int(round(component * 255.0)))) for component in color) if color else None
+    return (preset or None, channels)
+
+
+def material_name(key):
+    preset, channels = key
+    name_parts = ["NL_Material"]
+    if preset:
+        name_parts.append(preset.title())
+    if channels:
+        name_parts.append("".join(f"{channel:02x}" for channel in channels))
+    return "_".join(name_parts)
+
+
+class MaterialRegistry:
+    # 材质名由 (preset, 量化颜色) 决定；命中时直接复用，不再改写节点（每次改写都会触发着色器重编译）
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.hit_counts = {}
+
+    def get(self, key, materials=None):
+        name = material_name(key)
+        mat = (bpy.data.materials if materials is None else materials).get(name)
+        if mat is None or mat.get(MATERIAL_KEY_PROP) != name:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.hit_counts[name] = self.hit_counts.get(name, 0) + 1
+        return mat
+
+    def material(self, preset=None, color=None):
+        key = material_key(preset, color)
+        mat = self.get(key)
+        if mat is None:
+            preset, channels = key
+            color = tuple(channel / 255.0 for channel in channels) if channels else None
+            mat = ensure_material(material_name(key), preset=preset, color=color)
+            mat[MATERIAL_KEY_PROP] = mat.name
+        return mat
+
+    def clear(self):
+        self.hits = 0
+        self.misses = 0
+        self.hit_counts.clear()
+
+
+MATERIAL_REGISTRY = MaterialRegistry()
+
+
+# 盒体按 (width, depth, height, cx, cy, cz) 一行描述，角点顺序与面索引对所有盒体通用
+BOX_CORNER_SIGNS = (
+    (-1.0, -1.0, -1.0),
+    (1.0, -1.0, -1.0),
+    (1.0, 1.0, -1.0),
+    (-1.0, 1.0, -1.0),
+    (-1.0, -1.0, 1.0),
+    (1.0, -1.0, 1.0),
+    (1.0, 1.0, 1.0),
+    (-1.0, 1.0, 1.0),
+)
+BOX_FACES = (
+    (0, 1, 2, 3),
+    (4, 5, 6, 7),
+    (0, 1, 5, 4),
+    (1, 2, 6, 5),
+    (2, 3, 7, 6),
+    (3, 0, 4, 7),
+)
+
+
 def box_geometry(width, depth, height, center):
     cx, cy, cz = center
-    w2 = width / 2.0
-    d2 = depth / 2.0
-    h2 = height / 2.0
-    verts = [
-        (cx - w2, cy - d2, cz - h2),
-        (cx + w2, cy - d2, cz - h2),
-        (cx + w2, cy + d2, cz - h2),
-        (cx - w2, cy + d2, cz - h2),
-        (cx - w2, cy - d2, cz + h2),
-        (cx + w2, cy - d2, cz + h2),
-        (cx + w2, cy + d2, cz + h2),
-        (cx - w2, cy + d2, cz + h2),
-    ]
-    faces = [
-        (0, 1, 2, 3),
-        (4, 5, 6, 7),
-        (0, 1, 5, 4),
-        (1, 2, 6, 5),
-        (2, 3, 7, 6),
-        (3, 0, 4, 7),
-    ]
-    return verts, faces
+    return (width, depth, height, cx, cy, cz)
+
 
+def box_arrays(boxes):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+    signs = np.asarray(BOX_CORNER_SIGNS, dtype=np.float64)
+    coords = boxes[:, None, 3:6] + boxes[:, None, 0:3] * 0.5 * signs[None, :, :]
+    offsets = np.arange(len(boxes), dtype=np.int32)[:, None, None] * len(BOX_CORNER_SIGNS)
+    faces = np.asarray(BOX_FACES, dtype=np.int32)[None, :, :] + offsets
+    return coords.reshape(-1, 3).astype(np.float32), faces.reshape(-1, 4)
 
-def build_mesh_object(name, boxes, context):
-    verts_all = []
-    faces_all = []
-    for verts, faces in boxes:
-        offset = len(verts_all)
-        verts_all.extend(verts)
-        for face in faces:
-            faces_all.append(tuple(index + offset for index in face))
+
+def fill_mesh_polygons(mesh, coords, loop_vertices, loop_starts, loop_totals):
+    mesh.vertices.add(len(coords) // 3)
+    mesh.loops.add(len(loop_vertices))
+    mesh.polygons.add(len(loop_starts))
+    mesh.vertices.foreach_set("co", coords)
+    mesh.loops.foreach_set("vertex_index", loop_vertices)
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    if not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly:  # Blender 4.0 起由 loop_start 推导
+        mesh.polygons.foreach_set("loop_total", loop_totals)
+
+
+def build_box_mesh(name, boxes):
+    coords, faces = box_arrays(boxes)
+    loop_starts = np.arange(0, faces.size, faces.shape[1], dtype=np.int32)
+    loop_totals = np.full(len(faces), faces.shape[1], dtype=np.int32)
     mesh = bpy.data.meshes.new(name)
-    mesh.from_pydata(verts_all, [], faces_all)
-    mesh.update()
+    fill_mesh_polygons(mesh, coords.ravel(), faces.ravel(), loop_starts, loop_totals)
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def link_mesh_object(name, mesh, context):
     obj = bpy.data.objects.new(name, mesh)
     context.collection.objects.link(obj)
     for selected in context.selected_objects:
@@ -183,7 +269,67 @@ def build_mesh_object(name, boxes, context):
     return obj
 
 
-def create_table_object(context, width=2.0, depth=1.0, height=1.0):
+GEOMETRY_CACHE_SIZE = 32
+GEOMETRY_QUANTUM = 1e-4
+GEOMETRY_KEY_PROP = "nl_geometry_key"
+
+
+def geometry_cache_key(template, *params):
+    # 参数按 0.1 mm 量化，浮点误差不会产生新的网格
+    return (template,) + tuple(int(round(float(value) / GEOMETRY_QUANTUM)) for value in params)
+
+
+class GeometryCache:
+    # 只记录网格名称：撤销/重载后 bpy 引用会失效，命中时按名称取回并核对标记
+    def __init__(self, maxsize=GEOMETRY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._names = OrderedDict()
+
+    def get(self, key, meshes=None):
+        name = self._names.get(key)
+        mesh = None
+        if name is not None:
+            mesh = (bpy.data.meshes if meshes is None else meshes).get(name)
+            if mesh is None or mesh.get(GEOMETRY_KEY_PROP) != repr(key):
+                del self._names[key]
+                mesh = None
+        if mesh is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._names.move_to_end(key)
+        return mesh
+
+    def put(self, key, mesh):
+        mesh[GEOMETRY_KEY_PROP] = repr(key)
+        self._names[key] = mesh.name
+        self._names.move_to_end(key)
+        if len(self._names) > self.maxsize:
+            self._names.popitem(last=False)
+
+    def clear(self):
+        self._names.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._names)
+
+
+GEOMETRY_CACHE = GeometryCache()
+
+
+def cached_box_object(context, name, key, build_boxes):
+    mesh = GEOMETRY_CACHE.get(key)
+    if mesh is None:
+        mesh = build_box_mesh(name, build_boxes())
+        GEOMETRY_CACHE.put(key, mesh)
+    return link_mesh_object(name, mesh, context)
+
+
+def table_boxes(width=2.0, depth=1.0, height=1.0):
     top_thickness = max(0.05, min(height * 0.15, height * 0.3))
     leg_size = max(0.05, min(width, depth) * 0.15)
     leg_height = max(0.1, height - top_thickness)
@@ -202,10 +348,15 @@ def create_table_object(context, width=2.0, depth=1.0, height=1.0):
     ]
     for ox, oy in offsets:
         boxes.append(box_geometry(leg_size, leg_size, leg_height, (ox, oy, leg_center_z)))
-    return build_mesh_object("NL_Table", boxes, context)
+    return np.asarray(boxes, dtype=np.float64)
 
 
-def create_bookshelf_object(context, width=1.0, depth=0.3, height=2.0, shelves=4):
+def create_table_object(context, width=2.0, depth=1.0, height=1.0):
+    key = geometry_cache_key("table", width, depth, height)
+    return cached_box_object(context, "NL_Table", key, lambda: table_boxes(width, depth, height))
+
+
+def bookshelf_boxes(width=1.0, depth=0.3, height=2.0, shelves=4):
     frame_thickness = max(0.03, min(width, depth) * 0.08)
     shelf_thickness = max(0.02, frame_thickness * 0.8)
     back_thickness = max(0.01, min(depth * 0.3, frame_thickness))
@@ -255,20 +406,81 @@ def create_bookshelf_object(context, width=1.0, depth=0.3, height=2.0, shelves=4
             (0.0, -depth / 2.0 + back_thickness / 2.0, frame_thickness / 2.0),
         )
     )
+    boxes = np.asarray(boxes, dtype=np.float64)
     if shelves > 0:
         usable_height = height - frame_thickness * 2.0
-        for i in range(1, shelves + 1):
-            factor = i / (shelves + 1)
-            shelf_z = bottom_z + frame_thickness + usable_height * factor
-            boxes.append(
-                box_geometry(
-                    inner_width,
-                    inner_depth,
-                    shelf_thickness,
-                    (0.0, frame_thickness * 0.25, shelf_z),
-                )
-            )
-    return build_mesh_object("NL_Bookshelf", boxes, context)
+        factors = np.arange(1, shelves + 1, dtype=np.float64) / (shelves + 1)
+        shelf_boxes = np.empty((shelves, 6), dtype=np.float64)
+        shelf_boxes[:] = box_geometry(inner_width, inner_depth, shelf_thickness, (0.0, frame_thickness * 0.25, 0.0))
+        shelf_boxes[:, 5] = bottom_z + frame_thickness + usable_height * factors
+        boxes = np.concatenate((boxes, shelf_boxes))
+    return boxes
+
+
+def create_bookshelf_object(context, width=1.0, depth=0.3, height=2.0, shelves=4):
+    key = geometry_cache_key("bookshelf", width, depth, height, shelves)
+    return cached_box_object(
+        context, "NL_Bookshelf", key, lambda: bookshelf_boxes(width, depth, height, shelves)
+    )
+
+
+NUMBER_PATTERN = r"[-+]?\d*\.?\d+"
+UNIT_PATTERN = r"m|cm|mm|米|厘米|毫米"
+
+DIMENSION_KEYWORDS = {
+    "width": ["宽度", "宽", "width", "长"],
+    "depth": ["深度", "深", "depth"],
+    "height": ["高度", "高", "height"],
+    "radius": ["半径", "radius"],
+    "diameter": ["直径", "diameter"],
+    "size": ["尺寸", "size"],
+}
+
+SHELF_KEYWORDS = ["层", "隔板", "shelve"]
+ARRAY_KEYWORDS = ["阵列", "array"]
+POSITION_KEYWORDS = ["位置", "location"]
+AXIS_TAGS = ("x", "y", "z")
+
+# 所有正则在导入时编译一次；每个字段只搜索第一处命中（尺寸取最后一处），
+# 字段之间的优先级与关键词列表的顺序一致
+_NUMBER_RE = re.compile(NUMBER_PATTERN)
+_NUMBER_UNIT_RE = re.compile(rf"({NUMBER_PATTERN})(?:\s*({UNIT_PATTERN}))?")
+_SNAP_SEARCH_RE = re.compile(r"贴地|吸附地面|snap\s*to\s*ground|落地")
+_ARRAY_SEARCH_RES = [
+    re.compile(rf"{keyword}\s*(\d+)\s*[x×]\s*(\d+)\s*[x×]\s*(\d+)") for keyword in ARRAY_KEYWORDS
+]
+_HEX_SEARCH_RE = re.compile(r"#([0-9a-f]{6})")
+_DIMENSION_SEARCH_RES = {
+    key: [
+        re.compile(rf"{keyword}[是为:=\s]*({NUMBER_PATTERN})(?:\s*({UNIT_PATTERN}))?")
+        for keyword in keywords
+    ]
+    for key, keywords in DIMENSION_KEYWORDS.items()
+}
+_SHELF_SEARCH_RE = re.compile(rf"(?:{'|'.join(SHELF_KEYWORDS)})\D*(\d+)")
+_POSITION_SEARCH_RES = [
+    re.compile(r"位置[是为:=\s]*([-,\d\.\s米厘米毫米mcm]+)"),
+    re.compile(r"location[is:=\s]*([-,\d\.\s米厘米毫米mcm]+)"),
+]
+_AXIS_LOCATION_SEARCH_RES = {
+    axis: [
+        re.compile(rf"{pattern}\s*({NUMBER_PATTERN})(?:\s*({UNIT_PATTERN}))?")
+        for pattern in patterns
+    ]
+    for axis, patterns in {
+        "x": [r"x\s*[:=]?", r"x轴", r"沿x", r"x\s*axis", r"沿\s*x"],
+        "y": [r"y\s*[:=]?", r"y轴", r"沿y", r"y\s*axis", r"沿\s*y"],
+        "z": [r"z\s*[:=]?", r"z轴", r"沿z", r"高度", r"z\s*axis", r"沿\s*z"],
+    }.items()
+}
+_ROTATION_SEARCH_RE = re.compile(r"旋转[是为:=\s]*([-,\d\.\s度deg]+)")
+_AXIS_ROTATION_SEARCH_RES = {
+    axis: re.compile(rf"(?:绕?{axis}轴旋转|{axis}\s*rot(?:ation)?)\s*({NUMBER_PATTERN})")
+    for axis in AXIS_TAGS
+}
+_SCALE_SEARCH_RE = re.compile(r"缩放[是为:=\s]*([-,\d\.\s]+)")
+_UNIFORM_SCALE_SEARCH_RE = re.compile(rf"scale\s*({NUMBER_PATTERN})")
+_SCALE_AXIS_SEARCH_RES = {axis: re.compile(rf"scale\s*{axis}\s*({NUMBER_PATTERN})") for axis in AXIS_TAGS}
 
 
 def parse_prompt_heuristic(prompt):
@@ -280,207 +492,344 @@ def parse_prompt_heuristic(prompt):
         return result
     lower = text.lower()
     for template, keywords in TEMPLATE_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in lower or keyword in text:
-                result["template"] = template
-                break
-        if result["template"] == template:
+        if any(keyword in lower for keyword in keywords):
+            result["template"] = template
             break
-    if re.search(r"贴地|吸附地面|snap\s*to\s*ground|落地", text, re.IGNORECASE):
+    if _SNAP_SEARCH_RE.search(lower):
         result["snap_to_ground"] = True
-    array_match = re.search(r"阵列\s*(\d+)\s*[x×]\s*(\d+)\s*[x×]\s*(\d+)", text, re.IGNORECASE)
-    if array_match:
-        result["array"] = [int(array_match.group(i)) for i in range(1, 4)]
-    else:
-        array_match_en = re.search(r"array\s*(\d+)\s*[x×]\s*(\d+)\s*[x×]\s*(\d+)", lower)
-        if array_match_en:
-            result["array"] = [int(array_match_en.group(i)) for i in range(1, 4)]
-    material_found = None
-    for preset, keywords in MATERIAL_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text or keyword in lower:
-                material_found = {"preset": preset}
-                break
-        if material_found:
+    for pattern in _ARRAY_SEARCH_RES:
+        array_match = pattern.search(lower)
+        if array_match:
+            result["array"] = [int(array_match.group(i)) for i in range(1, 4)]
             break
-    if material_found:
-        result["material"] = material_found
-    color_match = None
-    for keyword, color in COLOR_KEYWORDS.items():
-        if keyword in text or keyword in lower:
-            color_match = color
+    for preset, keywords in MATERIAL_KEYWORDS.items():
+        if any(keyword in lower for keyword in keywords):
+            result["material"] = {"preset": preset}
             break
-    hex_match = re.search(r"#([0-9a-fA-F]{6})", text)
+    color_match = next((color for keyword, color in COLOR_KEYWORDS.items() if keyword in lower), None)
+    hex_match = _HEX_SEARCH_RE.search(lower)
     if hex_match:
-        hex_value = hex_match.group(1)
-        color_match = tuple(int(hex_value[i:i + 2], 16) / 255.0 for i in range(0, 6, 2))
+        color_match = tuple(int(hex_match.group(1)[i:i + 2], 16) / 255.0 for i in range(0, 6, 2))
     if color_match:
         result.setdefault("material", {})
         result["material"]["color"] = list(color_match)
-    dimension_patterns = {
-        "width": ["宽度", "宽", "width", "长"],
-        "depth": ["深度", "深", "depth"],
-        "height": ["高度", "高", "height"],
-        "radius": ["半径", "radius"],
-        "diameter": ["直径", "diameter"],
-        "size": ["尺寸", "size"],
-    }
-    for key, keywords in dimension_patterns.items():
-        for keyword in keywords:
-            pattern = rf"{keyword}[是为:=\s]*([-+]?\d*\.?\d+)(?:\s*(m|cm|mm|米|厘米|毫米))?"
-            matches = list(re.finditer(pattern, text, re.IGNORECASE))
+    for key, patterns in _DIMENSION_SEARCH_RES.items():
+        for pattern in patterns:
+            matches = pattern.findall(lower)
             if matches:
-                value = convert_value(matches[-1].group(1), matches[-1].group(2))
+                value = convert_value(*matches[-1])
                 if value is not None:
                     result[key] = value
                 break
     if "diameter" in result and "radius" not in result:
         result["radius"] = result["diameter"] / 2.0
-    shelf_match = re.search(r"(层|隔板|shelves?)\D*(\d+)", text, re.IGNORECASE)
+    shelf_match = _SHELF_SEARCH_RE.search(lower)
     if shelf_match:
-        result["shelves"] = int(shelf_match.group(2))
-    pos_match = re.search(r"位置[是为:=\s]*([-,\d\.\s米厘米毫米mcm]+)", text, re.IGNORECASE)
-    if pos_match:
-        coords = re.findall(r"([-+]?\d*\.?\d+)(?:\s*(m|cm|mm|米|厘米|毫米))?", pos_match.group(1))
-        if len(coords) >= 3:
-            result["location"] = [convert_value(num, unit) or 0.0 for num, unit in coords[:3]]
-    else:
-        pos_match_en = re.search(r"location[is:=\s]*([-,\d\.\s米厘米毫米mcm]+)", text, re.IGNORECASE)
-        if pos_match_en:
-            coords = re.findall(r"([-+]?\d*\.?\d+)(?:\s*(m|cm|mm|米|厘米|毫米))?", pos_match_en.group(1))
+        result["shelves"] = int(shelf_match.group(1))
+    for pattern in _POSITION_SEARCH_RES:
+        pos_match = pattern.search(lower)
+        if pos_match:
+            coords = _NUMBER_UNIT_RE.findall(pos_match.group(1))
             if len(coords) >= 3:
                 result["location"] = [convert_value(num, unit) or 0.0 for num, unit in coords[:3]]
-    axis_patterns = {
-        "x": [r"x\s*[:=]?", r"x轴", r"沿x", r"x\s*axis", r"沿\s*x"],
-        "y": [r"y\s*[:=]?", r"y轴", r"沿y", r"y\s*axis", r"沿\s*y"],
-        "z": [r"z\s*[:=]?", r"z轴", r"沿z", r"高度", r"z\s*axis", r"沿\s*z"],
-    }
-    for axis, patterns in axis_patterns.items():
+            break
+    for axis, patterns in _AXIS_LOCATION_SEARCH_RES.items():
         for pattern in patterns:
-            regex = rf"{pattern}\s*([-+]?\d*\.?\d+)(?:\s*(m|cm|mm|米|厘米|毫米))?"
-            match = re.search(regex, text, re.IGNORECASE)
+            match = pattern.search(lower)
             if match:
-                result[f"location_{axis}"] = convert_value(match.group(1), match.group(2))
+                result[f"location_{axis}"] = convert_value(*match.groups())
                 break
-    rot_match = re.search(r"旋转[是为:=\s]*([-,\d\.\s度deg]+)", text, re.IGNORECASE)
+    rot_match = _ROTATION_SEARCH_RE.search(lower)
     if rot_match:
-        values = re.findall(r"([-+]?\d*\.?\d+)", rot_match.group(1))
+        values = _NUMBER_RE.findall(rot_match.group(1))
         if len(values) >= 3:
             result["rotation"] = [float(v) for v in values[:3]]
-    for axis in ("x", "y", "z"):
-        match = re.search(rf"(?:绕?{axis}轴旋转|{axis}\s*rot(?:ation)?)\s*([-+]?\d*\.?\d+)", lower)
+    for axis, pattern in _AXIS_ROTATION_SEARCH_RES.items():
+        match = pattern.search(lower)
         if match:
             result.setdefault("rotation_axes", {})[axis] = float(match.group(1))
-    scale_match = re.search(r"缩放[是为:=\s]*([-,\d\.\s]+)", text, re.IGNORECASE)
+    scale_match = _SCALE_SEARCH_RE.search(lower)
     if scale_match:
-        values = re.findall(r"([-+]?\d*\.?\d+)", scale_match.group(1))
+        values = _NUMBER_RE.findall(scale_match.group(1))
         if len(values) == 1:
             result["scale"] = float(values[0])
         elif len(values) >= 3:
             result["scale_xyz"] = [float(v) for v in values[:3]]
-    uniform_match = re.search(r"scale\s*([-+]?\d*\.?\d+)", lower)
+    uniform_match = _UNIFORM_SCALE_SEARCH_RE.search(lower)
     if uniform_match:
         result["scale"] = float(uniform_match.group(1))
-    for axis in ("x", "y", "z"):
-        match = re.search(rf"scale\s*{axis}\s*([-+]?\d*\.?\d+)", lower)
+    for axis, pattern in _SCALE_AXIS_SEARCH_RES.items():
+        match = pattern.search(lower)
         if match:
             result.setdefault("scale_axes", {})[axis] = float(match.group(1))
     return result
 
 
-def align_object_to_ground(obj):
-    min_z = min((obj.matrix_world @ Vector(corner)).z for corner in obj.bound_box)
-    obj.location.z -= min_z
+PREVIEW_CACHE_SIZE = 32
 
 
-def set_object_dimensions(obj, data):
-    target_map = {
-        "width": 0,
-        "depth": 1,
-        "height": 2,
-    }
-    dims = obj.dimensions.copy()
+class PreviewCache:
+    # 侧栏随鼠标移动频繁重绘，同一提示词只解析、序列化一次，重绘时只输出标签
+    def __init__(self, maxsize=PREVIEW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lines = OrderedDict()
+
+    def lines(self, prompt):
+        lines = self._lines.get(prompt)
+        if lines is not None:
+            self.hits += 1
+            self._lines.move_to_end(prompt)
+            return lines
+        self.misses += 1
+        data = parse_prompt_heuristic(prompt)
+        lines = tuple(json.dumps(data, ensure_ascii=False, indent=2).splitlines())
+        self._lines[prompt] = lines
+        if len(self._lines) > self.maxsize:
+            self._lines.popitem(last=False)
+        return lines
+
+    def clear(self):
+        self._lines.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._lines)
+
+
+PREVIEW_CACHE = PreviewCache()
+
+
+def ground_offsets(matrices, corners):
+    # matrices 为行主序 (N, 4, 4)，corners 为局部包围盒 (N, 8, 3)；返回每个对象世界空间的最低 z
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    corners = np.asarray(corners, dtype=np.float64).reshape(len(matrices), -1, 3)
+    world_z = np.einsum("nkj,nj->nk", corners, matrices[:, 2, :3]) + matrices[:, 2, 3, None]
+    return world_z.min(axis=1)
+
+
+def snap_objects_to_ground(objects, followers=None):
+    # 只读取、写回目标对象，代价与目标数量成正比，与文件中的对象总数无关；
+    # followers[i] 中的对象（阵列单元）随 objects[i] 平移相同的距离
+    objects = list(objects)
+    if not objects:
+        return
+    matrices = np.empty((len(objects), 4, 4), dtype=np.float64)
+    corners = np.empty((len(objects), 8, 3), dtype=np.float64)
+    for position, obj in enumerate(objects):
+        # matrix_basis 由当前 loc/rot/scale 即时计算，不依赖尚未刷新的 matrix_world
+        world = obj.matrix_basis
+        if obj.parent is not None:
+            world = obj.parent.matrix_world @ obj.matrix_parent_inverse @ world
+        matrices[position] = [list(row) for row in world]
+        corners[position] = [tuple(corner) for corner in obj.bound_box]
+    offsets = ground_offsets(matrices, corners)
+    for position, obj in enumerate(objects):
+        moved = [obj] + list(followers[position]) if followers else [obj]
+        for item in moved:
+            item.location.z -= float(offsets[position])
+            item.update_tag(refresh={'OBJECT'})
+
+
+def bound_box_extent(corners):
+    xs, ys, zs = zip(*corners)
+    return (max(xs) - min(xs), max(ys) - min(ys), max(zs) - min(zs))
+
+
+def solve_dimensions(extent, scale, data):
+    # 与逐步读取 obj.dimensions 等价：dimensions = 局部包围盒尺寸 × |scale|
+    scale = list(scale)
+
+    def dims():
+        return [extent[axis] * abs(scale[axis]) for axis in range(3)]
+
     if "size" in data:
         size_target = data["size"]
         if size_target > 0:
-            base_scale = list(obj.scale)
+            current = dims()
             for axis in range(3):
-                if dims[axis] > 0:
-                    base_scale[axis] *= size_target / dims[axis]
-            obj.scale = base_scale
-            dims = obj.dimensions.copy()
-    for key, axis in target_map.items():
-        if key in data and dims[axis] > 0:
-            factor = data[key] / dims[axis]
-            scale = list(obj.scale)
-            scale[axis] *= factor
-            obj.scale = scale
-            dims = obj.dimensions.copy()
-    if "radius" in data and obj.dimensions.x > 0 and obj.dimensions.y > 0:
+                if current[axis] > 0:
+                    scale[axis] *= size_target / current[axis]
+    for key, axis in (("width", 0), ("depth", 1), ("height", 2)):
+        current = dims()
+        if key in data and current[axis] > 0:
+            scale[axis] *= data[key] / current[axis]
+    current = dims()
+    if "radius" in data and current[0] > 0 and current[1] > 0:
         radius_target = data["radius"]
         if radius_target > 0:
-            current_radius_x = obj.dimensions.x / 2.0
-            current_radius_y = obj.dimensions.y / 2.0
-            scale = list(obj.scale)
-            if current_radius_x > 0:
-                scale[0] *= radius_target / current_radius_x
-            if current_radius_y > 0:
-                scale[1] *= radius_target / current_radius_y
-            obj.scale = scale
+            scale[0] *= radius_target / (current[0] / 2.0)
+            scale[1] *= radius_target / (current[1] / 2.0)
+    return scale
 
 
 def apply_material_to_object(obj, material_data):
     if not material_data:
         return
-    preset = material_data.get("preset")
-    color = material_data.get("color")
-    name_parts = ["NL_Material"]
-    if preset:
-        name_parts.append(preset.title())
-    if color:
-        name_parts.append("Color")
-    mat = ensure_material("_".join(name_parts), preset=preset, color=tuple(color) if color else None)
+    mat = MATERIAL_REGISTRY.material(material_data.get("preset"), material_data.get("color"))
+    if obj.data.users > 1 or GEOMETRY_KEY_PROP in obj.data:
+        # 网格被多个对象共用（关联阵列）或来自几何缓存时，材质挂到对象槽位，网格本身不带材质；
+        # 缓存网格首次使用时只有一个用户，写入网格会让之后命中缓存的无材质对象继承该材质
+        if not obj.data.materials:
+            obj.data.materials.append(None)
+        slot = obj.material_slots[0]
+        slot.link = 'OBJECT'
+        slot.material = mat
+        return
     if obj.data.materials:
         obj.data.materials[0] = mat
     else:
         obj.data.materials.append(mat)
 
 
-def apply_transforms(obj, data):
+def solve_transforms(extent, scale, location, rotation, data):
+    scale = list(scale)
     if "scale" in data:
-        factor = data["scale"]
-        base_scale = list(obj.scale)
-        obj.scale = [component * factor for component in base_scale]
+        scale = [component * data["scale"] for component in scale]
     if "scale_xyz" in data:
-        base_scale = list(obj.scale)
-        obj.scale = [base_scale[i] * data["scale_xyz"][i] for i in range(3)]
+        scale = [scale[i] * data["scale_xyz"][i] for i in range(3)]
     if "scale_axes" in data:
-        scale = list(obj.scale)
         for axis, value in data["scale_axes"].items():
-            index = "xyz".index(axis)
-            scale[index] *= value
-        obj.scale = scale
-    set_object_dimensions(obj, data)
-    if "location" in data:
-        obj.location = Vector(data["location"])
-    for axis in "xyz":
+            scale["xyz".index(axis)] *= value
+    scale = solve_dimensions(extent, scale, data)
+    location = list(data["location"]) if "location" in data else list(location)
+    for index, axis in enumerate("xyz"):
         key = f"location_{axis}"
         if key in data:
-            index = "xyz".index(axis)
-            loc = list(obj.location)
-            loc[index] = data[key]
-            obj.location = Vector(loc)
-    if "rotation" in data:
-        obj.rotation_euler = [math.radians(v) for v in data["rotation"]]
-    if "rotation_axes" in data:
-        rot = list(obj.rotation_euler)
-        for axis, value in data["rotation_axes"].items():
-            index = "xyz".index(axis)
-            rot[index] = math.radians(value)
-        obj.rotation_euler = rot
-
-
-def add_primitive_from_cmd(context, data):
+            location[index] = data[key]
+    rotation = [math.radians(v) for v in data["rotation"]] if "rotation" in data else list(rotation)
+    for axis, value in data.get("rotation_axes", {}).items():
+        rotation["xyz".index(axis)] = math.radians(value)
+    return tuple(scale), tuple(location), tuple(rotation)
+
+
+def apply_transforms(obj, data):
+    # 包围盒只读一次，最终的缩放/位置/旋转各写一次
+    current = (tuple(obj.scale), tuple(obj.location), tuple(obj.rotation_euler))
+    scale, location, rotation = solve_transforms(bound_box_extent(obj.bound_box), *current, data)
+    if scale != current[0]:
+        obj.scale = scale
+    if location != current[1]:
+        obj.location = location
+    if rotation != current[2]:
+        obj.rotation_euler = rotation
+
+
+ARRAY_MODES = ("linked", "instance", "merged", "copy")
+
+
+def array_offsets(counts, spacing, include_origin=False):
+    sx, sy, sz = spacing
+    offsets = []
+    for ix in range(counts[0]):
+        for iy in range(counts[1]):
+            for iz in range(counts[2]):
+                if ix == 0 and iy == 0 and iz == 0 and not include_origin:
+                    continue
+                offsets.append((ix * sx, iy * sy, iz * sz))
+    return offsets
+
+
+def tile_mesh_arrays(coords, loop_vertices, loop_starts, offsets):
+    # coords 为扁平的 xyz 列表；每个偏移复制一份顶点，环和面的索引按单元整体平移
+    vertex_count = len(coords) // 3
+    loop_count = len(loop_vertices)
+    xs, ys, zs = coords[0::3], coords[1::3], coords[2::3]
+    tiled_coords = []
+    tiled_loops = []
+    tiled_starts = []
+    for cell, (ox, oy, oz) in enumerate(offsets):
+        cell_coords = [0.0] * len(coords)
+        cell_coords[0::3] = [x + ox for x in xs]
+        cell_coords[1::3] = [y + oy for y in ys]
+        cell_coords[2::3] = [z + oz for z in zs]
+        tiled_coords.extend(cell_coords)
+        vertex_base = cell * vertex_count
+        tiled_loops.extend(index + vertex_base for index in loop_vertices)
+        loop_base = cell * loop_count
+        tiled_starts.extend(start + loop_base for start in loop_starts)
+    return tiled_coords, tiled_loops, tiled_starts
+
+
+def copy_array_cells(context, obj, offsets, material_data):
+    # 旧行为：每个单元独立复制网格并重新赋材质，仅保留用于对照
+    base_location = Vector(obj.location)
+    cells = []
+    for offset in offsets:
+        duplicate = obj.copy()
+        duplicate.data = obj.data.copy()
+        context.collection.objects.link(duplicate)
+        duplicate.location = base_location + Vector(offset)
+        apply_material_to_object(duplicate, material_data)
+        cells.append(duplicate)
+    return cells
+
+
+def link_array_cells(context, obj, offsets):
+    # obj.copy() 不复制网格，所有单元共用同一个 mesh 与材质
+    base_location = Vector(obj.location)
+    cells = []
+    for offset in offsets:
+        duplicate = obj.copy()
+        duplicate.location = base_location + Vector(offset)
+        context.collection.objects.link(duplicate)
+        cells.append(duplicate)
+    return cells
+
+
+def instance_array_cells(context, obj, offsets):
+    collection = bpy.data.collections.new(f"{obj.name}_Array")
+    collection.objects.link(obj)
+    collection.instance_offset = obj.location
+    base_location = Vector(obj.location)
+    for offset in offsets:
+        empty = bpy.data.objects.new(f"{obj.name}_Instance", None)
+        empty.instance_type = 'COLLECTION'
+        empty.instance_collection = collection
+        empty.location = base_location + Vector(offset)
+        context.collection.objects.link(empty)
+
+
+def merge_array_cells(obj, offsets):
+    mesh = obj.data
+    to_local = obj.matrix_basis.inverted().to_3x3()
+    local_offsets = [(0.0, 0.0, 0.0)] + [tuple(to_local @ Vector(offset)) for offset in offsets]
+    cells = len(local_offsets)
+    coords = [0.0] * (len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get("co", coords)
+    loop_vertices = [0] * len(mesh.loops)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    polygon_count = len(mesh.polygons)
+    loop_starts = [0] * polygon_count
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = [0] * polygon_count
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    material_indices = [0] * polygon_count
+    mesh.polygons.foreach_get("material_index", material_indices)
+    smooth = [False] * polygon_count
+    mesh.polygons.foreach_get("use_smooth", smooth)
+    coords, loop_vertices, loop_starts = tile_mesh_arrays(coords, loop_vertices, loop_starts, local_offsets)
+
+    merged = bpy.data.meshes.new(mesh.name)
+    fill_mesh_polygons(merged, coords, loop_vertices, loop_starts, loop_totals * cells)
+    merged.polygons.foreach_set("material_index", material_indices * cells)
+    merged.polygons.foreach_set("use_smooth", smooth * cells)
+    for layer in mesh.uv_layers:
+        uv = [0.0] * (len(mesh.loops) * 2)
+        layer.data.foreach_get("uv", uv)
+        merged.uv_layers.new(name=layer.name).data.foreach_set("uv", uv * cells)
+    for mat in mesh.materials:
+        merged.materials.append(mat)
+    merged.update(calc_edges=True)
+    obj.data = merged
+    if mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+
+
+def add_primitive_from_cmd(context, data, update=True, snap_queue=None):
+    # 传入 snap_queue 时只登记贴地目标，由调用方在整批结束后一次贴地
     template = data.get("template", "cube")
     try:
         if template == "cube":
@@ -522,30 +871,58 @@ def add_primitive_from_cmd(context, data):
     obj.name = f"NL_{template.title()}"
     apply_transforms(obj, data)
     apply_material_to_object(obj, data.get("material"))
-    if data.get("snap_to_ground"):
-        align_object_to_ground(obj)
-    context.view_layer.update()
-    created_objects = [obj]
+    cells = []
     if "array" in data:
         counts = data["array"]
         if len(counts) == 3 and any(c > 1 for c in counts):
-            dims = obj.dimensions.copy()
-            spacing = Vector((dims.x if dims.x > 0 else 1.0, dims.y if dims.y > 0 else 1.0, dims.z if dims.z > 0 else 1.0))
-            base_location = Vector(obj.location)
-            for ix in range(counts[0]):
-                for iy in range(counts[1]):
-                    for iz in range(counts[2]):
-                        if ix == 0 and iy == 0 and iz == 0:
-                            continue
-                        duplicate = obj.copy()
-                        duplicate.data = obj.data.copy()
-                        context.collection.objects.link(duplicate)
-                        offset = Vector((ix * spacing.x, iy * spacing.y, iz * spacing.z))
-                        duplicate.location = base_location + offset
-                        apply_material_to_object(duplicate, data.get("material"))
-                        created_objects.append(duplicate)
-            context.view_layer.update()
-    return created_objects[0]
+            # 尺寸由包围盒与缩放直接算出，不需要先刷新视图层
+            extent = bound_box_extent(obj.bound_box)
+            spacing = tuple(
+                extent[axis] * abs(obj.scale[axis]) if extent[axis] * abs(obj.scale[axis]) > 0 else 1.0
+                for axis in range(3)
+            )
+            offsets = array_offsets(counts, spacing)
+            mode = data.get("array_mode", "linked")
+            if mode not in ARRAY_MODES:
+                raise RuntimeError(f"未知阵列模式: {mode}")
+            if mode == "merged":
+                merge_array_cells(obj, offsets)
+            elif mode == "instance":
+                # 实例按集合偏移显示基准对象，基准对象平移后实例随之平移
+                instance_array_cells(context, obj, offsets)
+            elif mode == "copy":
+                cells = copy_array_cells(context, obj, offsets, data.get("material"))
+            else:
+                cells = link_array_cells(context, obj, offsets)
+    if data.get("snap_to_ground"):
+        # 阵列建好后再贴地：整组单元按基准对象的偏移一起平移，间距不变
+        if snap_queue is None:
+            snap_objects_to_ground([obj], [cells])
+        else:
+            snap_queue.append((obj, cells))
+    if update:
+        context.view_layer.update()
+    return obj
+
+
+def generate_prompt_lines(context, lines, array_mode="linked"):
+    # 先解析全部行，再逐行创建；视图层只在最后刷新一次，避免依赖图更新随对象数平方增长
+    parsed = [(number, line, parse_prompt_heuristic(line)) for number, line in enumerate(lines, 1) if line.strip()]
+    results = []
+    snap_queue = []
+    for number, line, data in parsed:
+        data.setdefault("array_mode", array_mode)
+        try:
+            obj = add_primitive_from_cmd(context, data, update=False, snap_queue=snap_queue)
+        except Exception as exc:  # noqa: BLE001
+            results.append((number, line, None, str(exc)))
+            continue
+        results.append((number, line, obj, None))
+    if snap_queue:
+        targets, followers = zip(*snap_queue)
+        snap_objects_to_ground(targets, followers)
+    context.view_layer.update()
+    return results
 
 
 def find_target_object(context):
@@ -563,97 +940,154 @@ def update_last_created(scene, obj):
         scene.nl_modeler_last_created = obj.name
 
 
-class NLModelerProperties(bpy.types.PropertyGroup):
-    prompt: bpy.props.StringProperty(name="Prompt", description="Natural language prompt", default="", options={"MULTILINE"})
+if bpy is not None:
+    class NLModelerProperties(bpy.types.PropertyGroup):
+        prompt: bpy.props.StringProperty(name="Prompt", description="Natural language prompt", default="", options={"MULTILINE"})
+        array_mode: bpy.props.EnumProperty(
+            name="Array Mode",
+            description="阵列单元的生成方式",
+            items=[
+                ('LINKED', "Linked", "关联复制，所有单元共用一个网格"),
+                ('INSTANCE', "Collection Instance", "集合实例，单元为实例化空物体"),
+                ('MERGED', "Merged", "所有单元写入同一个网格"),
+                ('COPY', "Copy", "每个单元独立复制网格（旧行为）"),
+            ],
+            default='LINKED',
+        )
+        batch_text: bpy.props.PointerProperty(
+            name="Batch Text",
+            type=bpy.types.Text,
+            description="批量生成时读取的文本数据块，每行一个对象；为空时使用 Prompt 的各行",
+        )
 
 
-class NLAddonPreferences(bpy.types.AddonPreferences):
-    bl_idname = __name__
+    class NLAddonPreferences(bpy.types.AddonPreferences):
+        bl_idname = __name__
 
-    mock_api_key: bpy.props.StringProperty(name="Mock API Key", subtype='PASSWORD', description="占位字段，无需真实联网")
+        mock_api_key: bpy.props.StringProperty(name="Mock API Key", subtype='PASSWORD', description="占位字段，无需真实联网")
 
-    def draw(self, context):
-        layout = self.layout
-        layout.label(text="Natural Language Modeling Assistant 偏好设置")
-        layout.prop(self, "mock_api_key")
+        def draw(self, context):
+            layout = self.layout
+            layout.label(text="Natural Language Modeling Assistant 偏好设置")
+            layout.prop(self, "mock_api_key")
 
 
-class NL_OT_generate(bpy.types.Operator):
-    bl_idname = "nl_modeler.generate_from_prompt"
-    bl_label = "Generate from Prompt"
-    bl_description = "根据自然语言提示生成几何体"
+    class NL_OT_generate(bpy.types.Operator):
+        bl_idname = "nl_modeler.generate_from_prompt"
+        bl_label = "Generate from Prompt"
+        bl_description = "根据自然语言提示生成几何体"
 
-    def execute(self, context):
-        prompt = context.scene.nl_modeler_props.prompt
-        data = parse_prompt_heuristic(prompt)
-        try:
-            obj = add_primitive_from_cmd(context, data)
-        except Exception as exc:  # noqa: BLE001
-            self.report({'ERROR'}, f"生成失败: {exc}")
-            return {'CANCELLED'}
-        update_last_created(context.scene, obj)
-        self.report({'INFO'}, f"已生成 {obj.name}")
-        return {'FINISHED'}
-
-
-class NL_OT_edit(bpy.types.Operator):
-    bl_idname = "nl_modeler.edit_from_prompt"
-    bl_label = "Edit from Prompt"
-    bl_description = "根据自然语言提示编辑选中对象或最后生成对象"
-
-    def execute(self, context):
-        target = find_target_object(context)
-        if target is None:
-            self.report({'ERROR'}, "未找到可编辑对象")
-            return {'CANCELLED'}
-        prompt = context.scene.nl_modeler_props.prompt
-        data = parse_prompt_heuristic(prompt)
-        try:
-            apply_transforms(target, data)
-            apply_material_to_object(target, data.get("material"))
-            if data.get("snap_to_ground"):
-                align_object_to_ground(target)
-            context.view_layer.update()
-        except Exception as exc:  # noqa: BLE001
-            self.report({'ERROR'}, f"编辑失败: {exc}")
-            return {'CANCELLED'}
-        update_last_created(context.scene, target)
-        self.report({'INFO'}, f"已编辑 {target.name}")
-        return {'FINISHED'}
-
-
-class NL_PT_panel(bpy.types.Panel):
-    bl_label = "NL Modeler"
-    bl_idname = "NL_PT_panel"
-    bl_space_type = 'VIEW_3D'
-    bl_region_type = 'UI'
-    bl_category = "NL Modeler"
-
-    def draw(self, context):
-        layout = self.layout
-        props = context.scene.nl_modeler_props
-        layout.prop(props, "prompt", text="")
-        row = layout.row(align=True)
-        row.operator(NL_OT_generate.bl_idname, icon='ADD')
-        row.operator(NL_OT_edit.bl_idname, icon='MODIFIER')
-        box = layout.box()
-        box.label(text="解析结果：")
-        data = parse_prompt_heuristic(props.prompt)
-        preview = json.dumps(data, ensure_ascii=False, indent=2)
-        for line in preview.splitlines():
-            box.label(text=line)
-        last_created = context.scene.nl_modeler_last_created
-        if last_created:
-            layout.label(text=f"最后生成：{last_created}")
-
-
-CLASSES = (
-    NLModelerProperties,
-    NLAddonPreferences,
-    NL_OT_generate,
-    NL_OT_edit,
-    NL_PT_panel,
-)
+        def execute(self, context):
+            props = context.scene.nl_modeler_props
+            data = parse_prompt_heuristic(props.prompt)
+            data.setdefault("array_mode", props.array_mode.lower())
+            try:
+                obj = add_primitive_from_cmd(context, data)
+            except Exception as exc:  # noqa: BLE001
+                self.report({'ERROR'}, f"生成失败: {exc}")
+                return {'CANCELLED'}
+            update_last_created(context.scene, obj)
+            self.report({'INFO'}, f"已生成 {obj.name}")
+            return {'FINISHED'}
+
+
+    class NL_OT_generate_batch(bpy.types.Operator):
+        bl_idname = "nl_modeler.generate_batch"
+        bl_label = "Generate Lines"
+        bl_description = "按行批量生成几何体，每行一个对象"
+
+        def execute(self, context):
+            props = context.scene.nl_modeler_props
+            source = props.batch_text.as_string() if props.batch_text else props.prompt
+            results = generate_prompt_lines(context, source.splitlines(), props.array_mode.lower())
+            if not results:
+                self.report({'ERROR'}, "没有可生成的行")
+                return {'CANCELLED'}
+            created = [obj for _, _, obj, _ in results if obj is not None]
+            for number, line, obj, error in results:
+                if error is None:
+                    self.report({'INFO'}, f"第 {number} 行：已生成 {obj.name}")
+                else:
+                    self.report({'WARNING'}, f"第 {number} 行生成失败: {error}（{line.strip()}）")
+            if not created:
+                self.report({'ERROR'}, "所有行均生成失败")
+                return {'CANCELLED'}
+            update_last_created(context.scene, created[-1])
+            self.report({'INFO'}, f"已生成 {len(created)} / {len(results)} 行")
+            return {'FINISHED'}
+
+
+    class NL_OT_edit(bpy.types.Operator):
+        bl_idname = "nl_modeler.edit_from_prompt"
+        bl_label = "Edit from Prompt"
+        bl_description = "根据自然语言提示编辑选中对象或最后生成对象"
+
+        def execute(self, context):
+            targets = list(context.selected_objects)
+            if not targets:
+                target = find_target_object(context)
+                targets = [target] if target is not None else []
+            if not targets:
+                self.report({'ERROR'}, "未找到可编辑对象")
+                return {'CANCELLED'}
+            prompt = context.scene.nl_modeler_props.prompt
+            data = parse_prompt_heuristic(prompt)
+            try:
+                for target in targets:
+                    apply_transforms(target, data)
+                    apply_material_to_object(target, data.get("material"))
+                if data.get("snap_to_ground"):
+                    snap_objects_to_ground(targets)
+                context.view_layer.update()
+            except Exception as exc:  # noqa: BLE001
+                self.report({'ERROR'}, f"编辑失败: {exc}")
+                return {'CANCELLED'}
+            target = context.active_object if context.active_object in targets else targets[0]
+            update_last_created(context.scene, target)
+            if len(targets) == 1:
+                self.report({'INFO'}, f"已编辑 {target.name}")
+            else:
+                self.report({'INFO'}, f"已编辑 {len(targets)} 个对象")
+            return {'FINISHED'}
+
+
+    class NL_PT_panel(bpy.types.Panel):
+        bl_label = "NL Modeler"
+        bl_idname = "NL_PT_panel"
+        bl_space_type = 'VIEW_3D'
+        bl_region_type = 'UI'
+        bl_category = "NL Modeler"
+
+        def draw(self, context):
+            layout = self.layout
+            props = context.scene.nl_modeler_props
+            layout.prop(props, "prompt", text="")
+            layout.prop(props, "array_mode")
+            row = layout.row(align=True)
+            row.operator(NL_OT_generate.bl_idname, icon='ADD')
+            row.operator(NL_OT_edit.bl_idname, icon='MODIFIER')
+            row = layout.row(align=True)
+            row.prop(props, "batch_text", text="")
+            row.operator(NL_OT_generate_batch.bl_idname, icon='TEXT')
+            box = layout.box()
+            box.label(text="解析结果：")
+            for line in PREVIEW_CACHE.lines(props.prompt):
+                box.label(text=line)
+            last_created = context.scene.nl_modeler_last_created
+            if last_created:
+                layout.label(text=f"最后生成：{last_created}")
+
+
+    CLASSES = (
+        NLModelerProperties,
+        NLAddonPreferences,
+        NL_OT_generate,
+        NL_OT_generate_batch,
+        NL_OT_edit,
+        NL_PT_panel,
+    )
+else:
+    CLASSES = ()
 
 
 def register():
@@ -666,6 +1100,9 @@ def register():
 def unregister():
     for cls in reversed(CLASSES):
         bpy.utils.unregister_class(cls)
+    PREVIEW_CACHE.clear()
+    GEOMETRY_CACHE.clear()
+    MATERIAL_REGISTRY.clear()
     if hasattr(bpy.types.Scene, "nl_modeler_props"):
         del bpy.types.Scene.nl_modeler_props
     if hasattr(bpy.types.Scene, "nl_modeler_last_created"):
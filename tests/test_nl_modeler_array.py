@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+def test_array_offsets_skip_origin_cell():
+    offsets = nl.array_offsets([2, 1, 2], (1.0, 2.0, 3.0))
+    assert offsets == [(0.0, 0.0, 3.0), (1.0, 0.0, 0.0), (1.0, 0.0, 3.0)]
+    assert nl.array_offsets([2, 1, 2], (1.0, 2.0, 3.0), include_origin=True)[0] == (0.0, 0.0, 0.0)
+
+
+def test_tile_mesh_arrays_offsets_vertices_and_indices():
+    coords = [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0]
+    loops = [0, 1, 2]
+    starts = [0]
+    tiled_coords, tiled_loops, tiled_starts = nl.tile_mesh_arrays(
+        coords, loops, starts, [(0.0, 0.0, 0.0), (5.0, 0.0, 1.0)]
+    )
+    assert tiled_coords[:9] == coords
+    assert tiled_coords[9:] == [5.0, 0.0, 1.0, 6.0, 0.0, 1.0, 5.0, 1.0, 1.0]
+    assert tiled_loops == [0, 1, 2, 3, 4, 5]
+    assert tiled_starts == [0, 3]
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+def test_generate_prompt_lines_updates_view_layer_once(monkeypatch):
+    updates = []
+    context = SimpleNamespace(view_layer=SimpleNamespace(update=lambda: updates.append(True)))
+    calls = []
+    snaps = []
+
+    def fake_add(ctx, data, update=True, snap_queue=None):
+        calls.append((data["template"], data["array_mode"], update))
+        if data["template"] == "torus":
+            raise RuntimeError("无法创建几何体")
+        obj = SimpleNamespace(name=f"NL_{data['template'].title()}")
+        snap_queue.append((obj, []))
+        return obj
+
+    monkeypatch.setattr(nl, "add_primitive_from_cmd", fake_add)
+    monkeypatch.setattr(nl, "snap_objects_to_ground", lambda objects, followers: snaps.append(list(objects)))
+    results = nl.generate_prompt_lines(context, ["红色球体", "", "  ", "圆环", "木桌 宽 2"], array_mode="merged")
+
+    assert updates == [True]
+    assert [[obj.name for obj in objects] for objects in snaps] == [["NL_Sphere", "NL_Table"]]
+    assert calls == [("sphere", "merged", False), ("torus", "merged", False), ("table", "merged", False)]
+    assert [(number, error) for number, _, _, error in results] == [(1, None), (4, "无法创建几何体"), (5, None)]
+    assert results[2][2].name == "NL_Table"
@@ -0,0 +1,127 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+class FakeMesh(dict):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+
+def test_geometry_cache_key_quantizes_parameters():
+    assert nl.geometry_cache_key("table", 2.0, 1.0, 0.75) == nl.geometry_cache_key("table", 2.00000001, 1, 0.75)
+    assert nl.geometry_cache_key("table", 2.0, 1.0, 0.75) != nl.geometry_cache_key("table", 2.001, 1.0, 0.75)
+    assert nl.geometry_cache_key("table", 1.0) != nl.geometry_cache_key("bookshelf", 1.0)
+
+
+def test_geometry_cache_returns_tagged_mesh_and_counts():
+    cache = nl.GeometryCache()
+    mesh = FakeMesh("NL_Table")
+    meshes = {"NL_Table": mesh}
+    key = nl.geometry_cache_key("table", 2.0, 1.0, 1.0)
+    assert cache.get(key, meshes) is None
+    cache.put(key, mesh)
+    for _ in range(199):
+        assert cache.get(key, meshes) is mesh
+    assert (cache.hits, cache.misses) == (199, 1)
+
+
+def test_geometry_cache_drops_removed_or_foreign_meshes():
+    cache = nl.GeometryCache()
+    key = nl.geometry_cache_key("table", 1.0, 1.0, 1.0)
+    cache.put(key, FakeMesh("NL_Table"))
+    assert cache.get(key, {"NL_Table": FakeMesh("NL_Table")}) is None
+    assert len(cache) == 0
+    cache.put(key, FakeMesh("NL_Table"))
+    assert cache.get(key, {}) is None
+
+
+def test_geometry_cache_evicts_least_recently_used():
+    cache = nl.GeometryCache(maxsize=2)
+    meshes = {name: FakeMesh(name) for name in ("a", "b", "c")}
+    for name in ("a", "b"):
+        cache.put(("t", name), meshes[name])
+    cache.get(("t", "a"), meshes)
+    cache.put(("t", "c"), meshes["c"])
+    assert cache.get(("t", "b"), meshes) is None
+    assert cache.get(("t", "a"), meshes) is meshes["a"]
+
+
+class FakeSlot:
+    def __init__(self, obj, index):
+        self._obj = obj
+        self._index = index
+
+    @property
+    def link(self):
+        return self._obj.slot_links.get(self._index, "DATA")
+
+    @link.setter
+    def link(self, value):
+        self._obj.slot_links[self._index] = value
+
+    @property
+    def material(self):
+        if self.link == "OBJECT":
+            return self._obj.slot_materials.get(self._index)
+        return self._obj.data.materials[self._index]
+
+    @material.setter
+    def material(self, value):
+        if self.link == "OBJECT":
+            self._obj.slot_materials[self._index] = value
+        else:
+            self._obj.data.materials[self._index] = value
+
+
+class FakeObject:
+    def __init__(self, name, mesh):
+        self.name = name
+        self.data = mesh
+        self.bound_box = [(x, y, z) for x in (-1.0, 1.0) for y in (-0.5, 0.5) for z in (0.0, 1.0)]
+        self.scale = (1.0, 1.0, 1.0)
+        self.location = (0.0, 0.0, 0.0)
+        self.rotation_euler = (0.0, 0.0, 0.0)
+        self.slot_links = {}
+        self.slot_materials = {}
+
+    @property
+    def material_slots(self):
+        return [FakeSlot(self, index) for index in range(len(self.data.materials))]
+
+
+def test_cached_mesh_stays_material_free(monkeypatch):
+    meshes = {}
+    objects = []
+
+    def build_box_mesh(name, boxes):
+        mesh = FakeMesh(name)
+        mesh.materials = []
+        meshes[name] = mesh
+        return mesh
+
+    def link_mesh_object(name, mesh, context):
+        obj = FakeObject(name, mesh)
+        objects.append(obj)
+        mesh.users = len([item for item in objects if item.data is mesh])
+        return obj
+
+    monkeypatch.setattr(nl, "bpy", SimpleNamespace(data=SimpleNamespace(meshes=meshes)))
+    monkeypatch.setattr(nl, "GEOMETRY_CACHE", nl.GeometryCache())
+    monkeypatch.setattr(nl, "build_box_mesh", build_box_mesh)
+    monkeypatch.setattr(nl, "link_mesh_object", link_mesh_object)
+    monkeypatch.setattr(nl.MATERIAL_REGISTRY, "material", lambda preset=None, color=None: f"mat{tuple(color)}")
+    context = SimpleNamespace(view_layer=SimpleNamespace(update=lambda: None))
+
+    red = nl.add_primitive_from_cmd(context, nl.parse_prompt_heuristic("红色桌子"))
+    plain = nl.add_primitive_from_cmd(context, nl.parse_prompt_heuristic("桌子"))
+
+    assert plain.data is red.data
+    assert red.data.materials == [None]
+    assert [slot.material for slot in red.material_slots] == ["mat(1.0, 0.0, 0.0)"]
+    assert [slot.material for slot in plain.material_slots] == [None]
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+def test_material_key_quantizes_color():
+    assert nl.material_key("wood", (1.0, 0.5, 0.0)) == nl.material_key("wood", (1.0, 0.501, 0.0))
+    assert nl.material_key("wood", (1.0, 0.5, 0.0)) != nl.material_key(None, (1.0, 0.5, 0.0))
+    assert nl.material_key(None, None) == (None, None)
+
+
+def test_material_name_is_readable_and_distinct_per_color():
+    assert nl.material_name(nl.material_key("metal", None)) == "NL_Material_Metal"
+    assert nl.material_name(nl.material_key(None, (1.0, 0.0, 0.0))) == "NL_Material_ff0000"
+    assert nl.material_name(nl.material_key("wood", (0.0, 0.4, 1.0))) == "NL_Material_Wood_0066ff"
+
+
+def test_registry_reuses_tagged_material_and_counts_hits():
+    registry = nl.MaterialRegistry()
+    key = nl.material_key(None, (1.0, 0.0, 0.0))
+    name = nl.material_name(key)
+    materials = {name: {nl.MATERIAL_KEY_PROP: name}}
+    for _ in range(3):
+        assert registry.get(key, materials) is materials[name]
+    assert registry.hit_counts == {name: 3}
+    assert registry.get(key, {name: {}}) is None
+    assert (registry.hits, registry.misses) == (3, 1)
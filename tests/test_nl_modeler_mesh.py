@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+def legacy_box_geometry(width, depth, height, center):
+    cx, cy, cz = center
+    w2, d2, h2 = width / 2.0, depth / 2.0, height / 2.0
+    verts = [
+        (cx - w2, cy - d2, cz - h2),
+        (cx + w2, cy - d2, cz - h2),
+        (cx + w2, cy + d2, cz - h2),
+        (cx - w2, cy + d2, cz - h2),
+        (cx - w2, cy - d2, cz + h2),
+        (cx + w2, cy - d2, cz + h2),
+        (cx + w2, cy + d2, cz + h2),
+        (cx - w2, cy + d2, cz + h2),
+    ]
+    faces = [(0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)]
+    return verts, faces
+
+
+def test_box_arrays_match_per_box_geometry():
+    specs = [(2.0, 1.0, 0.5, (0.0, 0.0, 0.25)), (0.1, 0.2, 0.9, (1.0, -0.5, -0.2))]
+    coords, faces = nl.box_arrays([nl.box_geometry(*spec) for spec in specs])
+    expected_verts = []
+    expected_faces = []
+    for spec in specs:
+        verts, box_faces = legacy_box_geometry(*spec)
+        offset = len(expected_verts)
+        expected_verts.extend(verts)
+        expected_faces.extend(tuple(index + offset for index in face) for face in box_faces)
+    assert coords.shape == (16, 3)
+    assert np.allclose(coords, expected_verts)
+    assert faces.tolist() == [list(face) for face in expected_faces]
+
+
+def test_bookshelf_boxes_place_shelves_evenly():
+    boxes = nl.bookshelf_boxes(width=1.0, depth=0.3, height=2.0, shelves=3)
+    assert boxes.shape == (5 + 3, 6)
+    shelf_z = boxes[5:, 5]
+    assert np.allclose(np.diff(shelf_z), np.diff(shelf_z)[0])
+    assert nl.bookshelf_boxes(shelves=0).shape == (5, 6)
+    assert nl.table_boxes().shape == (5, 6)
+
+
+def test_ground_offsets_match_per_corner_transform():
+    rng = np.random.default_rng(0)
+    matrices = np.tile(np.eye(4), (5, 1, 1))
+    matrices[:, :3, :3] = rng.normal(size=(5, 3, 3))
+    matrices[:, :3, 3] = rng.normal(size=(5, 3))
+    corners = rng.normal(size=(5, 8, 3))
+    expected = [
+        min((matrix @ np.append(corner, 1.0))[2] for corner in box)
+        for matrix, box in zip(matrices, corners)
+    ]
+    assert np.allclose(nl.ground_offsets(matrices, corners), expected)
+
+
+class SnapObject:
+    def __init__(self, z, height=1.0):
+        self.matrix_basis = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, z], [0, 0, 0, 1]]
+        self.bound_box = [(x, y, h) for x in (-1, 1) for y in (-1, 1) for h in (-height / 2, height / 2)]
+        self.location = SimpleNamespace(z=z)
+        self.parent = None
+        self.tags = 0
+
+    def update_tag(self, refresh=None):
+        self.tags += 1
+
+
+def test_snap_moves_only_targets_and_their_followers():
+    low, high = SnapObject(-2.0), SnapObject(3.0, height=2.0)
+    cells = [SimpleNamespace(location=SimpleNamespace(z=4.0 + i), update_tag=lambda refresh=None: None) for i in range(2)]
+    nl.snap_objects_to_ground([low, high], [[], cells])
+    assert (low.location.z, high.location.z) == (0.5, 1.0)
+    assert [cell.location.z for cell in cells] == [2.0, 3.0]
+    assert (low.tags, high.tags) == (1, 1)
@@ -0,0 +1,26 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "prompt_corpus.json"
+CORPUS = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[str(index) for index in range(len(CORPUS))])
+def test_parse_prompt_matches_corpus(case):
+    result = nl.parse_prompt_heuristic(case["prompt"])
+    assert result == case["expected"]
+    # 生成阶段按键顺序读取，顺序也必须与旧实现一致
+    assert list(result) == list(case["expected"])
+
+
+def test_template_uses_first_matching_keyword():
+    assert nl.parse_prompt_heuristic("一个红色的球体")["template"] == "sphere"
+    assert nl.parse_prompt_heuristic("bookshelf with 4 shelves")["template"] == "bookshelf"
@@ -0,0 +1,38 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+def test_preview_lines_match_json_dump():
+    cache = nl.PreviewCache()
+    prompt = "红色球体，半径 30cm，位置 1, 2, 0.5"
+    expected = json.dumps(nl.parse_prompt_heuristic(prompt), ensure_ascii=False, indent=2).splitlines()
+    assert list(cache.lines(prompt)) == expected
+
+
+def test_preview_cache_counts_hits_without_reparsing(monkeypatch):
+    cache = nl.PreviewCache()
+    first = cache.lines("立方体 宽 2")
+    calls = []
+    monkeypatch.setattr(nl, "parse_prompt_heuristic", lambda prompt: calls.append(prompt) or {})
+    for _ in range(10):
+        assert cache.lines("立方体 宽 2") is first
+    assert calls == []
+    assert (cache.hits, cache.misses) == (10, 1)
+
+
+def test_preview_cache_evicts_least_recently_used():
+    cache = nl.PreviewCache(maxsize=2)
+    cache.lines("a")
+    cache.lines("b")
+    cache.lines("a")
+    cache.lines("c")
+    assert len(cache) == 2
+    cache.lines("a")
+    assert cache.hits == 2
+    cache.lines("b")
+    assert cache.misses == 4
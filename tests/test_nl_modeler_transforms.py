@@ -0,0 +1,49 @@
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+UNIT_CUBE = [(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)]
+
+
+def solve(data, extent=(1.0, 1.0, 1.0), scale=(1.0, 1.0, 1.0), location=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0)):
+    return nl.solve_transforms(extent, scale, location, rotation, data)
+
+
+def test_bound_box_extent():
+    assert nl.bound_box_extent(UNIT_CUBE) == (1.0, 1.0, 1.0)
+    assert nl.bound_box_extent([(0, 0, 0), (2, 3, 0)]) == (2, 3, 0)
+
+
+def test_dimensions_override_scale_per_axis():
+    scale, _, _ = solve({"scale": 3.0, "width": 2.0, "depth": 1.0, "height": 0.75})
+    assert scale == pytest.approx((2.0, 1.0, 0.75))
+
+
+def test_size_then_radius_on_flat_extent():
+    # 平面 z 方向尺寸为 0，不参与缩放
+    scale, _, _ = solve({"size": 4.0, "radius": 1.0}, extent=(2.0, 2.0, 0.0))
+    assert scale == pytest.approx((1.0, 1.0, 1.0))
+
+
+def test_negative_scale_uses_absolute_dimensions():
+    scale, _, _ = solve({"width": 2.0}, scale=(-1.0, 1.0, 1.0))
+    assert scale == pytest.approx((-2.0, 1.0, 1.0))
+
+
+def test_location_and_rotation_components():
+    data = {"location": [1.0, 2.0, 3.0], "location_z": 5.0, "rotation": [0.0, 90.0, 0.0], "rotation_axes": {"x": 45.0}}
+    _, location, rotation = solve(data, location=(9.0, 9.0, 9.0))
+    assert location == (1.0, 2.0, 5.0)
+    assert rotation == pytest.approx((math.radians(45.0), math.radians(90.0), 0.0))
+
+
+def test_untouched_fields_keep_current_values():
+    current = ((2.0, 2.0, 2.0), (1.0, 0.0, 0.0), (0.1, 0.2, 0.3))
+    assert solve({}, (1.0, 1.0, 1.0), *current) == current
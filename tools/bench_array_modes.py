@@ -0,0 +1,60 @@
+"""阵列模式基准：在 Blender 后台对比 copy（旧行为）/ linked / instance / merged。
+
+用法：blender -b --factory-startup --python tools/bench_array_modes.py -- [--counts 20 20 4] [--template cube]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import bpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+
+def reset_scene():
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def run_mode(mode, counts, template):
+    reset_scene()
+    data = {
+        "template": template,
+        "array": list(counts),
+        "array_mode": mode,
+        "material": {"preset": "wood"},
+    }
+    meshes_before = len(bpy.data.meshes)
+    objects_before = len(bpy.data.objects)
+    start = time.perf_counter()
+    nl.add_primitive_from_cmd(bpy.context, data)
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "objects": len(bpy.data.objects) - objects_before,
+        "meshes": len(bpy.data.meshes) - meshes_before,
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs=3, default=[20, 20, 4])
+    parser.add_argument("--template", default="cube")
+    args = parser.parse_args(argv)
+
+    cells = args.counts[0] * args.counts[1] * args.counts[2]
+    print(f"{'mode':<10}{'seconds':>10}{'ms/cell':>10}{'objects':>10}{'meshes':>10}")
+    for mode in ("copy", "linked", "instance", "merged"):
+        stats = run_mode(mode, args.counts, args.template)
+        print(
+            f"{stats['mode']:<10}{stats['seconds']:>10.3f}{stats['seconds'] * 1000.0 / cells:>10.3f}"
+            f"{stats['objects']:>10}{stats['meshes']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
@@ -0,0 +1,181 @@
+"""提示词解析基准：逐关键字正则扫描（旧实现）与 parse_prompt_heuristic 对比。
+
+parse_prompt_heuristic 用导入时编译好的正则逐字段搜索；medium / long 两组把语料拼成更长的提示词，
+确认关键词密集的长文本上同样不慢于旧实现。
+
+用法：python tools/bench_prompt_parser.py [--seconds 2] [--repeat 5]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import nl_modeler_addon as nl  # noqa: E402
+
+CORPUS_PATH = ROOT / "tests" / "data" / "prompt_corpus.json"
+
+
+# 旧实现：每个关键字/轴/字段各做一次 re.search，仅用于基准对照
+def legacy_parse_prompt_heuristic(prompt):
+    result = {
+        "template": "cube",
+    }
+    text = prompt.strip()
+    if not text:
+        return result
+    lower = text.lower()
+    for template, keywords in nl.TEMPLATE_KEYWORDS.items():
+        if any(keyword in lower or keyword in text for keyword in keywords):
+            result["template"] = template
+            break
+    if re.search(r"贴地|吸附地面|snap\s*to\s*ground|落地", text, re.IGNORECASE):
+        result["snap_to_ground"] = True
+    array_match = re.search(r"阵列\s*(\d+)\s*[x×]\s*(\d+)\s*[x×]\s*(\d+)", text, re.IGNORECASE)
+    if array_match:
+        result["array"] = [int(array_match.group(i)) for i in range(1, 4)]
+    else:
+        array_match_en = re.search(r"array\s*(\d+)\s*[x×]\s*(\d+)\s*[x×]\s*(\d+)", lower)
+        if array_match_en:
+            result["array"] = [int(array_match_en.group(i)) for i in range(1, 4)]
+    material_found = None
+    for preset, keywords in nl.MATERIAL_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text or keyword in lower:
+                material_found = {"preset": preset}
+                break
+        if material_found:
+            break
+    if material_found:
+        result["material"] = material_found
+    color_match = None
+    for keyword, color in nl.COLOR_KEYWORDS.items():
+        if keyword in text or keyword in lower:
+            color_match = color
+            break
+    hex_match = re.search(r"#([0-9a-fA-F]{6})", text)
+    if hex_match:
+        hex_value = hex_match.group(1)
+        color_match = tuple(int(hex_value[i:i + 2], 16) / 255.0 for i in range(0, 6, 2))
+    if color_match:
+        result.setdefault("material", {})
+        result["material"]["color"] = list(color_match)
+    dimension_patterns = {
+        "width": ["宽度", "宽", "width", "长"],
+        "depth": ["深度", "深", "depth"],
+        "height": ["高度", "高", "height"],
+        "radius": ["半径", "radius"],
+        "diameter": ["直径", "diameter"],
+        "size": ["尺寸", "size"],
+    }
+    for key, keywords in dimension_patterns.items():
+        for keyword in keywords:
+            pattern = rf"{keyword}[是为:=\s]*([-+]?\d*\.?\d+)(?:\s*(m|cm|mm|米|厘米|毫米))?"
+            matches = list(re.finditer(pattern, text, re.IGNORECASE))
+            if matches:
+                value = nl.convert_value(matches[-1].group(1), matches[-1].group(2))
+                if value is not None:
+                    result[key] = value
+                break
+    if "diameter" in result and "radius" not in result:
+        result["radius"] = result["diameter"] / 2.0
+    shelf_match = re.search(r"(层|隔板|shelves?)\D*(\d+)", text, re.IGNORECASE)
+    if shelf_match:
+        result["shelves"] = int(shelf_match.group(2))
+    pos_match = re.search(r"位置[是为:=\s]*([-,\d\.\s米厘米毫米mcm]+)", text, re.IGNORECASE)
+    if pos_match:
+        coords = re.findall(r"([-+]?\d*\.?\d+)(?:\s*(m|cm|mm|米|厘米|毫米))?", pos_match.group(1))
+        if len(coords) >= 3:
+            result["location"] = [nl.convert_value(num, unit) or 0.0 for num, unit in coords[:3]]
+    else:
+        pos_match_en = re.search(r"location[is:=\s]*([-,\d\.\s米厘米毫米mcm]+)", text, re.IGNORECASE)
+        if pos_match_en:
+            coords = re.findall(r"([-+]?\d*\.?\d+)(?:\s*(m|cm|mm|米|厘米|毫米))?", pos_match_en.group(1))
+            if len(coords) >= 3:
+                result["location"] = [nl.convert_value(num, unit) or 0.0 for num, unit in coords[:3]]
+    axis_patterns = {
+        "x": [r"x\s*[:=]?", r"x轴", r"沿x", r"x\s*axis", r"沿\s*x"],
+        "y": [r"y\s*[:=]?", r"y轴", r"沿y", r"y\s*axis", r"沿\s*y"],
+        "z": [r"z\s*[:=]?", r"z轴", r"沿z", r"高度", r"z\s*axis", r"沿\s*z"],
+    }
+    for axis, patterns in axis_patterns.items():
+        for pattern in patterns:
+            regex = rf"{pattern}\s*([-+]?\d*\.?\d+)(?:\s*(m|cm|mm|米|厘米|毫米))?"
+            match = re.search(regex, text, re.IGNORECASE)
+            if match:
+                result[f"location_{axis}"] = nl.convert_value(match.group(1), match.group(2))
+                break
+    rot_match = re.search(r"旋转[是为:=\s]*([-,\d\.\s度deg]+)", text, re.IGNORECASE)
+    if rot_match:
+        values = re.findall(r"([-+]?\d*\.?\d+)", rot_match.group(1))
+        if len(values) >= 3:
+            result["rotation"] = [float(v) for v in values[:3]]
+    for axis in ("x", "y", "z"):
+        match = re.search(rf"(?:绕?{axis}轴旋转|{axis}\s*rot(?:ation)?)\s*([-+]?\d*\.?\d+)", lower)
+        if match:
+            result.setdefault("rotation_axes", {})[axis] = float(match.group(1))
+    scale_match = re.search(r"缩放[是为:=\s]*([-,\d\.\s]+)", text, re.IGNORECASE)
+    if scale_match:
+        values = re.findall(r"([-+]?\d*\.?\d+)", scale_match.group(1))
+        if len(values) == 1:
+            result["scale"] = float(values[0])
+        elif len(values) >= 3:
+            result["scale_xyz"] = [float(v) for v in values[:3]]
+    uniform_match = re.search(r"scale\s*([-+]?\d*\.?\d+)", lower)
+    if uniform_match:
+        result["scale"] = float(uniform_match.group(1))
+    for axis in ("x", "y", "z"):
+        match = re.search(rf"scale\s*{axis}\s*([-+]?\d*\.?\d+)", lower)
+        if match:
+            result.setdefault("scale_axes", {})[axis] = float(match.group(1))
+    return result
+
+
+def measure(parse, prompts, seconds, repeat):
+    best = 0.0
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        while time.perf_counter() < deadline:
+            for prompt in prompts:
+                parse(prompt)
+            count += len(prompts)
+        best = max(best, count / (time.perf_counter() - start))
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0, help="每轮计时秒数")
+    parser.add_argument("--repeat", type=int, default=3, help="轮数，取最好成绩")
+    args = parser.parse_args(argv)
+
+    corpus = [case["prompt"] for case in json.loads(CORPUS_PATH.read_text(encoding="utf-8"))]
+    workloads = {
+        "corpus": corpus,
+        "medium": [" ".join(corpus[index:index + 5]) for index in range(0, len(corpus), 5)],
+        "long": [" ".join(corpus)],
+    }
+    for prompts in workloads.values():
+        for prompt in prompts:
+            expected = legacy_parse_prompt_heuristic(prompt)
+            # 生成阶段按键顺序读取，键的顺序也要一致
+            if list(expected.items()) != list(nl.parse_prompt_heuristic(prompt).items()):
+                raise SystemExit(f"解析结果不一致: {prompt!r}")
+
+    print(f"{'workload':<10}{'chars':>8}{'legacy/s':>12}{'current/s':>12}{'speedup':>10}")
+    for name, prompts in workloads.items():
+        chars = sum(len(prompt) for prompt in prompts) // len(prompts)
+        before = measure(legacy_parse_prompt_heuristic, prompts, args.seconds, args.repeat)
+        after = measure(nl.parse_prompt_heuristic, prompts, args.seconds, args.repeat)
+        print(f"{name:<10}{chars:>8}{before:>12.0f}{after:>12.0f}{after / before:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()